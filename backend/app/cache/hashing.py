@@ -1,5 +1,8 @@
 import hashlib
+import io
 from abc import ABC, abstractmethod
+import numpy as np
+from PIL import Image
 
 class HashStrategy(ABC):
     @abstractmethod
@@ -10,3 +13,36 @@ class HashStrategy(ABC):
 class SHA256HashStrategy(HashStrategy):
     def compute_hash(self, content: bytes) -> str:
         return hashlib.sha256(content).hexdigest()
+
+class PerceptualHashStrategy(HashStrategy):
+    """
+    Base for 64-bit image hashes that survive re-compression and resizing.
+    Raises ValueError when the content is not a decodable image (e.g. PDF).
+    """
+    hash_size = 8
+
+    def _load_gray(self, content: bytes, size: tuple) -> np.ndarray:
+        try:
+            with Image.open(io.BytesIO(content)) as img:
+                small = img.convert("L").resize(size, Image.Resampling.LANCZOS)
+                return np.asarray(small, dtype=np.float32)
+        except Exception as e:
+            raise ValueError(f"Content is not a decodable image: {e}")
+
+    @staticmethod
+    def _bits_to_hex(bits: np.ndarray) -> str:
+        return np.packbits(bits.astype(np.uint8).flatten()).tobytes().hex()
+
+class AverageHashStrategy(PerceptualHashStrategy):
+    """aHash: each pixel compared against the mean of the thumbnail."""
+
+    def compute_hash(self, content: bytes) -> str:
+        pixels = self._load_gray(content, (self.hash_size, self.hash_size))
+        return self._bits_to_hex(pixels > pixels.mean())
+
+class DifferenceHashStrategy(PerceptualHashStrategy):
+    """dHash: each pixel compared against its right-hand neighbour."""
+
+    def compute_hash(self, content: bytes) -> str:
+        pixels = self._load_gray(content, (self.hash_size + 1, self.hash_size))
+        return self._bits_to_hex(pixels[:, 1:] > pixels[:, :-1])
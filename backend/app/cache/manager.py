@@ -1,20 +1,56 @@
-from typing import Any, Optional
+from typing import Any, Dict, Optional, Tuple
 from app.cache.hashing import HashStrategy, SHA256HashStrategy
+from app.cache.similarity import PerceptualHashIndex
 from app.cache.storage import CacheStorage, InMemoryCacheStorage
 
 class CacheManager:
     def __init__(
         self,
         hash_strategy: HashStrategy = SHA256HashStrategy(),
-        storage: CacheStorage = InMemoryCacheStorage()
+        storage: CacheStorage = InMemoryCacheStorage(),
+        namespace: str = "",
+        similarity_index: Optional[PerceptualHashIndex] = None
     ):
         self.hash_strategy = hash_strategy
         self.storage = storage
+        # Prefix keys so several consumers can share the singleton storage
+        self.namespace = namespace
+        # Optional: flag re-compressed / resized copies of a cached image.
+        # Only consulted by find_near_duplicate(), never by get(): receipts from
+        # the same bank template hash alike even when amount/reference differ.
+        self.similarity_index = similarity_index
+        self.hits = 0
+        self.misses = 0
 
-    def get(self, content: bytes) -> Optional[Any]:
+    def _key(self, content: bytes) -> str:
         key = self.hash_strategy.compute_hash(content)
-        return self.storage.get(key)
+        return f"{self.namespace}:{key}" if self.namespace else key
+
+    def get(self, content: bytes) -> Optional[Any]:
+        value = self.storage.get(self._key(content))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
 
     def set(self, content: bytes, value: Any) -> None:
-        key = self.hash_strategy.compute_hash(content)
+        key = self._key(content)
         self.storage.set(key, value)
+        if self.similarity_index is not None:
+            self.similarity_index.add(content, key)
+
+    def find_near_duplicate(self, content: bytes) -> Optional[Tuple[str, int]]:
+        """(cache_key, hamming_distance) of a visually similar cached image, if any. Advisory only."""
+        if self.similarity_index is None:
+            return None
+        return self.similarity_index.lookup(content)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters since process start."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0
+        }
@@ -0,0 +1,72 @@
+import threading
+from typing import Optional, Tuple
+import numpy as np
+from app.cache.hashing import PerceptualHashStrategy, DifferenceHashStrategy
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+class PerceptualHashIndex:
+    """
+    Maps perceptual hashes of cached images to their exact cache keys and
+    answers nearest-neighbour queries by Hamming distance.
+    Hashes live in a NumPy uint64 array so a lookup is a single vectorized
+    XOR + popcount over the whole index. Oldest entries are dropped first
+    once `maxsize` is reached.
+    """
+
+    def __init__(
+        self,
+        hash_strategy: Optional[PerceptualHashStrategy] = None,
+        max_distance: Optional[int] = None,
+        maxsize: Optional[int] = None
+    ):
+        self.hash_strategy = hash_strategy or DifferenceHashStrategy()
+        self.max_distance = settings.CACHE_PHASH_MAX_DISTANCE if max_distance is None else max_distance
+        self.maxsize = maxsize or settings.CACHE_PHASH_INDEX_SIZE
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self._keys: list[str] = []
+        self._lock = threading.Lock()
+
+    def compute(self, content: bytes) -> Optional[int]:
+        """Perceptual hash as an int, or None if the content is not an image."""
+        try:
+            return int(self.hash_strategy.compute_hash(content), 16)
+        except ValueError:
+            return None
+
+    def add(self, content: bytes, key: str) -> None:
+        phash = self.compute(content)
+        if phash is None:
+            return
+        with self._lock:
+            self._hashes = np.append(self._hashes, np.uint64(phash))
+            self._keys.append(key)
+            if len(self._keys) > self.maxsize:
+                overflow = len(self._keys) - self.maxsize
+                self._hashes = self._hashes[overflow:]
+                self._keys = self._keys[overflow:]
+
+    def lookup(self, content: bytes) -> Optional[Tuple[str, int]]:
+        """Returns (cache_key, distance) of the closest indexed image within max_distance."""
+        phash = self.compute(content)
+        if phash is None:
+            return None
+        with self._lock:
+            if not self._keys:
+                return None
+            diff = np.bitwise_xor(self._hashes, np.uint64(phash))
+            distances = np.unpackbits(diff.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+            best = int(np.argmin(distances))
+            distance = int(distances[best])
+            key = self._keys[best]
+        if distance > self.max_distance:
+            return None
+        return key, distance
+
+    def clear(self):
+        """Helper for testing"""
+        with self._lock:
+            self._hashes = np.empty(0, dtype=np.uint64)
+            self._keys = []
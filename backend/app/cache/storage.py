@@ -1,7 +1,12 @@
+import pickle
+import sqlite3
+import threading
+import time
 from abc import ABC, abstractmethod
 from typing import Any, Optional
 from cachetools import TTLCache
 from app.core.config import settings
+from app.core.sqlite_engine import apply_sqlite_pragmas
 from app.core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -46,3 +51,126 @@ class InMemoryCacheStorage(CacheStorage):
         """Helper for testing"""
         if self._cache is not None:
             self._cache.clear()
+
+class SQLiteCacheStorage(CacheStorage):
+    """
+    Persistent cache tier backed by a local SQLite file.
+    Survives restarts and is shared by every worker on the same host.
+    Entries expire after `ttl` seconds; once the file holds more than
+    `max_bytes` of payload the least recently used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ):
+        self.path = settings.CACHE_DISK_PATH if path is None else path
+        self.ttl = settings.CACHE_DISK_TTL if ttl is None else ttl
+        self.max_bytes = settings.CACHE_DISK_MAX_BYTES if max_bytes is None else max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+        apply_sqlite_pragmas(self._conn)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_last_access ON cache_entries (last_access)")
+        self._conn.commit()
+        logger.info(f"SQLiteCacheStorage initialized: path={self.path}, TTL={self.ttl}s, MaxBytes={self.max_bytes}")
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE cache_entries SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        try:
+            return pickle.loads(row[0])
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {key}: {e}")
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.warning(f"Value for {key} is not cacheable on disk: {e}")
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now + self.ttl, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drops expired rows, then LRU rows until the payload fits in max_bytes."""
+        self._conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (now,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM cache_entries ORDER BY last_access ASC"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM cache_entries WHERE key = ?", victims)
+        logger.info(f"SQLiteCacheStorage evicted {len(victims)} entries")
+
+    def clear(self):
+        """Helper for testing"""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries")
+            self._conn.commit()
+
+class TwoLevelCacheStorage(CacheStorage):
+    """
+    Memory first, disk second. Disk hits are promoted back into memory
+    and writes go to both levels.
+    """
+
+    def __init__(self, memory: CacheStorage, disk: CacheStorage):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        value = self.disk.get(key)
+        if value is not None:
+            self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        self.disk.set(key, value)
+
+def build_cache_storage() -> CacheStorage:
+    """Returns the storage configured in settings (memory, or memory + disk)."""
+    if not settings.CACHE_DISK_ENABLED:
+        return InMemoryCacheStorage()
+    try:
+        return TwoLevelCacheStorage(InMemoryCacheStorage(), SQLiteCacheStorage())
+    except Exception as e:
+        logger.error(f"Disk cache unavailable, falling back to memory only: {e}")
+        return InMemoryCacheStorage()
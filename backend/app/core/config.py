@@ -7,6 +7,18 @@ class Settings(BaseSettings):
     CACHE_ENABLED: bool = True
     CACHE_TTL: int = 120
     CACHE_MAXSIZE: int = 100
+    CACHE_DISK_ENABLED: bool = True
+    CACHE_DISK_PATH: str = "./scan_cache.db"
+    CACHE_DISK_TTL: int = 7 * 24 * 3600
+    CACHE_DISK_MAX_BYTES: int = 256 * 1024 * 1024
+    CACHE_PHASH_MAX_DISTANCE: int = 6
+    CACHE_PHASH_INDEX_SIZE: int = 5000
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 16 * 1024
+    SQLITE_POOL_SIZE: int = 5
+    SQLITE_MAX_OVERFLOW: int = 10
     RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_DEFAULT: str = "60/minute"
     SENTRY_DSN: str | None = None
@@ -2,12 +2,13 @@
 Database models and operations for exchange rates persistence
 Supports both Supabase (primary) and SQLite (fallback)
 """
-from sqlalchemy import create_engine, Column, Integer, Float, String, DateTime
+from sqlalchemy import Column, Integer, Float, String, DateTime, inspect
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
 import os
 from supabase_config import get_supabase_client, is_supabase_enabled
+from app.core.sqlite_engine import create_db_engine
 
 # ============================================
 # SQLite Database Setup (Fallback)
@@ -18,7 +19,7 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./exchange_rates_v3.db")
 if DATABASE_URL and DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
+engine = create_db_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -32,7 +33,7 @@ class ExchangeRateLocal(Base):
     eur_bcv = Column(Float, nullable=False)
     usd_binance_buy = Column(Float, nullable=True)
     usd_binance_sell = Column(Float, nullable=True)
-    last_updated = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_updated = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     source = Column(String, default="bcv.org.ve")
 
 # ============================================
@@ -40,12 +41,73 @@ class ExchangeRateLocal(Base):
 # ============================================
 def init_db():
     """Initialize database tables (SQLite fallback)"""
+    from app.models.outbox import OutboxEntry
     Base.metadata.create_all(bind=engine)
+    OutboxEntry.__table__.create(bind=engine, checkfirst=True)
+    ensure_indexes()
     print("✅ SQLite database tables created successfully")
 
+def ensure_indexes():
+    """
+    Adds indexes declared on models to tables created before them
+    (create_all skips existing tables, so it never adds them).
+    """
+    if not inspect(engine).has_table(ExchangeRateLocal.__tablename__):
+        return
+    for index in ExchangeRateLocal.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
 # ============================================
 # Supabase Operations (New Schema Adapter)
 # ============================================
+def rate_rows(usd_bcv: float, eur_bcv: float, usd_binance_buy: float = None, usd_binance_sell: float = None,
+              captured_at: str = None) -> list:
+    """
+    Rows for the Supabase `exchange_rates` audit log, one per currency pair.
+    """
+    rates_to_insert = []
+
+    # 1. BCV USD
+    if usd_bcv:
+        rates_to_insert.append({
+            "from_currency": "USD",
+            "to_currency": "VES",
+            "rate": float(usd_bcv),
+            "is_buy_rate": True, # Official rate
+            "captured_at": captured_at
+        })
+        
+    # 2. BCV EUR
+    if eur_bcv:
+        rates_to_insert.append({
+            "from_currency": "EUR",
+            "to_currency": "VES",
+            "rate": float(eur_bcv),
+            "is_buy_rate": True,
+            "captured_at": captured_at
+        })
+
+    # 3. Binance Buy
+    if usd_binance_buy:
+        rates_to_insert.append({
+            "from_currency": "USDT",
+            "to_currency": "VES",
+            "rate": float(usd_binance_buy),
+            "is_buy_rate": True, # Market Buy
+            "captured_at": captured_at
+        })
+
+    # 4. Binance Sell
+    if usd_binance_sell:
+        rates_to_insert.append({
+            "from_currency": "USDT",
+            "to_currency": "VES",
+            "rate": float(usd_binance_sell),
+            "is_buy_rate": False, # Market Sell
+            "captured_at": captured_at
+        })
+    return rates_to_insert
+
 def save_rates_to_supabase(usd_bcv: float, eur_bcv: float, usd_binance_buy: float = None, usd_binance_sell: float = None) -> bool:
     """
     Save exchange rates to Supabase using the NEW schema (Audit Log style).
@@ -56,48 +118,7 @@ def save_rates_to_supabase(usd_bcv: float, eur_bcv: float, usd_binance_buy: floa
         if not supabase:
             return False
         
-        rates_to_insert = []
-        now = datetime.utcnow().isoformat()
-
-        # 1. BCV USD
-        if usd_bcv:
-            rates_to_insert.append({
-                "from_currency": "USD",
-                "to_currency": "VES",
-                "rate": float(usd_bcv),
-                "is_buy_rate": True, # Official rate
-                "captured_at": now
-            })
-            
-        # 2. BCV EUR
-        if eur_bcv:
-            rates_to_insert.append({
-                "from_currency": "EUR",
-                "to_currency": "VES",
-                "rate": float(eur_bcv),
-                "is_buy_rate": True,
-                "captured_at": now
-            })
-
-        # 3. Binance Buy
-        if usd_binance_buy:
-            rates_to_insert.append({
-                "from_currency": "USDT",
-                "to_currency": "VES",
-                "rate": float(usd_binance_buy),
-                "is_buy_rate": True, # Market Buy
-                "captured_at": now
-            })
-
-        # 4. Binance Sell
-        if usd_binance_sell:
-            rates_to_insert.append({
-                "from_currency": "USDT",
-                "to_currency": "VES",
-                "rate": float(usd_binance_sell),
-                "is_buy_rate": False, # Market Sell
-                "captured_at": now
-            })
+        rates_to_insert = rate_rows(usd_bcv, eur_bcv, usd_binance_buy, usd_binance_sell, datetime.utcnow().isoformat())
 
         if not rates_to_insert:
             return False
@@ -203,9 +224,12 @@ def get_rates_from_supabase() -> dict | None:
 def get_db():
     pass # Not used directly
 
-def save_rates_to_sqlite(usd_bcv: float, eur_bcv: float, usd_binance_buy: float = None, usd_binance_sell: float = None):
+def save_rates_to_sqlite(usd_bcv: float, eur_bcv: float, usd_binance_buy: float = None, usd_binance_sell: float = None,
+                         replicate: bool = False):
     """
-    Save exchange rates to SQLite (fallback)
+    Save exchange rates to SQLite (fallback).
+    With `replicate`, the Supabase rows are queued in the replication outbox
+    in the same commit.
     """
     db = SessionLocal()
     try:
@@ -217,6 +241,14 @@ def save_rates_to_sqlite(usd_bcv: float, eur_bcv: float, usd_binance_buy: float
             last_updated=datetime.now()
         )
         db.add(rate)
+        if replicate:
+            from src.shared.infrastructure.replication import enqueue, stable_id
+            rows = rate_rows(usd_bcv, eur_bcv, usd_binance_buy, usd_binance_sell, datetime.utcnow().isoformat())
+            for row in rows:
+                # Same pair + side + capture time -> same remote id, so a retried upsert is idempotent
+                pair = f"{row['from_currency']}/{row['to_currency']}/{'buy' if row['is_buy_rate'] else 'sell'}"
+                row["id"] = stable_id(f"exchange_rates:{pair}:{row['captured_at']}")
+            enqueue(db, "exchange_rates", rows)
         db.commit()
         print(f"✅ Rates saved to SQLite: USD={usd_bcv}")
     except Exception as e:
@@ -250,18 +282,9 @@ def get_rates_dict_from_sqlite():
 # Unified Interface
 # ============================================
 def save_rates(usd_bcv: float, eur_bcv: float, usd_binance_buy: float = None, usd_binance_sell: float = None):
-    # Try Supabase first
-    if is_supabase_enabled():
-        success = save_rates_to_supabase(usd_bcv, eur_bcv, usd_binance_buy, usd_binance_sell)
-        # We can also save to SQLite as backup or cache
-        try:
-             save_rates_to_sqlite(usd_bcv, eur_bcv, usd_binance_buy, usd_binance_sell)
-        except:
-            pass
-        return
-    
-    # Fallback
-    save_rates_to_sqlite(usd_bcv, eur_bcv, usd_binance_buy, usd_binance_sell)
+    # SQLite commit first; Supabase gets the rows from the replication outbox
+    # in the background, so callers never wait on the network
+    save_rates_to_sqlite(usd_bcv, eur_bcv, usd_binance_buy, usd_binance_sell, replicate=True)
 
 def get_latest_rates():
     # Try Supabase first
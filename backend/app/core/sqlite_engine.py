@@ -0,0 +1,75 @@
+"""
+Shared engine factory.
+Every SQLite engine in the app goes through here so all of them run with the
+same tuning: WAL (readers don't block on the writer), synchronous=NORMAL,
+memory-mapped reads, a busy timeout instead of immediate "database is
+locked" errors, and a sized connection pool. Other databases pass through
+untouched.
+"""
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.core.config import settings
+
+
+def sqlite_pragmas() -> dict:
+    return {
+        "journal_mode": "WAL",
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KB, # Negative = KiB
+        "temp_store": "MEMORY",
+    }
+
+
+def apply_sqlite_pragmas(dbapi_connection) -> None:
+    """Runs the tuning pragmas on a raw DB-API connection (sqlite3 or aiosqlite adapter)."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def _is_sqlite(url) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _is_file(url) -> bool:
+    database = make_url(url).database
+    return bool(database) and database != ":memory:" and not database.startswith("file::memory:")
+
+
+def _engine_kwargs(url, kwargs: dict) -> dict:
+    options = dict(kwargs)
+    if _is_sqlite(url):
+        options.setdefault("connect_args", {}).setdefault("check_same_thread", False)
+        if _is_file(url) and "poolclass" not in options:
+            options.setdefault("pool_size", settings.SQLITE_POOL_SIZE)
+            options.setdefault("max_overflow", settings.SQLITE_MAX_OVERFLOW)
+    return options
+
+
+def _install_pragmas(engine: Engine) -> None:
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection)
+
+
+def create_db_engine(url, **kwargs) -> Engine:
+    """create_engine() with the SQLite tuning profile applied when `url` is SQLite."""
+    engine = create_engine(url, **_engine_kwargs(url, kwargs))
+    if _is_sqlite(url):
+        _install_pragmas(engine)
+    return engine
+
+
+def create_async_db_engine(url, **kwargs) -> AsyncEngine:
+    """Async counterpart of create_db_engine (aiosqlite / asyncpg)."""
+    engine = create_async_engine(url, **_engine_kwargs(url, kwargs))
+    if _is_sqlite(url):
+        _install_pragmas(engine.sync_engine)
+    return engine
@@ -3,5 +3,9 @@ Models package initialization.
 Exports all database models.
 """
 from app.models.transaction import Transaction, Base
+from app.models.rollup import DailyRollup
+from app.models.counterparty import Counterparty
+from app.models.outbox import OutboxEntry
+from app.models.rate_history import RateHistory
 
-__all__ = ["Transaction", "Base"]
+__all__ = ["Transaction", "DailyRollup", "Counterparty", "OutboxEntry", "RateHistory", "Base"]
@@ -0,0 +1,34 @@
+"""
+SQLAlchemy model for counterparties (clients, providers, operators).
+Populated at insert time from the free-text sender/receiver names.
+"""
+from sqlalchemy import Column, String, Numeric, DateTime, Integer, Index
+from datetime import datetime
+from app.core.database_sb import Base
+
+
+class Counterparty(Base):
+    """
+    One row per (role, normalized name) with running totals, so the
+    resources endpoints read an index instead of grouping the ledger.
+    """
+    __tablename__ = "counterparties"
+    
+    id = Column(String(36), primary_key=True) # Stable: derived from role + name_key
+    role = Column(String(20), nullable=False) # Client, Provider, Operator
+    name_key = Column(String(200), nullable=False) # Normalized name
+    name = Column(String(200), nullable=False) # Display name (first seen)
+    
+    deals = Column(Integer, nullable=False, default=0)
+    volume = Column(Numeric(precision=18, scale=2), nullable=False, default=0) # USD
+    last_date = Column(DateTime, nullable=True)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_counterparties_role_name_key", "role", "name_key", unique=True),
+        Index("ix_counterparties_name_key", "name_key"),
+    )
+    
+    def __repr__(self):
+        return f"<Counterparty(id={self.id}, role={self.role}, name={self.name})>"
@@ -0,0 +1,35 @@
+"""
+SQLAlchemy model for the Supabase replication outbox.
+Rows are written in the same local transaction as the data they mirror and
+drained by the background replicator.
+"""
+from sqlalchemy import Column, String, Text, DateTime, Integer, Index
+from datetime import datetime
+from app.core.database_sb import Base
+
+
+class OutboxEntry(Base):
+    """
+    One pending (or replicated) remote write. `idempotency_key` is unique, so
+    enqueuing the same change twice is a no-op, and the payload carries a
+    deterministic `id` so a retried upsert never duplicates the remote row.
+    """
+    __tablename__ = "replication_outbox"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    idempotency_key = Column(String(120), nullable=False, unique=True)
+    target_table = Column(String(64), nullable=False)
+    payload = Column(Text, nullable=False) # JSON object
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_error = Column(Text, nullable=True)
+    replicated_at = Column(DateTime, nullable=True) # NULL = pending
+
+    __table_args__ = (
+        Index("ix_replication_outbox_pending", "replicated_at", "next_attempt_at"),
+    )
+
+    def __repr__(self):
+        return f"<OutboxEntry(id={self.id}, key={self.idempotency_key}, attempts={self.attempts})>"
@@ -0,0 +1,27 @@
+"""
+SQLAlchemy model for exchange-rate history.
+One row per (pair, source, capture time), indexed for range scans.
+"""
+from sqlalchemy import Column, String, Float, DateTime, Integer, Index
+from app.core.database_sb import Base
+
+
+class RateHistory(Base):
+    """
+    Time series of observed rates. `pair` is FROM/TO (e.g. USD/VES) and
+    `source` the quote it came from (bcv, binance_buy, binance_sell).
+    """
+    __tablename__ = "rate_history"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    pair = Column(String(16), nullable=False)
+    source = Column(String(32), nullable=False)
+    captured_at = Column(DateTime, nullable=False)
+    rate = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_rate_history_series", "pair", "source", "captured_at", unique=True),
+    )
+
+    def __repr__(self):
+        return f"<RateHistory({self.pair} {self.source} @ {self.captured_at}: {self.rate})>"
@@ -0,0 +1,31 @@
+"""
+SQLAlchemy model for pre-aggregated ledger totals.
+One row per (day, branch, currency, transaction type), maintained on every ledger write.
+"""
+from sqlalchemy import Column, String, Numeric, Date, Integer
+from app.core.database_sb import Base
+
+
+class DailyRollup(Base):
+    """
+    Daily totals used by the dashboard and chart endpoints instead of
+    scanning the whole transactions table.
+    """
+    __tablename__ = "daily_rollups"
+    
+    day = Column(Date, primary_key=True)
+    branch_id = Column(String(36), primary_key=True, default="") # "" = no branch
+    currency = Column(String(10), primary_key=True)
+    transaction_type = Column(String(20), primary_key=True)
+    
+    tx_count = Column(Integer, nullable=False, default=0)
+    pending_count = Column(Integer, nullable=False, default=0)
+    amount = Column(Numeric(precision=18, scale=2), nullable=False, default=0) # Native currency
+    amount_usd = Column(Numeric(precision=18, scale=2), nullable=False, default=0)
+    profit = Column(Numeric(precision=18, scale=2), nullable=False, default=0)
+    
+    def __repr__(self):
+        return (
+            f"<DailyRollup(day={self.day}, branch={self.branch_id}, "
+            f"{self.currency}/{self.transaction_type}, count={self.tx_count})>"
+        )
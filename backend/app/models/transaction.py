@@ -2,7 +2,7 @@
 SQLAlchemy models for transaction data.
 Defines the database schema for storing scanned receipts.
 """
-from sqlalchemy import Column, String, Numeric, DateTime, Text, Integer
+from sqlalchemy import Column, String, Numeric, DateTime, Text, Integer, Index
 from datetime import datetime
 import uuid
 from app.core.database_sb import Base
@@ -65,9 +65,14 @@ class Transaction(Base):
     evidence_ocr_json = Column(Text, nullable=True) # JSON string
     
     # Metadata
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Keyset pagination order for the ledger listing
+        Index("ix_transactions_created_at_id", "created_at", "id"),
+    )
+    
     def __repr__(self):
         return (
             f"<Transaction(id={self.id}, "
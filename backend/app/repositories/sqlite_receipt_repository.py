@@ -6,7 +6,6 @@ Following Repository Pattern: Abstracts data access logic.
 """
 from typing import Optional, List
 from datetime import datetime
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
 import os
@@ -16,6 +15,7 @@ from app.schemas.receipt import TransactionReceipt
 from app.models.transaction import Transaction, Base
 from app.services.data_mapper import receipt_mapper
 from app.core.logger import get_logger
+from app.core.sqlite_engine import create_db_engine
 
 logger = get_logger(__name__)
 
@@ -38,11 +38,8 @@ class SQLiteReceiptRepository(IReceiptRepository):
             "sqlite:///./transactions.db"
         )
         
-        # Create engine
-        self.engine = create_engine(
-            self.database_url,
-            connect_args={"check_same_thread": False}  # For SQLite
-        )
+        # Create engine (WAL, busy timeout and pooling for SQLite)
+        self.engine = create_db_engine(self.database_url)
         
         # Create tables
         Base.metadata.create_all(bind=self.engine)
@@ -34,6 +34,51 @@ app.include_router(dashboard_router, prefix="/api/v1/stats", tags=["Dashboard"])
 app.include_router(scanner_router, prefix="/api/v1/scanner", tags=["Scanner"])
 app.include_router(resources_router, prefix="/api/v1/resources", tags=["Resources"])
 
+@app.on_event("startup")
+async def warm_up_genai():
+    # Build Gemini clients once so the first scan or advisor question does not pay for it
+    from src.scanner.application.scanner_service import scanner_service
+    from src.advisor.infrastructure.gemini_client import gemini_client
+    scanner_service.warm_up()
+    gemini_client.warm_up()
+
+@app.on_event("startup")
+async def start_scan_job_queue():
+    from src.scanner.application.job_queue import scan_job_queue
+    await scan_job_queue.start()
+
+@app.on_event("shutdown")
+async def stop_scan_job_queue():
+    from src.scanner.application.job_queue import scan_job_queue
+    await scan_job_queue.stop()
+
+@app.on_event("startup")
+async def ensure_sqlite_indexes():
+    # create_all never adds indexes to tables that already exist
+    from starlette.concurrency import run_in_threadpool
+    from app.core.database_sb import ensure_indexes
+    await run_in_threadpool(ensure_indexes)
+
+@app.on_event("startup")
+async def start_rate_provider():
+    from src.shared.infrastructure.rate_provider import rate_provider
+    await rate_provider.start()
+
+@app.on_event("shutdown")
+async def stop_rate_provider():
+    from src.shared.infrastructure.rate_provider import rate_provider
+    await rate_provider.stop()
+
+@app.on_event("startup")
+async def start_supabase_replicator():
+    from src.shared.infrastructure.replication import supabase_replicator
+    await supabase_replicator.start()
+
+@app.on_event("shutdown")
+async def stop_supabase_replicator():
+    from src.shared.infrastructure.replication import supabase_replicator
+    await supabase_replicator.stop()
+
 @app.get("/health", tags=["Health"])
 async def health_check():
     return {"status": "ok", "architecture": "modular"}
@@ -0,0 +1,25 @@
+import sys
+import os
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.database_sb import engine, SessionLocal
+from app.models.counterparty import Counterparty
+from src.transactions.infrastructure.counterparties import backfill_counterparties
+
+def main():
+    print("Rebuilding counterparties from the transactions ledger...")
+    Counterparty.__table__.create(bind=engine, checkfirst=True)
+    
+    db = SessionLocal()
+    try:
+        total = backfill_counterparties(db)
+    finally:
+        db.close()
+    
+    print(f"Backfill complete: {total} counterparties")
+    print(f"Database URL used: {engine.url}")
+
+if __name__ == "__main__":
+    main()
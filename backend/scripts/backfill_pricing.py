@@ -0,0 +1,34 @@
+import sys
+import os
+import argparse
+import time
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.database_sb import engine, SessionLocal
+from src.transactions.infrastructure.pricing import backfill_pricing
+from src.transactions.infrastructure.counterparties import backfill_counterparties
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill amount_usd, market_rate and profit from the rate history")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--overwrite", action="store_true", help="Re-price rows that already have values")
+    args = parser.parse_args()
+    
+    print("Pricing the transactions ledger from rate_history...")
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        updated = backfill_pricing(db, batch_size=args.batch_size, overwrite=args.overwrite)
+        print(f"Priced {updated} transactions in {time.perf_counter() - started:.1f}s")
+        if updated:
+            # Daily rollups move with each batch; counterparty volumes are rebuilt here
+            print(f"Rebuilt {backfill_counterparties(db)} counterparties")
+    finally:
+        db.close()
+    
+    print(f"Database URL used: {engine.url}")
+
+if __name__ == "__main__":
+    main()
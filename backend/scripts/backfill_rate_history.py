@@ -0,0 +1,36 @@
+import sys
+import os
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.database_sb import engine, SessionLocal, ExchangeRateLocal, ensure_indexes
+from app.models.rate_history import RateHistory
+from src.shared.infrastructure.rate_history import record_rates, apply_retention
+
+def main():
+    print("Copying exchange_rates_local snapshots into rate_history...")
+    RateHistory.__table__.create(bind=engine, checkfirst=True)
+    ensure_indexes() # exchange_rates_local.last_updated, read in order below
+    
+    db = SessionLocal()
+    try:
+        recorded = 0
+        snapshots = db.query(ExchangeRateLocal).order_by(ExchangeRateLocal.last_updated).all()
+        for snapshot in snapshots:
+            recorded += record_rates(db, {
+                "usd_bcv": snapshot.usd_bcv,
+                "eur_bcv": snapshot.eur_bcv,
+                "usd_binance_buy": snapshot.usd_binance_buy,
+                "usd_binance_sell": snapshot.usd_binance_sell,
+            }, captured_at=snapshot.last_updated)
+        retention = apply_retention(db)
+        db.commit()
+    finally:
+        db.close()
+    
+    print(f"Backfill complete: {recorded} points ({retention['expired']} expired, {retention['thinned']} thinned)")
+    print(f"Database URL used: {engine.url}")
+
+if __name__ == "__main__":
+    main()
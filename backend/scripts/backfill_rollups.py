@@ -0,0 +1,25 @@
+import sys
+import os
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.database_sb import engine, SessionLocal
+from app.models.rollup import DailyRollup
+from src.transactions.infrastructure.rollups import backfill_rollups
+
+def main():
+    print("Rebuilding daily rollups from the transactions ledger...")
+    DailyRollup.__table__.create(bind=engine, checkfirst=True)
+    
+    db = SessionLocal()
+    try:
+        buckets = backfill_rollups(db)
+    finally:
+        db.close()
+    
+    print(f"Backfill complete: {buckets} daily buckets")
+    print(f"Database URL used: {engine.url}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import sys
+import os
+import argparse
+from datetime import datetime
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.transactions.infrastructure.export import export_ledger, EXPORT_FORMATS
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream the transactions ledger to CSV or Parquet.")
+    parser.add_argument("output", help="Destination file")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default=None,
+                        help="Defaults to the output file extension")
+    parser.add_argument("--from", dest="date_from", type=datetime.fromisoformat, help="created_at >= (ISO date)")
+    parser.add_argument("--to", dest="date_to", type=datetime.fromisoformat, help="created_at < (ISO date)")
+    parser.add_argument("--account", dest="account_id", help="Only this account id")
+    parser.add_argument("--batch-size", type=int, default=2000)
+    args = parser.parse_args()
+
+    fmt = args.format or os.path.splitext(args.output)[1].lstrip(".").lower() or "csv"
+    written = 0
+    with open(args.output, "wb") as f:
+        for chunk in export_ledger(fmt, date_from=args.date_from, date_to=args.date_to,
+                                   account_id=args.account_id, batch_size=args.batch_size):
+            f.write(chunk)
+            written += len(chunk)
+    print(f"Exported ledger to {args.output} ({fmt}, {written:,} bytes)")
+
+if __name__ == "__main__":
+    main()
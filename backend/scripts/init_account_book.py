@@ -5,8 +5,13 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from app.core.database_sb import engine
-from app.models.transaction import Base as TransactionBase
+from app.models.transaction import Base as TransactionBase, Transaction
 from app.models.finance import Base as FinanceBase
+from src.transactions.infrastructure.search import ensure_search_index
+from app.models.rollup import DailyRollup  # noqa: F401 (registers daily_rollups)
+from app.models.counterparty import Counterparty  # noqa: F401 (registers counterparties)
+from app.models.outbox import OutboxEntry  # noqa: F401 (registers replication_outbox)
+from app.models.rate_history import RateHistory  # noqa: F401 (registers rate_history)
 
 def init_account_book():
     print("Initializating Account Book Database...")
@@ -14,6 +19,14 @@ def init_account_book():
     print("Creating Transaction tables...")
     TransactionBase.metadata.create_all(bind=engine)
     
+    # create_all skips indexes on tables that already exist
+    print("Ensuring Transaction indexes...")
+    for index in Transaction.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+    
+    print("Ensuring ledger search index...")
+    ensure_search_index(engine)
+    
     print("Creating Finance tables (Accounts, Sessions)...")
     FinanceBase.metadata.create_all(bind=engine)
     
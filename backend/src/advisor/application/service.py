@@ -9,7 +9,7 @@ class AdvisorService:
 
     async def get_financial_context(self) -> str:
         # 1. Get Accounts
-        accounts = finance_repo.get_accounts()
+        accounts = await finance_repo.get_accounts()
         # 2. Get Recent Transactions (limit 10)
         # Assuming transaction_repo.get_all returns all, we might want to slice or add a limit param later
         # For now, just getting all and slicing here is fine for MVP size
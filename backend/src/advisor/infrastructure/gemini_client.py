@@ -1,32 +1,30 @@
-import google.generativeai as genai
+from google.genai import types
 from src.shared.config.settings import settings
+from src.shared.infrastructure.genai_pool import genai_pool
 import random
 
+ADVISOR_MODEL_NAME = 'gemini-flash-latest'
+
 class GeminiAdvisorClient:
     def __init__(self):
         self.api_keys = settings.parsed_api_keys
-        self.configure_api()
-
-    def configure_api(self):
         if not self.api_keys:
             print("⚠️ No Gemini API Keys found!")
-            return
-        
-        # Simple rotation or pick first
-        key = random.choice(self.api_keys)
-        genai.configure(api_key=key)
+
+    def warm_up(self) -> None:
+        """Pre-builds the pooled advisor model per API key so the first question skips client setup."""
+        genai_pool.warm_up(self.api_keys, ADVISOR_MODEL_NAME)
 
     def generate_response(self, system_prompt: str, user_message: str) -> str:
         try:
-            model = genai.GenerativeModel('gemini-flash-latest')
-            # model = genai.GenerativeModel('gemini-pro') # Fallback if flash not avail
+            # Simple rotation: pick a key per message, the pooled client is reused
+            model = genai_pool.get(random.choice(self.api_keys), ADVISOR_MODEL_NAME)
             
-            chat = model.start_chat(history=[
-                {"role": "user", "parts": [system_prompt]},
-                {"role": "model", "parts": ["Entendido. Soy el Profesor Toro, asesor financiero experto. Me limitaré estrictamente al contexto proporcionado."]}
+            response = model.generate_sync([
+                types.Content(role="user", parts=[types.Part(text=system_prompt)]),
+                types.Content(role="model", parts=[types.Part(text="Entendido. Soy el Profesor Toro, asesor financiero experto. Me limitaré estrictamente al contexto proporcionado.")]),
+                types.Content(role="user", parts=[types.Part(text=user_message)])
             ])
-            
-            response = chat.send_message(user_message)
             return response.text
         except Exception as e:
             print(f"Error generating response: {e}")
@@ -14,8 +14,8 @@ class ChatService:
         last_msgs, unread_counts = self.repo.get_last_messages(self.my_id)
         
         # 2. Get Potential Contacts from Main DB
-        # Clients
-        clients = await transaction_repo.get_clients() # Returns list of dicts
+        # Clients: only those with chat history (indexed lookup, no ledger scan)
+        clients = await transaction_repo.get_clients(limit=None, ids=list(last_msgs)) # Returns list of dicts
         # Operators
         operators = await transaction_repo.get_operators() # Returns list of dicts
         
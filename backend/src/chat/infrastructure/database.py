@@ -1,12 +1,10 @@
-from sqlalchemy import create_engine
+from app.core.sqlite_engine import create_db_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 # Separate SQLite database for Chat
 SQLALCHEMY_DATABASE_URL = "sqlite:///./chat.db"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocalChat = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 BaseChat = declarative_base()
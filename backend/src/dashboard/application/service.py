@@ -1,79 +1,67 @@
 from datetime import datetime, timedelta
-from typing import Dict, Any
-from sqlalchemy.orm import Session
-from app.core.database_sb import SessionLocal
-from app.models.transaction import Transaction as TransactionModel
+from typing import Dict, Any, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.shared.database.async_session import session_scope
+from src.transactions.infrastructure.rollups import load_summary
+from src.shared.infrastructure.rate_provider import rate_provider, ticker_from_rates
 from src.dashboard.domain.schemas import DashboardStats, ChartDataPoint, TickerData
 
 class DashboardService:
-    def get_stats(self) -> DashboardStats:
+    async def get_stats(self, db: Optional[AsyncSession] = None) -> DashboardStats:
+        """Stats, or the all-zero fallback if they cannot be computed."""
         try:
-            db = SessionLocal()
-            # Fetch all txs
-            txs = db.query(TransactionModel).all()
-            
-            total_vol = sum(float(t.amount_usd or 0) for t in txs)
-            
-            # Pending
-            pending = sum(1 for t in txs if t.status == 'PENDING')
-            
-            # Chart Data: Last 7 days (fill gaps)
-            today = datetime.utcnow().date()
-            chart_data = []
-            
-            # Helper for Spanish days
-            days_es = ["Lun", "Mar", "Mie", "Jue", "Vie", "Sab", "Dom"]
-            
-            for i in range(6, -1, -1):
-                date_cursor = today - timedelta(days=i)
-                day_name = days_es[date_cursor.weekday()] # 0=Mon, 6=Sun
-                
-                # Filter txs for this day
-                day_vol = 0.0
-                day_prof = 0.0
-                
-                for t in txs:
-                    t_dt = (t.created_at or t.transaction_date or datetime.utcnow()).date()
-                    if t_dt == date_cursor:
-                        amt = float(t.amount_usd or 0)
-                        day_vol += amt
-                        
-                        # Simple profit logic (Mock 5% for IN, -1% for OUT)
-                        if t.transaction_type == 'ENTRADA':
-                             day_prof += amt * 0.05 
-                        else:
-                             day_prof -= amt * 0.01 
-                
-                chart_data.append(ChartDataPoint(
-                    name=day_name,
-                    volume=float(f"{day_vol:.2f}"),
-                    profit=float(f"{day_prof:.2f}")
-                ))
+            return await self.compute_stats(db)
+        except Exception as e:
+            print(f"Error fetching stats: {e}")
+            return self.fallback_stats()
+
+    @staticmethod
+    def fallback_stats() -> DashboardStats:
+        """Empty/safe default shown while stats are unavailable."""
+        return DashboardStats(
+            volume="0.00", net_profit="0.00", pending_count=0,
+            ticker=TickerData(global_rate="0.0", bcv_usd=0, bcv_eur=0, binance_buy=0, binance_sell=0, zelle=0),
+            chart_data=[]
+        )
 
-            # Ticker (Mock rates for now, can be connected to Finance module later)
-            ticker_data = TickerData(
-                global_rate="58.50 VES",
-                bcv_usd=45.80,
-                bcv_eur=48.20,
-                binance_buy=58.45,
-                binance_sell=58.60,
-                zelle=58.20
-            )
+    async def compute_stats(self, db: Optional[AsyncSession] = None) -> DashboardStats:
+        """Like get_stats, but raises instead of falling back."""
+        today = datetime.utcnow().date()
 
-            db.close()
+        # Totals and per-day volume come from the daily_rollups table,
+        # kept in step with every ledger write by TransactionRepository
+        async with session_scope(db) as session:
+            summary = await session.run_sync(lambda s: load_summary(s, today))
+        total_vol = summary["volume"]
+        pending = summary["pending"]
+        
+        # Chart Data: Last 7 days (fill gaps)
+        chart_data = []
+        
+        # Helper for Spanish days
+        days_es = ["Lun", "Mar", "Mie", "Jue", "Vie", "Sab", "Dom"]
+        
+        for i in range(6, -1, -1):
+            date_cursor = today - timedelta(days=i)
+            day_name = days_es[date_cursor.weekday()] # 0=Mon, 6=Sun
             
-            return DashboardStats(
-                volume=f"{total_vol:,.2f}",
-                net_profit=f"{total_vol * 0.03:,.2f}", # Mock total profit logic
-                pending_count=pending,
-                ticker=ticker_data,
-                chart_data=chart_data
-            )
-        except Exception as e:
-            print(f"Error fetching stats: {e}")
-            # Return empty/safe default
-            return DashboardStats(
-                volume="0.00", net_profit="0.00", pending_count=0,
-                ticker=TickerData(global_rate="0.0", bcv_usd=0, bcv_eur=0, binance_buy=0, binance_sell=0, zelle=0),
-                chart_data=[]
-            )
+            day = summary["days"].get(date_cursor.isoformat(), {})
+            day_vol = day.get("volume", 0.0)
+            # Spread profit priced from the rate history at insert time
+            day_prof = day.get("profit", 0.0)
+            
+            chart_data.append(ChartDataPoint(
+                name=day_name,
+                volume=float(f"{day_vol:.2f}"),
+                profit=float(f"{day_prof:.2f}")
+            ))
+        # Ticker: in-memory rate snapshot, no network round trip
+        ticker_data = TickerData(**ticker_from_rates(rate_provider.snapshot()))
+
+        return DashboardStats(
+            volume=f"{total_vol:,.2f}",
+            net_profit=f"{summary['profit']:,.2f}",
+            pending_count=pending,
+            ticker=ticker_data,
+            chart_data=chart_data
+        )
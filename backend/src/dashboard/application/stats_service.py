@@ -1,35 +1,14 @@
 from typing import Dict, Any, List
 # from src.transactions.infrastructure.repository import transaction_repo # Future dependency
-from src.shared.database import db
+from src.shared.infrastructure.rate_provider import rate_provider, ticker_from_rates
 
 class StatsService:
     async def get_dashboard_stats(self) -> Dict[str, Any]:
         """
         Calculate stats on the fly from transactions and rates
         """
-        # Get Real Rates
-        real_rates = db.get_latest_rates()
-        ticker_data = {}
-        
-        if real_rates:
-            ticker_data = {
-                "global_rate": f"{real_rates.get('usd_binance_sell', 0):.2f} VES", 
-                "bcv_usd": real_rates.get('usd_bcv', 0),
-                "bcv_eur": real_rates.get('eur_bcv', 0),
-                "binance_buy": real_rates.get('usd_binance_buy', 0),
-                "binance_sell": real_rates.get('usd_binance_sell', 0),
-                "zelle": real_rates.get('usd_binance_sell', 0) # Placeholder for Zelle
-            }
-        else:
-             # Fallback default
-             ticker_data = {
-                "global_rate": "0.00 VES",
-                "bcv_usd": 0,
-                "bcv_eur": 0,
-                "binance_buy": 0,
-                "binance_sell": 0,
-                "zelle": 0
-            }
+        # Rates come from the in-memory snapshot (refreshed in the background)
+        ticker_data = ticker_from_rates(await rate_provider.get_rates())
 
         # TODO: Connect with Transaction Module to get real volume/profit
         # For now, returning placeholder structure consistent with frontend expectations
@@ -1,10 +1,95 @@
-from fastapi import APIRouter
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.shared.database.async_session import get_async_db
 from src.dashboard.application.service import DashboardService
 from src.dashboard.domain.schemas import DashboardStats
+from src.shared.infrastructure.replication import supabase_replicator
+from src.shared.infrastructure.rate_provider import rate_provider
+from src.shared.infrastructure.rate_history import series, ohlc
+from src.shared.infrastructure.events import event_broker
+from src.shared.infrastructure.response_cache import response_cache
 
 router = APIRouter()
 service = DashboardService()
 
 @router.get("/", response_model=DashboardStats)
-def get_dashboard_stats():
-    return service.get_stats()
+async def get_dashboard_stats(request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def compute():
+        try:
+            return await service.compute_stats(db), {}
+        except Exception as e:
+            print(f"Error fetching stats: {e}")
+            # Shown, but never cached: the next poll retries
+            return service.fallback_stats(), {"Cache-Control": "no-store"}
+    # Cached until the next ledger write; the ticker refreshes within the cache TTL
+    return await response_cache.respond(request, compute, response_model=DashboardStats)
+
+@router.get("/stream")
+async def stream_dashboard_events(request: Request, last_event_id: Optional[str] = Header(None)):
+    """
+    Server-Sent Events push channel: transaction.created, transactions.imported,
+    pending.changed and rate.tick deltas. Reconnects send Last-Event-ID to replay
+    recently missed events.
+    """
+    return StreamingResponse(
+        event_broker.stream(last_event_id, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/rates")
+async def get_latest_rates():
+    """
+    Latest exchange rates from the in-memory snapshot, with its age and freshness.
+    """
+    return {"rates": await rate_provider.get_rates(), **rate_provider.status()}
+
+@router.get("/rates/history")
+async def get_rate_history(
+    pair: str = "USD/VES",
+    source: str = "bcv",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Raw rate points of one series (pair + source) in [start, end), oldest first.
+    """
+    points = await db.run_sync(lambda s: series(s, pair, source, start, end, limit))
+    return [{"captured_at": captured_at, "rate": rate} for captured_at, rate in points]
+
+@router.get("/rates/ohlc")
+async def get_rate_ohlc(
+    pair: str = "USD/VES",
+    source: str = "bcv",
+    bucket: str = "hour",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Open/high/low/close candles per hour or day bucket.
+    """
+    try:
+        return await db.run_sync(lambda s: ohlc(s, pair, source, bucket, start, end))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/replication")
+async def get_replication_status():
+    """
+    Supabase replication backlog and lag (age of the oldest pending write).
+    """
+    return await run_in_threadpool(supabase_replicator.metrics)
+
+@router.get("/cache/stats")
+async def get_response_cache_stats():
+    """
+    Hit/miss/304 counters for the GET response cache.
+    """
+    return response_cache.stats()
@@ -1,13 +1,14 @@
-from sqlalchemy.orm import Session
-from app.core.database_sb import SessionLocal
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.shared.database.async_session import session_scope
 from app.models.finance import Account, CashSession
 from src.finance.domain.schemas import AccountDTO, SessionDTO
 
 class FinanceRepository:
-    def get_accounts(self) -> list[AccountDTO]:
-        db = SessionLocal()
-        try:
-            accounts = db.query(Account).all()
+    async def get_accounts(self, db: Optional[AsyncSession] = None) -> list[AccountDTO]:
+        async with session_scope(db) as session:
+            accounts = (await session.execute(select(Account))).scalars().all()
             return [
                 AccountDTO(
                     id=acc.id,
@@ -18,13 +19,10 @@ class FinanceRepository:
                     branch_id=acc.branch_id or "MAIN"
                 ) for acc in accounts
             ]
-        finally:
-            db.close()
 
-    def get_sessions(self) -> list[SessionDTO]:
-        db = SessionLocal()
-        try:
-            sessions = db.query(CashSession).all()
+    async def get_sessions(self, db: Optional[AsyncSession] = None) -> list[SessionDTO]:
+        async with session_scope(db) as session:
+            sessions = (await session.execute(select(CashSession))).scalars().all()
             return [
                 SessionDTO(
                     id=s.id,
@@ -34,7 +32,5 @@ class FinanceRepository:
                     current_balance=float(s.current_balance or 0)
                 ) for s in sessions
             ]
-        finally:
-            db.close()
 
 finance_repo = FinanceRepository()
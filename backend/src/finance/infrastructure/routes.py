@@ -1,14 +1,19 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Request
 from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.shared.database.async_session import get_async_db
 from src.finance.infrastructure.repository import finance_repo
 from src.finance.domain.schemas import AccountDTO, SessionDTO
+from src.shared.infrastructure.response_cache import response_cache
 
 router = APIRouter()
 
 @router.get("/accounts", response_model=List[AccountDTO])
-async def get_accounts():
-    return finance_repo.get_accounts()
+async def get_accounts(request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def compute():
+        return await finance_repo.get_accounts(db), {}
+    return await response_cache.respond(request, compute, response_model=List[AccountDTO])
 
 @router.get("/sessions", response_model=List[SessionDTO])
-async def get_sessions():
-    return finance_repo.get_sessions()
+async def get_sessions(db: AsyncSession = Depends(get_async_db)):
+    return await finance_repo.get_sessions(db)
@@ -0,0 +1,157 @@
+import asyncio
+import json
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from src.shared.config.settings import settings
+from src.shared.config.logger import logger
+from src.scanner.application.scanner_service import GeminiScannerService, scanner_service
+from src.scanner.domain.jobs import ScanJobModel, ScanJobResponse, ScanJobStatus
+from src.scanner.infrastructure.job_repository import ScanJobRepository
+
+
+class CallbackUrlError(ValueError):
+    """callback_url is not an https URL on SCAN_JOB_CALLBACK_ALLOWED_HOSTS."""
+
+
+def validate_callback_url(callback_url: str) -> str:
+    """
+    Results carry parsed financial data, so they are only POSTed to https
+    hosts on the configured allowlist (no loopback/internal targets).
+    """
+    try:
+        parts = urlsplit(callback_url)
+        host = (parts.hostname or "").lower()
+        parts.port # Raises on a malformed port
+    except ValueError:
+        raise CallbackUrlError("Invalid callback_url")
+    if parts.scheme != "https" or not host or parts.username or parts.password:
+        raise CallbackUrlError("callback_url must be an https URL without credentials")
+    allowed = {h.lower() for h in settings.SCAN_JOB_CALLBACK_ALLOWED_HOSTS}
+    if host not in allowed:
+        raise CallbackUrlError(f"callback_url host not allowed: {host}")
+    return callback_url
+
+
+class ScanJobQueue:
+    """
+    Asynchronous scan mode: submit() persists the upload and returns a job id
+    at once, a pool of worker tasks drains the queue through the scanner
+    service, and results are read back by polling or POSTed to a callback URL.
+    Jobs live in SQLite, so anything pending or interrupted is picked up again
+    when the process restarts (up to SCAN_JOB_MAX_ATTEMPTS claims per job).
+    The SQLite repository is synchronous, so every call to it runs in a
+    worker thread instead of blocking the event loop.
+    """
+
+    def __init__(self, scanner: GeminiScannerService, repository: Optional[ScanJobRepository] = None):
+        self.scanner = scanner
+        self.repository = repository or ScanJobRepository()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+
+    @property
+    def worker_count(self) -> int:
+        return max(1, len(self.scanner.key_pool)) * settings.GEMINI_SCANNER_CONCURRENCY_PER_KEY
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        requeued = await asyncio.to_thread(
+            self.repository.requeue_interrupted, settings.SCAN_JOB_STALE_SECONDS, settings.SCAN_JOB_MAX_ATTEMPTS
+        )
+        pending = await asyncio.to_thread(self.repository.pending_ids)
+        for job_id in pending:
+            self._queue.put_nowait(job_id)
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.worker_count)]
+        logger.info(f"Scan job queue started: {len(self._workers)} workers, {len(pending)} pending ({requeued} requeued)")
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, file_content: bytes, filename: str, content_type: str,
+                     callback_url: Optional[str] = None) -> str:
+        # Reject bad uploads and callback targets synchronously instead of failing the job later
+        if callback_url:
+            validate_callback_url(callback_url)
+        await self.scanner.validator.validate(file_content, filename, content_type)
+        job_id = await asyncio.to_thread(self.repository.create, file_content, filename, content_type, callback_url)
+        self._queue.put_nowait(job_id)
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[ScanJobResponse]:
+        job = await asyncio.to_thread(self.repository.get, job_id)
+        if job is None:
+            return None
+        return self._to_response(job)
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self.process(job_id)
+            except Exception as e:
+                logger.error(f"Scan job worker {index} crashed on {job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def process(self, job_id: str) -> None:
+        job = await asyncio.to_thread(self.repository.claim, job_id)
+        if job is None:
+            return # Already taken by another worker/process
+
+        try:
+            receipt = await self.scanner.scan_receipt(job.content, job.filename, job.content_type)
+            await asyncio.to_thread(self.repository.finish, job_id, result=receipt.model_dump(mode="json"))
+        except Exception as e:
+            logger.warning(f"Scan job {job_id} failed: {e}")
+            await asyncio.to_thread(self.repository.finish, job_id, error=str(e))
+
+        if job.callback_url:
+            await self._send_callback(job_id, job.callback_url)
+
+    async def _send_callback(self, job_id: str, callback_url: str) -> None:
+        try:
+            validate_callback_url(callback_url) # Allowlist may have changed since submit
+        except CallbackUrlError as e:
+            logger.warning(f"Callback for scan job {job_id} skipped: {e}")
+            await asyncio.to_thread(self.repository.set_callback_status, job_id, "rejected")
+            return
+        payload = (await self.get(job_id)).model_dump(mode="json")
+        last_error = None
+        async with httpx.AsyncClient(timeout=settings.SCAN_JOB_CALLBACK_TIMEOUT_SECONDS) as client:
+            for attempt in range(settings.SCAN_JOB_CALLBACK_RETRIES + 1):
+                try:
+                    response = await client.post(callback_url, json=payload)
+                    if response.status_code < 500:
+                        await asyncio.to_thread(self.repository.set_callback_status, job_id, str(response.status_code))
+                        return
+                    last_error = f"HTTP {response.status_code}"
+                except httpx.HTTPError as e:
+                    last_error = str(e)
+                if attempt < settings.SCAN_JOB_CALLBACK_RETRIES:
+                    await asyncio.sleep(2 ** attempt)
+        logger.warning(f"Callback for scan job {job_id} failed: {last_error}")
+        await asyncio.to_thread(self.repository.set_callback_status, job_id, f"error: {last_error}")
+
+    @staticmethod
+    def _to_response(job: ScanJobModel) -> ScanJobResponse:
+        return ScanJobResponse(
+            job_id=job.id,
+            status=ScanJobStatus(job.status),
+            filename=job.filename,
+            created_at=job.created_at,
+            finished_at=job.finished_at,
+            result=json.loads(job.result_json) if job.result_json else None,
+            error=job.error,
+            callback_status=job.callback_status
+        )
+
+
+# Singleton
+scan_job_queue = ScanJobQueue(scanner_service)
@@ -0,0 +1,154 @@
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from src.shared.config.settings import settings
+from src.shared.config.logger import logger
+
+
+class KeyPoolExhaustedError(RuntimeError):
+    """Raised when no API key has budget left within the wait timeout."""
+    pass
+
+
+@dataclass
+class KeyState:
+    key: str
+    tokens: float
+    last_refill: float
+    cooldown_until: float = 0.0
+    in_flight: int = 0
+    rate_limited_count: int = 0
+
+    @property
+    def masked(self) -> str:
+        return f"{self.key[:5]}...{self.key[-4:]}"
+
+
+class ApiKeyPool:
+    """
+    Token-bucket scheduler over the configured Gemini API keys.
+
+    Every key gets its own bucket (`requests_per_minute` tokens, refilled
+    continuously). `acquire` hands out the key with the most remaining budget,
+    skipping keys cooling down after a 429. Keys are returned to the caller
+    instead of being installed globally, so concurrent requests never switch
+    each other's key.
+    """
+
+    def __init__(
+        self,
+        keys: List[str],
+        requests_per_minute: Optional[int] = None,
+        cooldown_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.capacity = float(requests_per_minute or settings.GEMINI_KEY_REQUESTS_PER_MINUTE)
+        self.refill_per_second = self.capacity / 60.0
+        self.cooldown_seconds = cooldown_seconds if cooldown_seconds is not None else settings.GEMINI_KEY_COOLDOWN_SECONDS
+        self._clock = clock
+        self._lock = threading.Lock()
+        now = clock()
+        # dict.fromkeys drops duplicated keys while keeping file order
+        self._states = [KeyState(key=k, tokens=self.capacity, last_refill=now) for k in dict.fromkeys(keys)]
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def keys(self) -> List[str]:
+        return [state.key for state in self._states]
+
+    def _refill(self, state: KeyState, now: float) -> None:
+        elapsed = now - state.last_refill
+        state.tokens = min(self.capacity, state.tokens + elapsed * self.refill_per_second)
+        state.last_refill = now
+
+    def try_acquire(self) -> Optional[str]:
+        """Takes one token from the best available key, or returns None."""
+        with self._lock:
+            now = self._clock()
+            best = None
+            for state in self._states:
+                self._refill(state, now)
+                if state.cooldown_until > now or state.tokens < 1:
+                    continue
+                if best is None or (state.tokens, -state.in_flight) > (best.tokens, -best.in_flight):
+                    best = state
+            if best is None:
+                return None
+            best.tokens -= 1
+            best.in_flight += 1
+            return best.key
+
+    def next_available_in(self) -> float:
+        """Seconds until some key will have a token again."""
+        with self._lock:
+            now = self._clock()
+            waits = []
+            for state in self._states:
+                self._refill(state, now)
+                refill_wait = max(0.0, (1 - state.tokens) / self.refill_per_second)
+                waits.append(max(refill_wait, state.cooldown_until - now))
+            return min(waits) if waits else float("inf")
+
+    async def acquire(self, timeout: Optional[float] = None) -> str:
+        """Waits (up to `timeout` seconds) for a key with budget."""
+        if not self._states:
+            raise KeyPoolExhaustedError("No Gemini API Keys configured")
+        timeout = settings.GEMINI_KEY_ACQUIRE_TIMEOUT_SECONDS if timeout is None else timeout
+        deadline = self._clock() + timeout
+        while True:
+            key = self.try_acquire()
+            if key is not None:
+                return key
+            wait = self.next_available_in()
+            remaining = deadline - self._clock()
+            if wait > remaining:
+                raise KeyPoolExhaustedError(
+                    f"All {len(self._states)} API keys exhausted; next slot in {wait:.1f}s"
+                )
+            await asyncio.sleep(max(wait, 0.05))
+
+    def _state(self, key: str) -> Optional[KeyState]:
+        for state in self._states:
+            if state.key == key:
+                return state
+        return None
+
+    def release(self, key: str) -> None:
+        """Marks a request made with `key` as finished (success or non-quota error)."""
+        with self._lock:
+            state = self._state(key)
+            if state and state.in_flight > 0:
+                state.in_flight -= 1
+
+    def report_rate_limited(self, key: str, retry_after: Optional[float] = None) -> None:
+        """Puts `key` on cooldown after a 429 / quota error and empties its bucket."""
+        with self._lock:
+            state = self._state(key)
+            if state is None:
+                return
+            if state.in_flight > 0:
+                state.in_flight -= 1
+            state.tokens = 0.0
+            state.rate_limited_count += 1
+            state.cooldown_until = self._clock() + (retry_after or self.cooldown_seconds)
+            logger.info(f"API key {state.masked} rate limited, cooling down {retry_after or self.cooldown_seconds}s")
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Per-key budget for diagnostics (keys masked)."""
+        with self._lock:
+            now = self._clock()
+            result = []
+            for state in self._states:
+                self._refill(state, now)
+                result.append({
+                    "key": state.masked,
+                    "tokens": round(state.tokens, 2),
+                    "in_flight": state.in_flight,
+                    "cooldown_remaining": round(max(0.0, state.cooldown_until - now), 1),
+                    "rate_limited_count": state.rate_limited_count
+                })
+            return result
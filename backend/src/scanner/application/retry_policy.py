@@ -0,0 +1,127 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+from src.shared.config.settings import settings
+from src.shared.config.logger import logger
+
+# Error classes returned by RetryPolicy.classify
+RATE_LIMITED = "rate_limited"   # 429 / quota: cool the key down, try another
+KEY_REJECTED = "key_rejected"   # 401 / 403: key invalid or revoked, try another
+RETRYABLE = "retryable"         # 5xx, timeouts, connection resets
+FATAL = "fatal"                 # bad request, unparseable input: do not retry
+
+_RETRYABLE_STATUS = {408, 500, 502, 503, 504}
+_KEY_STATUS = {401, 403}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling Gemini while the circuit breaker is open."""
+    pass
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, bounded by a per-request deadline.
+    """
+
+    def __init__(
+        self,
+        max_retries: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        deadline_seconds: Optional[float] = None
+    ):
+        self.max_retries = settings.GEMINI_SCANNER_MAX_RETRIES if max_retries is None else max_retries
+        self.base_delay = settings.GEMINI_RETRY_BASE_DELAY_SECONDS if base_delay is None else base_delay
+        self.max_delay = settings.GEMINI_RETRY_MAX_DELAY_SECONDS if max_delay is None else max_delay
+        self.deadline_seconds = settings.GEMINI_SCANNER_DEADLINE_SECONDS if deadline_seconds is None else deadline_seconds
+
+    def backoff(self, attempt: int) -> float:
+        """Sleep before retry number `attempt` (0-based): uniform(0, min(max, base * 2^attempt))."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    @staticmethod
+    def classify(error: Exception) -> str:
+        code = getattr(error, "code", None)
+        if isinstance(code, int):
+            if code == 429:
+                return RATE_LIMITED
+            if code in _KEY_STATUS:
+                return KEY_REJECTED
+            if code in _RETRYABLE_STATUS:
+                return RETRYABLE
+            return FATAL
+
+        if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+            return RETRYABLE
+
+        message = str(error).lower()
+        if "429" in message or "quota" in message or "resource_exhausted" in message:
+            return RATE_LIMITED
+        if "api key" in message or "permission_denied" in message:
+            return KEY_REJECTED
+        if "unavailable" in message or "deadline" in message or "timeout" in message:
+            return RETRYABLE
+        return FATAL
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive exhaustion failures (every key
+    rate limited / pool empty) and rejects calls for `reset_timeout` seconds.
+    After that a single trial call is let through (half-open); success closes it.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold or settings.GEMINI_CIRCUIT_FAILURE_THRESHOLD
+        self.reset_timeout = settings.GEMINI_CIRCUIT_RESET_SECONDS if reset_timeout is None else reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self._clock() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        with self._lock:
+            state = self.state
+            if state == "open" or (state == "half_open" and self._trial_in_flight):
+                remaining = self.reset_timeout - (self._clock() - self.opened_at)
+                raise CircuitOpenError(f"Gemini circuit open: all API keys exhausted, retry in {max(remaining, 0):.0f}s")
+            if state == "half_open":
+                self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = self._clock()
+                logger.error(f"Gemini circuit opened after {self.failures} exhaustion failures")
+
+    def release_trial(self) -> None:
+        """Ends a half-open trial that failed for reasons unrelated to key exhaustion."""
+        with self._lock:
+            self._trial_in_flight = False
+
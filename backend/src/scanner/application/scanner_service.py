@@ -1,6 +1,7 @@
-import google.generativeai as genai
-from typing import Dict, Any, List
+from google.genai import types
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
 import json
+import time
 import asyncio
 from datetime import datetime
 
@@ -11,16 +12,21 @@ from src.shared.config.prompts import GEMINI_SYSTEM_PROMPT
 from src.transactions.domain.transaction import Transaction 
 from src.scanner.application.parsers import GeminiResponseParser, ReceiptDataMapper
 from src.scanner.application.validators import ImageFileValidator
+from src.scanner.application.key_pool import ApiKeyPool, KeyPoolExhaustedError
+from src.scanner.application.retry_policy import RetryPolicy, CircuitBreaker, RATE_LIMITED, KEY_REJECTED, FATAL
+from src.scanner.application.preprocessor import ImagePreprocessor
+from src.shared.infrastructure.genai_pool import genai_pool
+from app.cache.manager import CacheManager
+from app.cache.storage import build_cache_storage
+from app.cache.similarity import PerceptualHashIndex
 
 class GeminiScannerService:
     """
     Application Service for scanning receipts using Gemini AI.
-    Orchestrates the flow: Validate -> Send to AI -> Parse -> Map -> Return Transaction
+    Orchestrates the flow: Validate -> Cache lookup -> Send to AI -> Parse -> Map -> Return Transaction
     """
     def __init__(self):
-        # Load keys FIRST so configure_genai works
         self.api_keys = settings.parsed_api_keys
-        self.current_key_index = 0
         
         # Check if using default key
         if not self.api_keys:
@@ -28,40 +34,25 @@ class GeminiScannerService:
         elif "your-key-here" in self.api_keys:
             logger.warning("⚠️ USING DEFAULT PLACEHOLDER API KEY. SCANNING WILL FAIL.")
 
-        if self.api_keys:
-            self._configure_genai()
+        # Per-key rate budgets; each call gets its own key (no global genai.configure)
+        self.key_pool = ApiKeyPool(self.api_keys)
+        self.model_pool = genai_pool
+        self.retry_policy = RetryPolicy()
+        self.circuit_breaker = CircuitBreaker()
         
         self.validator = ImageFileValidator(
             max_size_mb=settings.GEMINI_SCANNER_MAX_FILE_SIZE_MB,
             allowed_types=settings.GEMINI_SCANNER_ALLOWED_MIME_TYPES
         )
+        self.preprocessor = ImagePreprocessor()
         self.parser = GeminiResponseParser()
         self.mapper = ReceiptDataMapper()
-
-    def _configure_genai(self):
-        """Configures the GenAI client with the current key"""
-        try:
-            current_key = self._get_next_key()
-            if not current_key or "your-key-here" in current_key:
-                # logger.error(f"❌ INVALID API KEY")
-                # raise ValueError("Invalid API Key configuration")
-                pass # Don't crash in init
-            
-            masked_key = f"{current_key[:5]}...{current_key[-4:]}"
-            logger.info(f"🔄 Configuring GenAI with key: {masked_key}")
-            
-            genai.configure(api_key=current_key)
-        except Exception as e:
-            logger.error(f"Failed to configure GenAI: {e}")
-            # raise # Don't crash logic yet
-
-    def _get_next_key(self) -> str:
-        """Simple strategy to rotate API key"""
-        if not self.api_keys:
-            return ""
-        key = self.api_keys[self.current_key_index]
-        self.current_key_index = (self.current_key_index + 1) % len(self.api_keys)
-        return key
+        # Content-addressed cache: identical uploads skip the Gemini round trip
+        self.cache = CacheManager(
+            storage=build_cache_storage(),
+            namespace="scanner",
+            similarity_index=PerceptualHashIndex() if settings.GEMINI_SCANNER_NEAR_DUPLICATE_ENABLED else None
+        )
 
     async def scan_receipt(self, file_content: bytes, filename: str, content_type: str) -> Transaction:
         """
@@ -72,60 +63,186 @@ class GeminiScannerService:
 
         # 1. Validate
         await self.validator.validate(file_content, filename, content_type)
+
+        # 2. Cache lookup (same screenshot forwarded twice)
+        if settings.GEMINI_SCANNER_CACHE_ENABLED:
+            cached = self.cache.get(file_content)
+            if cached is not None:
+                logger.info(f"Cache hit for receipt {filename}: {cached.reference_id}")
+                return cached.model_copy(deep=True)
+        
+        # 3. Downscale / re-encode before upload (cache keys stay on the original bytes)
+        upload_content, upload_type = file_content, content_type
+        if settings.GEMINI_SCANNER_PREPROCESS_ENABLED:
+            prepared = await asyncio.to_thread(self.preprocessor.process, file_content, content_type)
+            upload_content, upload_type = prepared.content, prepared.content_type
         
-        # 2. Process with AI (Retry logic included)
-        raw_response = await self._call_gemini_with_retry(file_content, content_type)
+        # 4. Process with AI (Retry logic included)
+        raw_response = await self._call_gemini_with_retry(upload_content, upload_type)
         
-        # 3. Parse Response
+        # 5. Parse Response
         parsed_data = self.parser.parse(raw_response)
         
-        # 4. Map to Domain (Using shared Transaction model)
+        # 6. Map to Domain (Using shared Transaction model)
         receipt = self.mapper.to_domain(parsed_data)
+
+        if settings.GEMINI_SCANNER_CACHE_ENABLED:
+            self.cache.set(file_content, receipt.model_copy(deep=True))
         
         logger.info(f"Successfully scanned receipt: {receipt.reference_id} from {receipt.platform}")
         return receipt
 
+    async def scan_batch(self, files: List[Tuple[bytes, str, str]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Scans many receipts concurrently and yields one result per file as soon
+        as it completes. Concurrency is bounded by the number of configured keys
+        so a batch cannot exhaust every key's quota at once.
+        Each file is (file_content, filename, content_type).
+        """
+        limit = max(1, len(self.key_pool)) * settings.GEMINI_SCANNER_CONCURRENCY_PER_KEY
+        semaphore = asyncio.Semaphore(limit)
+        logger.info(f"Batch scan of {len(files)} files with concurrency {limit}")
+
+        async def scan_one(index: int, file_content: bytes, filename: str, content_type: str) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    receipt = await self.scan_receipt(file_content, filename, content_type)
+                    return {"index": index, "filename": filename, "ok": True,
+                            "transaction": receipt.model_dump(mode="json")}
+                except Exception as e:
+                    logger.warning(f"Batch item {filename} failed: {e}")
+                    return {"index": index, "filename": filename, "ok": False, "error": str(e)}
+
+        tasks = [
+            asyncio.create_task(scan_one(i, content, name, ctype))
+            for i, (content, name, ctype) in enumerate(files)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Client disconnected mid-stream: stop pending work
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _generation_config() -> Dict[str, Any]:
+        return {
+            "temperature": settings.GEMINI_SCANNER_TEMPERATURE,
+            "max_output_tokens": settings.GEMINI_SCANNER_MAX_OUTPUT_TOKENS
+        }
+
+    def warm_up(self) -> None:
+        """Pre-builds one pooled model per API key so the first scan skips client setup."""
+        self.model_pool.warm_up(self.key_pool.keys(), settings.GEMINI_SCANNER_MODEL_NAME, **self._generation_config())
+
     async def _call_gemini_with_retry(self, image_bytes: bytes, mime_type: str) -> str:
         """
-        Calls Gemini API with manual retry on Quota Exceeded or Auth Errors.
+        Calls Gemini with exponential backoff + jitter inside a per-request deadline.
+        Quota / auth errors cool the offending key down and retry with another one,
+        fatal errors are raised immediately, and repeated key exhaustion opens the
+        circuit breaker so later requests fail fast instead of burning quota.
         """
-        retries = 0
-        max_retries = settings.GEMINI_SCANNER_MAX_RETRIES
-        
-        while retries <= max_retries:
-            try:
-                model_name = settings.GEMINI_SCANNER_MODEL_NAME
-                logger.info(f"🤖 Creating GenerativeModel with name: {model_name}")
-                model = genai.GenerativeModel(model_name)
-                
-                response = await asyncio.to_thread(
-                    model.generate_content,
-                    contents=[
-                        GEMINI_SYSTEM_PROMPT,
-                        {"mime_type": mime_type, "data": image_bytes}
-                    ],
-                    generation_config={
-                        "temperature": settings.GEMINI_SCANNER_TEMPERATURE,
-                        "max_output_tokens": settings.GEMINI_SCANNER_MAX_OUTPUT_TOKENS
-                    }
-                )
-                
+        self.circuit_breaker.before_call()
+        policy = self.retry_policy
+        deadline = time.monotonic() + policy.deadline_seconds
+        attempt = 0
+
+        try:
+            while True:
+                remaining = max(deadline - time.monotonic(), 0.0)
+                try:
+                    key = await self.key_pool.acquire(
+                        timeout=min(remaining, settings.GEMINI_KEY_ACQUIRE_TIMEOUT_SECONDS)
+                    )
+                except KeyPoolExhaustedError as e:
+                    # Running out of our own deadline says nothing about the keys
+                    if remaining <= 0 or time.monotonic() >= deadline:
+                        self.circuit_breaker.release_trial()
+                        raise TimeoutError(f"Gemini request exceeded {policy.deadline_seconds:.0f}s deadline") from e
+                    self.circuit_breaker.record_failure()
+                    raise
+
+                try:
+                    model = self.model_pool.get(key, settings.GEMINI_SCANNER_MODEL_NAME, **self._generation_config())
+                    response = await asyncio.wait_for(
+                        model.generate([
+                            GEMINI_SYSTEM_PROMPT,
+                            types.Part.from_bytes(data=image_bytes, mime_type=mime_type)
+                        ]),
+                        timeout=max(deadline - time.monotonic(), 0.1)
+                    )
+                except asyncio.CancelledError:
+                    self.key_pool.release(key)
+                    raise
+                except Exception as e:
+                    kind = policy.classify(e)
+                    logger.warning(f"Gemini API Error (Attempt {attempt+1}/{policy.max_retries+1}, {kind}): {str(e)}")
+
+                    if kind == RATE_LIMITED:
+                        self.key_pool.report_rate_limited(key)
+                    elif kind == KEY_REJECTED:
+                        self.key_pool.report_rate_limited(key, retry_after=settings.GEMINI_KEY_REJECTED_COOLDOWN_SECONDS)
+                    else:
+                        self.key_pool.release(key)
+
+                    if kind == FATAL or attempt >= policy.max_retries:
+                        logger.error("Giving up on Gemini API call")
+                        self.circuit_breaker.release_trial()
+                        raise e
+
+                    delay = policy.backoff(attempt)
+                    attempt += 1
+                    if time.monotonic() + delay >= deadline:
+                        self.circuit_breaker.release_trial()
+                        raise TimeoutError(f"Gemini request exceeded {policy.deadline_seconds:.0f}s deadline") from e
+                    await asyncio.sleep(delay)
+                    continue
+
+                self.key_pool.release(key)
+                self.circuit_breaker.record_success()
                 return response.text
+        except asyncio.CancelledError:
+            # A disconnected client or stopped worker must not leave a half-open trial stuck
+            self.circuit_breaker.release_trial()
+            raise
 
-            except Exception as e:
-                logger.warning(f"Gemini API Error (Attempt {retries+1}/{max_retries}): {str(e)}")
-                retries += 1
-                
-                # Rotate key on error
-                if "429" in str(e) or "quota" in str(e).lower():
-                    logger.info("Rotating API key due to quota/rate limit...")
-                    self._configure_genai()
-                
-                if retries > max_retries:
-                    logger.error("Max retries exceeded for Gemini API")
-                    raise e
-        
-        raise RuntimeError("Unreachable code")
+    def find_similar(self, file_content: bytes, reference_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Looks up an already scanned receipt that looks like this one.
+        Receipts from the same bank template hash alike, so a match is only
+        "visually similar"; it is reported as a duplicate only when the
+        caller's reference_id equals the previous result's.
+        """
+        match = self.cache.find_near_duplicate(file_content)
+        if match is None:
+            return None
+        key, distance = match
+        previous = self.cache.storage.get(key)
+        if previous is None:
+            return None
+        duplicate = bool(reference_id) and reference_id.strip() == (previous.reference_id or "").strip()
+        if duplicate:
+            logger.warning(f"Duplicate submission of receipt {previous.reference_id} (distance={distance})")
+        return {
+            "reference_id": previous.reference_id,
+            "platform": previous.platform,
+            "amount": previous.amount,
+            "distance": distance,
+            "duplicate": duplicate
+        }
+
+    def get_key_pool_status(self) -> List[Dict[str, Any]]:
+        """Remaining budget and cooldown per API key (masked)."""
+        return self.key_pool.snapshot()
+
+    def get_preprocess_stats(self) -> Dict[str, Any]:
+        """Bytes and estimated upload time saved by image preprocessing."""
+        return self.preprocessor.stats()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the scan result cache."""
+        return self.cache.stats()
 
 # Singleton
 scanner_service = GeminiScannerService()
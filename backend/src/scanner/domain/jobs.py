@@ -0,0 +1,52 @@
+from sqlalchemy import Column, String, DateTime, Text, LargeBinary, Integer
+from pydantic import BaseModel
+from datetime import datetime
+from enum import Enum
+from typing import Optional, Any, Dict
+import uuid
+from src.scanner.infrastructure.database import BaseJobs
+
+class ScanJobStatus(str, Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+# --- SQLAlchemy Models ---
+
+class ScanJobModel(BaseJobs):
+    __tablename__ = "scan_jobs"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    status = Column(String(20), nullable=False, default=ScanJobStatus.PENDING.value, index=True)
+
+    filename = Column(String(255))
+    content_type = Column(String(100))
+    content = Column(LargeBinary, nullable=True) # Dropped once the job finishes
+
+    callback_url = Column(String(500), nullable=True)
+    callback_status = Column(String(50), nullable=True) # "200", "error: ...", None = not sent
+
+    attempts = Column(Integer, default=0)
+    result_json = Column(Text, nullable=True) # Serialized Transaction
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+# --- Pydantic Schemas ---
+
+class ScanJobSubmitted(BaseModel):
+    job_id: str
+    status: ScanJobStatus
+
+class ScanJobResponse(BaseModel):
+    job_id: str
+    status: ScanJobStatus
+    filename: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    callback_status: Optional[str] = None
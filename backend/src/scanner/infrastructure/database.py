@@ -0,0 +1,13 @@
+from app.core.sqlite_engine import create_db_engine
+from sqlalchemy.orm import sessionmaker, declarative_base
+
+# Separate SQLite database for the scan job queue (survives restarts)
+SQLALCHEMY_DATABASE_URL = "sqlite:///./scan_jobs.db"
+
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
+SessionLocalJobs = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+BaseJobs = declarative_base()
+
+def init_jobs_db():
+    BaseJobs.metadata.create_all(bind=engine)
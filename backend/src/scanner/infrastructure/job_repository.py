@@ -0,0 +1,130 @@
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+
+from src.scanner.infrastructure.database import SessionLocalJobs, BaseJobs
+from src.scanner.domain.jobs import ScanJobModel, ScanJobStatus
+
+
+class ScanJobRepository:
+    """SQLite persistence for queued scan jobs."""
+
+    def __init__(self, session_factory=SessionLocalJobs):
+        self.SessionLocal = session_factory
+        BaseJobs.metadata.create_all(bind=session_factory.kw["bind"])
+
+    def create(self, content: bytes, filename: str, content_type: str, callback_url: Optional[str]) -> str:
+        db = self.SessionLocal()
+        try:
+            job = ScanJobModel(
+                content=content,
+                filename=filename,
+                content_type=content_type,
+                callback_url=callback_url,
+                status=ScanJobStatus.PENDING.value
+            )
+            db.add(job)
+            db.commit()
+            return job.id
+        finally:
+            db.close()
+
+    def claim(self, job_id: str) -> Optional[ScanJobModel]:
+        """
+        Atomically moves a PENDING job to RUNNING and returns it.
+        Returns None if another worker (or process) already claimed it.
+        """
+        db = self.SessionLocal()
+        try:
+            claimed = db.query(ScanJobModel).filter(
+                ScanJobModel.id == job_id,
+                ScanJobModel.status == ScanJobStatus.PENDING.value
+            ).update({
+                "status": ScanJobStatus.RUNNING.value,
+                "started_at": datetime.utcnow(),
+                "attempts": ScanJobModel.attempts + 1
+            }, synchronize_session=False)
+            db.commit()
+            if not claimed:
+                return None
+            job = db.get(ScanJobModel, job_id)
+            db.expunge(job)
+            return job
+        finally:
+            db.close()
+
+    def finish(self, job_id: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        db = self.SessionLocal()
+        try:
+            db.query(ScanJobModel).filter(ScanJobModel.id == job_id).update({
+                "status": ScanJobStatus.FAILED.value if error else ScanJobStatus.DONE.value,
+                "result_json": json.dumps(result) if result is not None else None,
+                "error": error,
+                "content": None,
+                "finished_at": datetime.utcnow()
+            }, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def set_callback_status(self, job_id: str, status: str) -> None:
+        db = self.SessionLocal()
+        try:
+            db.query(ScanJobModel).filter(ScanJobModel.id == job_id).update(
+                {"callback_status": status[:50]}, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def get(self, job_id: str) -> Optional[ScanJobModel]:
+        db = self.SessionLocal()
+        try:
+            job = db.get(ScanJobModel, job_id)
+            if job is not None:
+                db.expunge(job)
+            return job
+        finally:
+            db.close()
+
+    def requeue_interrupted(self, stale_after_seconds: float, max_attempts: int) -> int:
+        """
+        Jobs left RUNNING by a crash or restart go back to PENDING.
+        Only jobs older than `stale_after_seconds` are touched so a sibling
+        worker process that is still scanning keeps its job. Jobs already
+        claimed `max_attempts` times are failed instead, so a receipt that
+        takes the worker down is not retried on every restart.
+        """
+        db = self.SessionLocal()
+        try:
+            now = datetime.utcnow()
+            stale = db.query(ScanJobModel).filter(
+                ScanJobModel.status == ScanJobStatus.RUNNING.value,
+                ScanJobModel.started_at < now - timedelta(seconds=stale_after_seconds)
+            )
+            attempts = func.coalesce(ScanJobModel.attempts, 0)
+            stale.filter(attempts >= max_attempts).update({
+                "status": ScanJobStatus.FAILED.value,
+                "error": f"Interrupted {max_attempts} times; giving up",
+                "content": None,
+                "finished_at": now
+            }, synchronize_session=False)
+            count = stale.filter(attempts < max_attempts).update(
+                {"status": ScanJobStatus.PENDING.value}, synchronize_session=False
+            )
+            db.commit()
+            return count
+        finally:
+            db.close()
+
+    def pending_ids(self) -> List[str]:
+        db = self.SessionLocal()
+        try:
+            rows = db.query(ScanJobModel.id).filter(
+                ScanJobModel.status == ScanJobStatus.PENDING.value
+            ).order_by(ScanJobModel.created_at.asc()).all()
+            return [row[0] for row in rows]
+        finally:
+            db.close()
@@ -1,9 +1,31 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+import json
+from typing import Optional
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from src.shared.config.settings import settings
 from src.scanner.application.scanner_service import scanner_service
+from src.scanner.application.key_pool import KeyPoolExhaustedError
+from src.scanner.application.retry_policy import CircuitOpenError
+from src.scanner.application.job_queue import scan_job_queue, CallbackUrlError
+from src.scanner.domain.jobs import ScanJobSubmitted, ScanJobResponse, ScanJobStatus
 from src.transactions.domain.transaction import Transaction
 
 router = APIRouter()
 
+def _capped_receive(receive, max_bytes: int):
+    """ASGI receive that fails with 413 once the request body passes `max_bytes`."""
+    received = 0
+
+    async def capped():
+        nonlocal received
+        message = await receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > max_bytes:
+                raise HTTPException(status_code=413, detail=f"Batch exceeds {max_bytes} bytes")
+        return message
+    return capped
+
 @router.post("/", response_model=Transaction)
 async def scan_receipt(file: UploadFile = File(...)):
     """
@@ -17,9 +39,128 @@ async def scan_receipt(file: UploadFile = File(...)):
             content_type=file.content_type or "application/octet-stream"
         )
         return transaction
+    except (KeyPoolExhaustedError, CircuitOpenError) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except TimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         # Log error detallado
         print(f"Server Error in Scanner: {e}") 
         raise HTTPException(status_code=500, detail=f"Scanner Error: {str(e)}")
+
+@router.post("/batch")
+async def scan_receipts_batch(request: Request):
+    """
+    Scans many receipts in one request (multipart field `files`, repeated).
+    Streams one NDJSON line per file as each one completes:
+    {"index", "filename", "ok", "transaction" | "error"}
+    Batches over the file count, per-file or total size limits are rejected
+    while the body is read (chunked uploads included), before any scan runs.
+    """
+    max_files = settings.GEMINI_SCANNER_BATCH_MAX_FILES
+    max_file_bytes = scanner_service.validator.max_size_bytes
+    max_total_bytes = settings.GEMINI_SCANNER_BATCH_MAX_TOTAL_MB * 1024 * 1024
+
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > max_total_bytes:
+        raise HTTPException(status_code=413, detail=f"Batch too large: {declared} bytes (max {max_total_bytes})")
+    # Parsing stops with a 400 as soon as the file count passes the limit,
+    # and with a 413 once the streamed body passes the total size
+    capped = Request(request.scope, _capped_receive(request.receive, max_total_bytes))
+    form = await capped.form(max_files=max_files)
+    files = [item for item in form.getlist("files") if not isinstance(item, str)]
+    if not files:
+        raise HTTPException(status_code=422, detail="No files uploaded")
+
+    # Read everything up front (uploads are closed once the endpoint returns),
+    # never more than one byte past each file's limit
+    items, total = [], 0
+    for file in files:
+        if file.size is not None and file.size > max_file_bytes:
+            raise HTTPException(status_code=413, detail=f"File {file.filename} exceeds {max_file_bytes} bytes")
+        content = await file.read(max_file_bytes + 1)
+        total += len(content)
+        if len(content) > max_file_bytes:
+            raise HTTPException(status_code=413, detail=f"File {file.filename} exceeds {max_file_bytes} bytes")
+        if total > max_total_bytes:
+            raise HTTPException(status_code=413, detail=f"Batch exceeds {max_total_bytes} bytes")
+        items.append((
+            content,
+            file.filename or "unknown",
+            file.content_type or "application/octet-stream"
+        ))
+
+    async def stream():
+        async for result in scanner_service.scan_batch(items):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@router.post("/jobs", response_model=ScanJobSubmitted, status_code=202)
+async def submit_scan_job(file: UploadFile = File(...), callback_url: Optional[str] = Form(None)):
+    """
+    Queues a receipt for asynchronous scanning and returns a job id immediately.
+    Poll GET /jobs/{job_id} or pass callback_url to receive the result by POST
+    (https, host on SCAN_JOB_CALLBACK_ALLOWED_HOSTS; anything else is a 422).
+    """
+    try:
+        job_id = await scan_job_queue.submit(
+            file_content=await file.read(),
+            filename=file.filename or "unknown",
+            content_type=file.content_type or "application/octet-stream",
+            callback_url=callback_url
+        )
+    except CallbackUrlError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ScanJobSubmitted(job_id=job_id, status=ScanJobStatus.PENDING)
+
+@router.get("/jobs/{job_id}", response_model=ScanJobResponse)
+async def get_scan_job(job_id: str):
+    """
+    Returns the status of a queued scan and its result once finished.
+    """
+    job = await scan_job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/duplicate-check")
+async def check_duplicate(file: UploadFile = File(...), reference_id: Optional[str] = Form(None)):
+    """
+    Finds an already scanned receipt that looks like this upload
+    (same image re-compressed, resized or lightly cropped, or simply the
+    same bank template). It only counts as a duplicate when `reference_id`
+    matches the earlier receipt's reference.
+    """
+    content = await file.read()
+    match = scanner_service.find_similar(content, reference_id)
+    return {
+        "similar": match is not None,
+        "duplicate": bool(match and match["duplicate"]),
+        "match": match
+    }
+
+@router.get("/cache/stats")
+async def get_scan_cache_stats():
+    """
+    Returns hit/miss counters for the scan result cache.
+    """
+    return scanner_service.get_cache_stats()
+
+@router.get("/preprocess/stats")
+async def get_preprocess_stats():
+    """
+    Returns bytes and estimated upload latency saved by image preprocessing.
+    """
+    return scanner_service.get_preprocess_stats()
+
+@router.get("/keys/status")
+async def get_key_pool_status():
+    """
+    Returns remaining rate budget and cooldown per configured API key (masked).
+    """
+    return scanner_service.get_key_pool_status()
@@ -20,8 +20,47 @@ class Settings(BaseSettings):
     GEMINI_SCANNER_TEMPERATURE: float = 0.1
     GEMINI_SCANNER_MAX_OUTPUT_TOKENS: int = 1024
     GEMINI_SCANNER_MAX_RETRIES: int = 3
+    GEMINI_SCANNER_DEADLINE_SECONDS: float = 45.0
+    GEMINI_RETRY_BASE_DELAY_SECONDS: float = 0.5
+    GEMINI_RETRY_MAX_DELAY_SECONDS: float = 8.0
+    GEMINI_CIRCUIT_FAILURE_THRESHOLD: int = 3
+    GEMINI_CIRCUIT_RESET_SECONDS: float = 30.0
     GEMINI_SCANNER_MAX_FILE_SIZE_MB: int = 5
     GEMINI_SCANNER_ALLOWED_MIME_TYPES: list[str] = ["image/jpeg", "image/png", "image/webp", "application/pdf"]
+    GEMINI_SCANNER_CACHE_ENABLED: bool = True
+    GEMINI_SCANNER_NEAR_DUPLICATE_ENABLED: bool = True
+    GEMINI_SCANNER_BATCH_MAX_FILES: int = 200
+    GEMINI_SCANNER_BATCH_MAX_TOTAL_MB: int = 100
+    GEMINI_SCANNER_CONCURRENCY_PER_KEY: int = 1
+    GEMINI_SCANNER_PREPROCESS_ENABLED: bool = True
+    GEMINI_SCANNER_MAX_IMAGE_DIMENSION: int = 1600
+    GEMINI_SCANNER_IMAGE_FORMAT: str = "JPEG"  # JPEG or WEBP
+    GEMINI_SCANNER_IMAGE_QUALITY: int = 85
+    GEMINI_SCANNER_IMAGE_GRAYSCALE: bool = False
+    GEMINI_SCANNER_UPLINK_BYTES_PER_SEC: int = 1_000_000
+    SCAN_JOB_CALLBACK_TIMEOUT_SECONDS: float = 10.0
+    SCAN_JOB_CALLBACK_ALLOWED_HOSTS: list[str] = []  # https only; empty disables callbacks
+    SCAN_JOB_CALLBACK_RETRIES: int = 3
+    SCAN_JOB_STALE_SECONDS: float = 120.0
+    SCAN_JOB_MAX_ATTEMPTS: int = 3
+    GEMINI_KEY_REQUESTS_PER_MINUTE: int = 15
+    GEMINI_KEY_COOLDOWN_SECONDS: float = 60.0
+    GEMINI_KEY_REJECTED_COOLDOWN_SECONDS: float = 3600.0
+    GEMINI_KEY_ACQUIRE_TIMEOUT_SECONDS: float = 30.0
+    RATES_REFRESH_SECONDS: float = 60.0
+    RATES_MAX_STALE_SECONDS: float = 900.0
+    RATE_HISTORY_RAW_RETENTION_DAYS: int = 30
+    EVENTS_QUEUE_SIZE: int = 100
+    RESPONSE_CACHE_MAXSIZE: int = 512
+    RESPONSE_CACHE_TTL_SECONDS: float = 10.0
+    EVENTS_REPLAY_SIZE: int = 256
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    RATE_HISTORY_MAX_AGE_DAYS: int = 730
+    SUPABASE_REPLICATION_BATCH_SIZE: int = 200
+    SUPABASE_REPLICATION_INTERVAL_SECONDS: float = 2.0
+    SUPABASE_REPLICATION_RETRY_BASE_SECONDS: float = 2.0
+    SUPABASE_REPLICATION_RETRY_MAX_SECONDS: float = 300.0
+    SUPABASE_REPLICATION_RETENTION_HOURS: float = 24.0
     
     @property
     def parsed_api_keys(self) -> list[str]:
@@ -0,0 +1,48 @@
+"""
+Async engine and sessions for the main ledger database.
+Same DATABASE_URL as app.core.database_sb, driven by aiosqlite (SQLite) or
+asyncpg (PostgreSQL) so queries never block the event loop.
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database_sb import DATABASE_URL
+from app.core.sqlite_engine import create_async_db_engine
+
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    """sqlite:///x.db -> sqlite+aiosqlite:///x.db, postgresql://... -> postgresql+asyncpg://..."""
+    scheme, sep, rest = url.partition("://")
+    base = scheme.split("+", 1)[0]
+    if base == "postgres":
+        base = "postgresql"
+    if base not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {scheme}")
+    return f"{_ASYNC_DRIVERS[base]}{sep}{rest}"
+
+
+async_engine = create_async_db_engine(to_async_url(DATABASE_URL))
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency: one session per request, closed when the response is done."""
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+@asynccontextmanager
+async def session_scope(db: Optional[AsyncSession] = None) -> AsyncIterator[AsyncSession]:
+    """Uses the request's session if given, otherwise opens (and closes) a new one."""
+    if db is not None:
+        yield db
+        return
+    async with AsyncSessionLocal() as session:
+        yield session
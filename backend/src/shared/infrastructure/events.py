@@ -0,0 +1,142 @@
+"""
+In-process event broker for the dashboard push channel.
+
+Writers publish small deltas (new transaction, status change, pending-count
+change, rate tick) and every connected Server-Sent Events client gets them from its own
+bounded queue. A slow client loses its oldest queued events instead of
+holding up the writer. Recent events are kept in a short replay buffer, so
+a client reconnecting with Last-Event-ID catches up without a full reload.
+
+Event ids are "<epoch>-<seq>": the sequence restarts with the process, so a
+Last-Event-ID from another epoch (restart, other worker) is ignored rather
+than compared against this process's counter.
+"""
+import asyncio
+import itertools
+import json
+import uuid
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+from src.shared.config.settings import settings
+
+TRANSACTION_CREATED = "transaction.created"
+TRANSACTION_UPDATED = "transaction.updated"
+TRANSACTIONS_IMPORTED = "transactions.imported"
+PENDING_CHANGED = "pending.changed"
+RATE_TICK = "rate.tick"
+
+
+def _json_default(value: Any):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class Event:
+    __slots__ = ("epoch", "id", "type", "data")
+
+    def __init__(self, epoch: str, event_id: int, event_type: str, data: Dict[str, Any]):
+        self.epoch = epoch
+        self.id = event_id
+        self.type = event_type
+        self.data = data
+
+    @property
+    def event_id(self) -> str:
+        return f"{self.epoch}-{self.id}"
+
+    def to_sse(self) -> str:
+        payload = json.dumps(self.data, default=_json_default)
+        return f"id: {self.event_id}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+class EventBroker:
+    def __init__(self, queue_size: Optional[int] = None, replay_size: Optional[int] = None):
+        self.queue_size = queue_size or settings.EVENTS_QUEUE_SIZE
+        self.epoch = uuid.uuid4().hex[:12]
+        self._ids = itertools.count(1)
+        self._recent: Deque[Event] = deque(maxlen=replay_size or settings.EVENTS_REPLAY_SIZE)
+        self._subscribers: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+        self.dropped = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> Event:
+        """Fan out to every subscriber without blocking. Safe to call from worker threads."""
+        event = Event(self.epoch, next(self._ids), event_type, data)
+        self._recent.append(event)
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        for loop, queue in list(self._subscribers):
+            if loop is current:
+                self._offer(queue, event)
+            elif not loop.is_closed():
+                loop.call_soon_threadsafe(self._offer, queue, event)
+        return event
+
+    def _offer(self, queue: asyncio.Queue, event: Event) -> None:
+        if queue.full():
+            queue.get_nowait() # Drop the oldest for this slow client
+            self.dropped += 1
+        queue.put_nowait(event)
+
+    def cursor(self, last_event_id: Optional[str]) -> Optional[int]:
+        """Sequence number of a Last-Event-ID issued by this broker; None for other epochs or garbage."""
+        epoch, _, seq = (last_event_id or "").rpartition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def replay(self, last_event_id: Optional[str]) -> List[Event]:
+        """Buffered events newer than `last_event_id` (a reconnecting client's cursor)."""
+        cursor = self.cursor(last_event_id)
+        if cursor is None:
+            return []
+        return [event for event in self._recent if event.id > cursor]
+
+    async def stream(self, last_event_id: Optional[str] = None, is_disconnected=None,
+                     heartbeat_seconds: Optional[float] = None) -> AsyncIterator[str]:
+        """
+        SSE body: missed events first (Last-Event-ID), then live ones, with a
+        comment line as heartbeat so proxies keep the connection open.
+        """
+        heartbeat = heartbeat_seconds or settings.EVENTS_HEARTBEAT_SECONDS
+        async with self.subscribe() as queue:
+            sent = 0 # Only ids actually replayed here are skipped when they arrive live
+            for event in self.replay(last_event_id):
+                sent = event.id
+                yield event.to_sse()
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    if is_disconnected is not None and await is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                if event.id > sent: # Already delivered by the replay
+                    sent = event.id
+                    yield event.to_sse()
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[asyncio.Queue]:
+        entry = (asyncio.get_running_loop(), asyncio.Queue(maxsize=self.queue_size))
+        self._subscribers.add(entry)
+        try:
+            yield entry[1]
+        finally:
+            self._subscribers.discard(entry)
+
+
+# Singleton
+event_broker = EventBroker()
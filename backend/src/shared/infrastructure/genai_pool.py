@@ -0,0 +1,80 @@
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+from google import genai
+from google.genai import types
+
+from src.shared.config.logger import logger
+
+
+@dataclass(frozen=True)
+class PooledModel:
+    """A Gemini client bound to one model name and generation config."""
+    client: genai.Client
+    model_name: str
+    config: types.GenerateContentConfig
+
+    async def generate(self, contents: Any) -> types.GenerateContentResponse:
+        return await self.client.aio.models.generate_content(
+            model=self.model_name, contents=contents, config=self.config
+        )
+
+    def generate_sync(self, contents: Any) -> types.GenerateContentResponse:
+        return self.client.models.generate_content(
+            model=self.model_name, contents=contents, config=self.config
+        )
+
+
+class GenAIModelPool:
+    """
+    Process-wide cache of Gemini clients and model bindings.
+    One genai.Client per API key (it owns the HTTP connection pool) and one
+    PooledModel per (model name, API key, generation config), built on first
+    use or by warm_up() at startup and reused by every later call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: Dict[str, genai.Client] = {}
+        self._models: Dict[Tuple[str, str, Tuple], PooledModel] = {}
+
+    @staticmethod
+    def _config_key(generation_config: Dict[str, Any]) -> Tuple:
+        return tuple(sorted(generation_config.items()))
+
+    def get(self, api_key: str, model_name: str, **generation_config) -> PooledModel:
+        key = (model_name, api_key, self._config_key(generation_config))
+        model = self._models.get(key)
+        if model is not None:
+            return model
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                client = self._clients.get(api_key)
+                if client is None:
+                    client = genai.Client(api_key=api_key)
+                    self._clients[api_key] = client
+                model = PooledModel(
+                    client=client,
+                    model_name=model_name,
+                    config=types.GenerateContentConfig(**generation_config)
+                )
+                self._models[key] = model
+            return model
+
+    def warm_up(self, api_keys: List[str], model_name: str, **generation_config) -> None:
+        """Builds the clients/models for every key so the first request does not pay for it."""
+        for api_key in api_keys:
+            try:
+                self.get(api_key, model_name, **generation_config)
+            except Exception as e:
+                logger.warning(f"GenAI warm-up failed for {model_name}: {e}")
+        logger.info(f"GenAI pool warmed: {model_name} x {len(api_keys)} keys")
+
+    def size(self) -> Dict[str, int]:
+        return {"clients": len(self._clients), "models": len(self._models)}
+
+
+# Singleton
+genai_pool = GenAIModelPool()
@@ -0,0 +1,24 @@
+"""
+Opaque keyset cursors shared by the paginated endpoints.
+A cursor is the sort key of the last row on a page, JSON-encoded and
+base64url'd so clients treat it as a token.
+"""
+import base64
+import json
+from typing import Any, List, Sequence
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Raises ValueError on malformed cursors."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return values
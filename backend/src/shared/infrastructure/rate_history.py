@@ -0,0 +1,186 @@
+"""
+Exchange-rate history: writes, range reads, OHLC buckets and retention.
+
+Every snapshot the rate provider fetches is appended to `rate_history`, one
+row per series (pair + source). Reads go through the (pair, source,
+captured_at) index, so a range query never scans other series or the
+legacy exchange_rates_local table.
+
+Retention: raw points are kept for RATE_HISTORY_RAW_RETENTION_DAYS; older
+ones are thinned to the last point of each hour, and anything older than
+RATE_HISTORY_MAX_AGE_DAYS is dropped.
+"""
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, select, delete, func, literal_column
+from sqlalchemy.orm import Session, aliased
+
+from app.models.rate_history import RateHistory
+from src.shared.config.logger import logger
+from src.shared.config.settings import settings
+from src.transactions.infrastructure.rollups import dialect_insert
+
+# Snapshot field -> (pair, source)
+SERIES = {
+    "usd_bcv": ("USD/VES", "bcv"),
+    "eur_bcv": ("EUR/VES", "bcv"),
+    "usd_binance_buy": ("USDT/VES", "binance_buy"),
+    "usd_binance_sell": ("USDT/VES", "binance_sell"),
+}
+BUCKETS = ("hour", "day")
+RETENTION_INTERVAL_SECONDS = 3600
+
+_last_retention: Optional[float] = None
+
+
+def as_naive_utc(value: Any) -> Optional[datetime]:
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def snapshot_rows(rates: Dict[str, Any], captured_at: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """History rows for a get_latest_rates()-style dict; zero/missing quotes are skipped."""
+    captured_at = captured_at or as_naive_utc(rates.get("last_updated")) or datetime.utcnow()
+    rows = []
+    for field, (pair, source) in SERIES.items():
+        rate = rates.get(field)
+        if rate:
+            rows.append({"pair": pair, "source": source, "captured_at": captured_at, "rate": float(rate)})
+    return rows
+
+
+def record_rates(db: Session, rates: Dict[str, Any], captured_at: Optional[datetime] = None) -> int:
+    """Appends a snapshot in the caller's session (no commit). Re-recording the same capture is a no-op."""
+    rows = snapshot_rows(rates, captured_at)
+    if not rows:
+        return 0
+    insert = dialect_insert(db)
+    if insert is not None:
+        db.execute(insert(RateHistory).values(rows).on_conflict_do_nothing(
+            index_elements=["pair", "source", "captured_at"]
+        ))
+    else:
+        for row in rows:
+            exists = db.scalar(select(RateHistory.id).where(
+                RateHistory.pair == row["pair"], RateHistory.source == row["source"],
+                RateHistory.captured_at == row["captured_at"]
+            ))
+            if exists is None:
+                db.add(RateHistory(**row))
+    return len(rows)
+
+
+def record_snapshot(rates: Dict[str, Any], session_factory=None) -> int:
+    """Own-session write used by the rate provider; also runs retention about once an hour."""
+    global _last_retention
+    if session_factory is None:
+        from app.core.database_sb import SessionLocal
+        session_factory = SessionLocal
+    db = session_factory()
+    try:
+        recorded = record_rates(db, rates)
+        if _last_retention is None or time.monotonic() - _last_retention > RETENTION_INTERVAL_SECONDS:
+            apply_retention(db)
+            _last_retention = time.monotonic()
+        db.commit()
+        return recorded
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def series(db: Session, pair: str, source: str, start: Optional[datetime] = None,
+           end: Optional[datetime] = None, limit: Optional[int] = None) -> List[Tuple[datetime, float]]:
+    """(captured_at, rate) points of one series in [start, end), oldest first."""
+    query = select(RateHistory.captured_at, RateHistory.rate).where(
+        RateHistory.pair == pair, RateHistory.source == source
+    )
+    if start:
+        query = query.where(RateHistory.captured_at >= start)
+    if end:
+        query = query.where(RateHistory.captured_at < end)
+    query = query.order_by(RateHistory.captured_at)
+    if limit:
+        query = query.limit(limit)
+    return [(row[0], row[1]) for row in db.execute(query)]
+
+
+def _truncate(db: Session, column, unit: str):
+    """`column` truncated to the hour or day, as a comparable/groupable SQL expression."""
+    if db.bind.dialect.name == "postgresql":
+        # Inline unit: a bound parameter makes the SELECT and GROUP BY expressions differ
+        return func.date_trunc(literal_column(f"'{unit}'"), column)
+    return func.strftime("%Y-%m-%d %H:00:00" if unit == "hour" else "%Y-%m-%d 00:00:00", column)
+
+
+def ohlc(db: Session, pair: str, source: str, bucket: str = "hour",
+         start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Open/high/low/close per hour or day bucket, oldest first. Empty buckets are omitted.
+    Aggregated in SQL: high/low/count per bucket, open/close read back from
+    the bucket's first and last capture (unique per series and time).
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"Unsupported bucket: {bucket}")
+    key = _truncate(db, RateHistory.captured_at, bucket)
+    grouped = select(
+        key.label("bucket"),
+        func.max(RateHistory.rate).label("high"),
+        func.min(RateHistory.rate).label("low"),
+        func.count().label("count"),
+        func.min(RateHistory.captured_at).label("first_at"),
+        func.max(RateHistory.captured_at).label("last_at"),
+    ).where(RateHistory.pair == pair, RateHistory.source == source)
+    if start:
+        grouped = grouped.where(RateHistory.captured_at >= start)
+    if end:
+        grouped = grouped.where(RateHistory.captured_at < end)
+    grouped = grouped.group_by(key).subquery()
+
+    opening, closing = aliased(RateHistory), aliased(RateHistory)
+    query = select(
+        grouped.c.bucket, opening.rate, grouped.c.high, grouped.c.low, closing.rate, grouped.c.count
+    ).join(opening, and_(
+        opening.pair == pair, opening.source == source, opening.captured_at == grouped.c.first_at
+    )).join(closing, and_(
+        closing.pair == pair, closing.source == source, closing.captured_at == grouped.c.last_at
+    )).order_by(grouped.c.bucket)
+    return [
+        {"bucket": as_naive_utc(row[0]), "open": row[1], "high": row[2], "low": row[3], "close": row[4], "count": row[5]}
+        for row in db.execute(query)
+    ]
+
+
+def apply_retention(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Thins points past the raw window to one per hour and drops expired ones (no commit)."""
+    now = now or datetime.utcnow()
+    expired = db.execute(delete(RateHistory).where(
+        RateHistory.captured_at < now - timedelta(days=settings.RATE_HISTORY_MAX_AGE_DAYS)
+    )).rowcount
+
+    later = aliased(RateHistory)
+    later_in_same_hour = select(later.id).where(
+        later.pair == RateHistory.pair,
+        later.source == RateHistory.source,
+        _truncate(db, later.captured_at, "hour") == _truncate(db, RateHistory.captured_at, "hour"),
+        later.captured_at > RateHistory.captured_at,
+    ).exists()
+    thinned = db.execute(delete(RateHistory).where(
+        RateHistory.captured_at < now - timedelta(days=settings.RATE_HISTORY_RAW_RETENTION_DAYS),
+        later_in_same_hour
+    )).rowcount
+    if expired or thinned:
+        logger.info(f"Rate history retention: {expired} expired, {thinned} thinned")
+    return {"expired": expired, "thinned": thinned}
@@ -0,0 +1,158 @@
+"""
+In-process exchange-rate snapshot.
+
+get_latest_rates() costs one or two Supabase round trips (global row, then
+the legacy audit-log scan) plus a SQLite fallback. RateProvider keeps the
+last successful result in memory and refreshes it from a background task,
+so a lookup is a dictionary read. Reads past the refresh interval still
+return the old snapshot and kick off a revalidation (stale-while-revalidate);
+a failed refresh keeps serving the last known good rates.
+"""
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional
+
+from src.shared.config.logger import logger
+from src.shared.config.settings import settings
+from src.shared.infrastructure.events import event_broker, RATE_TICK
+
+RATE_FIELDS = ("usd_bcv", "eur_bcv", "usd_binance_buy", "usd_binance_sell")
+
+
+def _default_fetcher() -> Optional[Dict[str, Any]]:
+    from src.shared.database import db
+    return db.get_latest_rates()
+
+
+def _default_recorder(rates: Dict[str, Any]) -> None:
+    from src.shared.infrastructure.rate_history import record_snapshot
+    record_snapshot(rates)
+
+
+def ticker_from_rates(rates: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Dashboard ticker shape; zeros when no rates are known yet."""
+    rates = rates or {}
+    return {
+        "global_rate": f"{float(rates.get('usd_binance_sell') or 0):.2f} VES",
+        "bcv_usd": float(rates.get("usd_bcv") or 0),
+        "bcv_eur": float(rates.get("eur_bcv") or 0),
+        "binance_buy": float(rates.get("usd_binance_buy") or 0),
+        "binance_sell": float(rates.get("usd_binance_sell") or 0),
+        "zelle": float(rates.get("usd_binance_sell") or 0), # Placeholder for Zelle
+    }
+
+
+class RateProvider:
+    def __init__(self, fetcher: Callable[[], Optional[Dict[str, Any]]] = _default_fetcher,
+                 refresh_seconds: Optional[float] = None, max_stale_seconds: Optional[float] = None,
+                 recorder: Optional[Callable[[Dict[str, Any]], Any]] = None):
+        self._fetcher = fetcher
+        self._recorder = recorder # Persists each fresh snapshot (rate history)
+        self.refresh_seconds = refresh_seconds or settings.RATES_REFRESH_SECONDS
+        self.max_stale_seconds = max_stale_seconds or settings.RATES_MAX_STALE_SECONDS
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._fetched_at: Optional[float] = None
+        self._refreshing: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def age(self) -> Optional[float]:
+        return None if self._fetched_at is None else time.monotonic() - self._fetched_at
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """
+        Current rates without waiting on I/O. When the snapshot is older than
+        the refresh interval and the provider is running, a refresh is
+        scheduled in the background and the old snapshot is returned.
+        """
+        if self._task is not None:
+            self._revalidate()
+        return dict(self._snapshot) if self._snapshot else None
+
+    async def get_rates(self) -> Optional[Dict[str, Any]]:
+        """
+        Like snapshot(), but waits for the first fetch when nothing is cached
+        yet. Concurrent cold callers share one in-flight refresh.
+        """
+        if self._snapshot is None:
+            pending = self._revalidate()
+            if pending is not None:
+                await asyncio.shield(pending) # One caller giving up must not cancel the others' fetch
+        return self.snapshot()
+
+    def _revalidate(self) -> Optional[asyncio.Task]:
+        """Starts a background refresh if the snapshot is due and none is in flight."""
+        if self._refreshing is not None and not self._refreshing.done():
+            return self._refreshing
+        age = self.age
+        if age is not None and age < self.refresh_seconds:
+            return None
+        try:
+            self._refreshing = asyncio.get_running_loop().create_task(self.refresh())
+        except RuntimeError:
+            return None # No loop (sync caller): the background task will catch up
+        return self._refreshing
+
+    async def refresh(self) -> bool:
+        """Fetches fresh rates. On failure the last known good snapshot is kept."""
+        try:
+            rates = await asyncio.to_thread(self._fetcher)
+            error = None if rates else "no rates returned"
+        except Exception as e:
+            rates, error = None, str(e)
+        if error:
+            self.last_error = error
+            logger.warning(f"Rate refresh failed, serving last known good: {error}")
+            return False
+
+        changed = self._snapshot is None or any(
+            rates.get(field) != self._snapshot.get(field) for field in RATE_FIELDS
+        )
+        self._snapshot = dict(rates)
+        self._fetched_at = time.monotonic()
+        self.last_error = None
+        if changed:
+            event_broker.publish(RATE_TICK, {"rates": dict(rates), "ticker": ticker_from_rates(rates)})
+        if self._recorder is not None:
+            try:
+                await asyncio.to_thread(self._recorder, dict(rates))
+            except Exception as e:
+                logger.warning(f"Could not record rate history: {e}")
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        age = self.age
+        return {
+            "running": self._task is not None,
+            "has_snapshot": self._snapshot is not None,
+            "source": (self._snapshot or {}).get("source"),
+            "age_seconds": None if age is None else round(age, 3),
+            "stale": age is None or age > self.max_stale_seconds,
+            "last_error": self.last_error,
+        }
+
+    async def start(self) -> None:
+        if self._task:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Rate provider started (refresh every {self.refresh_seconds}s)")
+
+    async def stop(self) -> None:
+        for task in (self._task, self._refreshing):
+            if task:
+                task.cancel()
+        await asyncio.gather(*(t for t in (self._task, self._refreshing) if t), return_exceptions=True)
+        self._task = None
+        self._refreshing = None
+
+    async def _run(self) -> None:
+        while True:
+            pending = self._revalidate()
+            if pending is not None:
+                await asyncio.wait([pending])
+            await asyncio.sleep(self.refresh_seconds)
+
+
+# Singleton
+rate_provider = RateProvider(recorder=_default_recorder)
@@ -0,0 +1,261 @@
+"""
+Write-through replication of local SQLite writes to Supabase.
+
+Writers call enqueue() inside their own session, so the outbox row commits
+(or rolls back) with the data it mirrors. A background SupabaseReplicator
+drains due entries in batches, upserting on each payload's deterministic
+`id`, and retries failures with exponential backoff. The request path never
+waits on the network.
+"""
+import asyncio
+import hashlib
+import json
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import func, select, delete, update, or_
+from sqlalchemy.orm import Session
+
+from app.models.outbox import OutboxEntry
+from src.shared.config.logger import logger
+from src.shared.config.settings import settings
+from src.shared.config.supabase_client import get_supabase_client, is_supabase_enabled
+from src.transactions.infrastructure.rollups import dialect_insert
+
+_ID_NAMESPACE = uuid.UUID("6f1c2f4e-3d0a-4c59-9a57-4a3f8f6c2b11")
+
+
+def replication_enabled() -> bool:
+    return is_supabase_enabled()
+
+
+def stable_id(idempotency_key: str) -> str:
+    """Deterministic UUID for payloads that have no natural id of their own."""
+    return str(uuid.uuid5(_ID_NAMESPACE, idempotency_key))
+
+
+def _json_default(value: Any):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def model_payload(instance) -> Dict[str, Any]:
+    """Non-null column values of an ORM instance."""
+    return {
+        column.name: getattr(instance, column.key)
+        for column in instance.__table__.columns
+        if getattr(instance, column.key) is not None
+    }
+
+
+_VERSION_LEN = 16
+_SUPERSEDE_CHUNK = 500
+
+
+def _row_key(target_table: str, payload: Dict[str, Any]) -> str:
+    return f"{target_table}:{payload['id']}"
+
+
+def _version_key(row_key: str, body: str) -> str:
+    """`row_key:<payload hash>`: the same update enqueued twice collapses, a newer one does not."""
+    return f"{row_key}:{hashlib.sha1(body.encode('utf-8')).hexdigest()[:_VERSION_LEN]}"
+
+
+def _supersede(db: Session, target_table: str, keys: Dict[str, str], now: datetime) -> None:
+    """Marks pending entries for the same rows (plain or versioned keys) as superseded."""
+    key = OutboxEntry.idempotency_key
+    unversioned = func.substr(key, 1, func.length(key) - _VERSION_LEN - 1)
+    items = list(keys.items())
+    for start in range(0, len(items), _SUPERSEDE_CHUNK):
+        chunk = dict(items[start:start + _SUPERSEDE_CHUNK])
+        db.execute(update(OutboxEntry).where(
+            OutboxEntry.replicated_at.is_(None),
+            OutboxEntry.target_table == target_table,
+            or_(key.in_(list(chunk)), unversioned.in_(list(chunk))),
+            key.not_in(list(chunk.values())), # An identical pending version stays queued
+        ).values(replicated_at=now, last_error="superseded"))
+
+
+def enqueue(db: Session, target_table: str, payloads: Iterable[Dict[str, Any]], is_update: bool = False) -> int:
+    """
+    Stages payloads for replication in the caller's session (no commit).
+    Each payload must carry an `id`; `target_table:id` is the idempotency key,
+    so re-enqueuing the same row is ignored. With `is_update=True` the payload is
+    a new version of the whole row: its key also carries a hash of the
+    payload, and still-pending entries for the row are marked superseded so
+    the latest version is what gets upserted. No-op when Supabase is not configured.
+    """
+    if not replication_enabled():
+        return 0
+    now = datetime.utcnow()
+    rows, versions = [], {}
+    for payload in payloads:
+        body = json.dumps(payload, default=_json_default, sort_keys=True)
+        key = _row_key(target_table, payload)
+        if is_update:
+            versions[key] = _version_key(key, body)
+            key = versions[key]
+        rows.append({
+            "idempotency_key": key,
+            "target_table": target_table,
+            "payload": body,
+            "created_at": now,
+            "next_attempt_at": now,
+            "attempts": 0,
+        })
+    if not rows:
+        return 0
+
+    if versions:
+        _supersede(db, target_table, versions, now)
+    insert = dialect_insert(db)
+    if insert is not None:
+        db.execute(insert(OutboxEntry).values(rows).on_conflict_do_nothing(index_elements=["idempotency_key"]))
+    else:
+        existing = set(db.scalars(select(OutboxEntry.idempotency_key).where(
+            OutboxEntry.idempotency_key.in_([row["idempotency_key"] for row in rows])
+        )))
+        db.add_all(OutboxEntry(**row) for row in rows if row["idempotency_key"] not in existing)
+    return len(rows)
+
+
+class SupabaseReplicator:
+    """
+    Background drain of the replication outbox. run_once() is synchronous and
+    is executed in a worker thread by the polling loop; it can also be called
+    directly (e.g. from a script) to flush the backlog.
+    """
+
+    def __init__(self, session_factory=None, client_factory=get_supabase_client):
+        self._session_factory = session_factory
+        self._client_factory = client_factory
+        self._task: Optional[asyncio.Task] = None
+        self.replicated_total = 0
+        self.failed_total = 0
+        self.last_success_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    def _session(self) -> Session:
+        if self._session_factory is None:
+            from app.core.database_sb import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    async def start(self) -> None:
+        if self._task or not replication_enabled():
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("Supabase replicator started")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                sent = await asyncio.to_thread(self.run_once)
+            except Exception as e:
+                logger.error(f"Supabase replicator crashed: {e}")
+                sent = 0
+            if sent < settings.SUPABASE_REPLICATION_BATCH_SIZE:
+                await asyncio.sleep(settings.SUPABASE_REPLICATION_INTERVAL_SECONDS)
+
+    def _backoff(self, attempts: int) -> timedelta:
+        delay = settings.SUPABASE_REPLICATION_RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+        return timedelta(seconds=min(delay, settings.SUPABASE_REPLICATION_RETRY_MAX_SECONDS))
+
+    def run_once(self, now: Optional[datetime] = None) -> int:
+        """Replicates one batch of due entries. Returns how many were confirmed."""
+        client = self._client_factory()
+        if client is None:
+            return 0
+        now = now or datetime.utcnow()
+        db = self._session()
+        try:
+            entries = db.scalars(
+                select(OutboxEntry)
+                .where(OutboxEntry.replicated_at.is_(None), OutboxEntry.next_attempt_at <= now)
+                .order_by(OutboxEntry.id)
+                .limit(settings.SUPABASE_REPLICATION_BATCH_SIZE)
+            ).all()
+
+            by_table: Dict[str, List[OutboxEntry]] = defaultdict(list)
+            for entry in entries:
+                by_table[entry.target_table].append(entry)
+
+            sent = 0
+            for table, batch in by_table.items():
+                try:
+                    client.table(table).upsert(
+                        [json.loads(entry.payload) for entry in batch], on_conflict="id"
+                    ).execute()
+                except Exception as e:
+                    self.failed_total += len(batch)
+                    self.last_error = f"{table}: {e}"
+                    logger.warning(f"Supabase replication of {len(batch)} {table} rows failed: {e}")
+                    for entry in batch:
+                        entry.attempts += 1
+                        entry.last_error = str(e)
+                        entry.next_attempt_at = now + self._backoff(entry.attempts)
+                    continue
+                for entry in batch:
+                    entry.replicated_at = now
+                    entry.last_error = None
+                sent += len(batch)
+
+            retention = now - timedelta(hours=settings.SUPABASE_REPLICATION_RETENTION_HOURS)
+            db.execute(delete(OutboxEntry).where(OutboxEntry.replicated_at < retention))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        if sent:
+            self.replicated_total += sent
+            self.last_success_at = now
+        return sent
+
+    def metrics(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Backlog size and lag: how long the oldest pending write has been waiting."""
+        now = now or datetime.utcnow()
+        db = self._session()
+        try:
+            pending, oldest, retrying = db.execute(
+                select(
+                    func.count(OutboxEntry.id),
+                    func.min(OutboxEntry.created_at),
+                    func.count(OutboxEntry.id).filter(OutboxEntry.attempts > 0),
+                ).where(OutboxEntry.replicated_at.is_(None))
+            ).one()
+        finally:
+            db.close()
+        return {
+            "enabled": replication_enabled(),
+            "running": self._task is not None,
+            "pending": pending,
+            "retrying": retrying,
+            "oldest_pending_at": oldest.isoformat() if oldest else None,
+            "lag_seconds": round((now - oldest).total_seconds(), 3) if oldest else 0.0,
+            "replicated_total": self.replicated_total,
+            "failed_total": self.failed_total,
+            "last_success_at": self.last_success_at.isoformat() if self.last_success_at else None,
+            "last_error": self.last_error,
+        }
+
+
+# Singleton
+supabase_replicator = SupabaseReplicator()
@@ -0,0 +1,146 @@
+"""
+Response cache for read-heavy GET endpoints.
+
+Rendered JSON bodies are cached per route + query string and are valid
+while the ledger version is unchanged. The version is an in-process
+counter that TransactionRepository bumps after every committed write.
+Callers can add their own version component (e.g. a DB fingerprint), and
+a short TTL bounds staleness from writes made by other processes.
+
+Every response carries a content-hash ETag, so a poll with a matching
+If-None-Match gets an empty 304 without recomputing or re-serialising.
+A compute() that falls back to placeholder content returns a
+"Cache-Control: no-store" header; that response is served but not stored.
+"""
+import hashlib
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from src.shared.config.settings import settings
+
+
+class LedgerVersion:
+    """Monotonic counter of committed ledger writes in this process."""
+
+    def __init__(self):
+        self._counter = itertools.count(1)
+        self.value = 0
+
+    def bump(self) -> int:
+        self.value = next(self._counter)
+        return self.value
+
+
+ledger_version = LedgerVersion()
+
+
+class _Entry:
+    __slots__ = ("version", "body", "etag", "headers", "stored_at")
+
+    def __init__(self, version, body: bytes, etag: str, headers: Dict[str, str]):
+        self.version = version
+        self.body = body
+        self.etag = etag
+        self.headers = headers
+        self.stored_at = time.monotonic()
+
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [tag.strip() for tag in header.split(",")]
+
+
+class ResponseCache:
+    def __init__(self, maxsize: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.maxsize = maxsize or settings.RESPONSE_CACHE_MAXSIZE
+        self.ttl_seconds = ttl_seconds or settings.RESPONSE_CACHE_TTL_SECONDS
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    @staticmethod
+    def key(request: Request) -> str:
+        """Route + normalized (sorted) query string."""
+        params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        return f"{request.url.path}?{params}"
+
+    def _get(self, key: str, version) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.version != version or time.monotonic() - entry.stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _put(self, key: str, entry: _Entry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    async def respond(
+        self,
+        request: Request,
+        compute: Callable[[], Awaitable[Tuple[Any, Dict[str, str]]]],
+        response_model: Any = None,
+        version: Any = None
+    ) -> Response:
+        """
+        Serves `compute()` ( -> (content, extra headers) ) through the cache.
+        `response_model` validates/serialises like the route's response_model
+        would; `version` is folded into the ledger version for validity.
+        """
+        key = self.key(request)
+        full_version = (ledger_version.value, version)
+        entry = self._get(key, full_version)
+        if entry is None:
+            self.misses += 1
+            content, headers = await compute()
+            if response_model is not None:
+                content = TypeAdapter(response_model).dump_python(content, mode="json")
+            body = JSONResponse(content=jsonable_encoder(content)).body
+            etag = f'W/"{hashlib.sha1(body).hexdigest()}"'
+            entry = _Entry(full_version, body, etag, dict(headers or {}))
+            if "no-store" not in entry.headers.get("Cache-Control", ""):
+                self._put(key, entry)
+        else:
+            self.hits += 1
+
+        headers = {"Cache-Control": "no-cache", **entry.headers, "ETag": entry.etag}
+        if _matches(request, entry.etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "ledger_version": ledger_version.value,
+        }
+
+
+# Singleton
+response_cache = ResponseCache()
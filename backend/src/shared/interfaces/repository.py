@@ -96,8 +96,8 @@ class TransactionRepository:
         """
         Calculate stats on the fly from transactions
         """
-        from app.core import database_sb
-        real_rates = database_sb.get_latest_rates()
+        from src.shared.infrastructure.rate_provider import rate_provider
+        real_rates = await rate_provider.get_rates()
         ticker_data = {}
         
         if real_rates:
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import List
+
+class ImportRowError(BaseModel):
+    row: int # 1-based position in the submitted file/array
+    error: str
+
+class ImportReport(BaseModel):
+    received: int
+    inserted: int
+    dry_run: bool = False
+    errors: List[ImportRowError] = []
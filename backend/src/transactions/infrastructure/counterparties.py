@@ -0,0 +1,149 @@
+"""
+Counterparty directory maintained from the ledger.
+TransactionRepository.save registers the sender/receiver of every new row
+inside its own session; the resources endpoints page through the table.
+"""
+import hashlib
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, case, delete, func, or_
+from sqlalchemy.orm import Session
+
+from app.models.counterparty import Counterparty
+from app.models.transaction import Transaction as TransactionModel
+from src.transactions.infrastructure.rollups import dialect_insert
+from src.shared.infrastructure.pagination import encode_cursor, decode_cursor
+
+CLIENT = "Client"
+PROVIDER = "Provider"
+OPERATOR = "Operator"
+
+_ID_PREFIXES = {CLIENT: "CLI", PROVIDER: "PRV", OPERATOR: "OPR"}
+_WORKER_MARKERS = ("trabajador", "empleado", "nom-")
+_WORKER_CATEGORIES = ("Pago Nomina", "NOMINA")
+
+
+def normalize_name(name: str) -> str:
+    """Grouping key for free-text counterparty names."""
+    return name.strip().lower()
+
+
+def counterparty_id(role: str, key: str) -> str:
+    """Stable id derived from the role and normalized name."""
+    return f"{_ID_PREFIXES[role]}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]}"
+
+
+def client_id_for(key: str) -> str:
+    return counterparty_id(CLIENT, key)
+
+
+def classify(sql_tx: TransactionModel) -> Optional[Tuple[str, str]]:
+    """(role, display name) for a ledger row, or None if it has no counterparty."""
+    if sql_tx.transaction_type == "ENTRADA":
+        name = (sql_tx.sender_name or "").strip()
+        return (CLIENT, name) if name else None
+    if sql_tx.transaction_type == "SALIDA":
+        name = (sql_tx.receiver_name or "").strip()
+        if not name:
+            return None
+        key = normalize_name(name)
+        is_worker = sql_tx.category in _WORKER_CATEGORIES or any(m in key for m in _WORKER_MARKERS)
+        return (OPERATOR if is_worker else PROVIDER, name)
+    return None
+
+
+def register_counterparty(db: Session, sql_tx: TransactionModel) -> None:
+    """Adds a new ledger row to its counterparty's totals (atomic upsert)."""
+    register_counterparties(db, [sql_tx])
+
+
+def register_counterparties(db: Session, sql_txs: Iterable[TransactionModel]) -> None:
+    """Adds new ledger rows to their counterparties' totals, one upsert per counterparty."""
+    now = datetime.utcnow()
+    entries: Dict[str, Dict[str, Any]] = {}
+    for sql_tx in sql_txs:
+        classified = classify(sql_tx)
+        if classified is None:
+            continue
+        role, name = classified
+        key = normalize_name(name)
+        row_id = counterparty_id(role, key)
+        last_date = sql_tx.transaction_date or sql_tx.created_at
+        values = entries.get(row_id)
+        if values is None:
+            entries[row_id] = {
+                "id": row_id, "role": role, "name_key": key, "name": name, "deals": 1,
+                "volume": Decimal(str(sql_tx.amount_usd or 0)), "last_date": last_date, "updated_at": now,
+            }
+            continue
+        values["deals"] += 1
+        values["volume"] += Decimal(str(sql_tx.amount_usd or 0))
+        if last_date and (values["last_date"] is None or last_date > values["last_date"]):
+            values["last_date"] = last_date
+
+    insert = dialect_insert(db)
+    for values in entries.values():
+        if insert is not None:
+            stmt = insert(Counterparty).values(**values)
+            newer = stmt.excluded.last_date
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["id"],
+                set_={
+                    "deals": Counterparty.deals + stmt.excluded.deals,
+                    "volume": Counterparty.volume + stmt.excluded.volume,
+                    "last_date": case(
+                        (or_(Counterparty.last_date.is_(None), newer > Counterparty.last_date), newer),
+                        else_=Counterparty.last_date
+                    ),
+                    "updated_at": stmt.excluded.updated_at,
+                }
+            )
+            db.execute(stmt)
+            continue
+
+        # Generic dialects: read-modify-write inside the same transaction
+        row = db.get(Counterparty, values["id"])
+        if row is None:
+            db.add(Counterparty(**values))
+            continue
+        row.deals += values["deals"]
+        row.volume = (row.volume or 0) + values["volume"]
+        if values["last_date"] and (row.last_date is None or values["last_date"] > row.last_date):
+            row.last_date = values["last_date"]
+        row.updated_at = values["updated_at"]
+
+
+def backfill_counterparties(db: Session, batch_size: int = 1000) -> int:
+    """Rebuilds the counterparty table from the full ledger. Returns the row count."""
+    db.execute(delete(Counterparty))
+    rows = db.query(TransactionModel).filter(
+        TransactionModel.transaction_type.in_(("ENTRADA", "SALIDA"))
+    ).order_by(TransactionModel.created_at).yield_per(batch_size)
+    register_counterparties(db, rows)
+    db.commit()
+    return db.query(func.count()).select_from(Counterparty).scalar()
+
+
+def list_counterparties(db: Session, roles: Sequence[str], limit: int = 100,
+                        after: Optional[str] = None) -> Tuple[List[Counterparty], Optional[str]]:
+    """One page ordered by (name_key, id) plus the cursor for the next page."""
+    query = db.query(Counterparty).filter(Counterparty.role.in_(roles))
+    if after:
+        name_key, row_id = (str(v) for v in decode_cursor(after, 2))
+        query = query.filter(or_(
+            Counterparty.name_key > name_key,
+            and_(Counterparty.name_key == name_key, Counterparty.id > row_id)
+        ))
+    rows = query.order_by(Counterparty.name_key, Counterparty.id).limit(limit + 1).all()
+    next_cursor = encode_cursor([rows[limit - 1].name_key, rows[limit - 1].id]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def directory_version(db: Session, roles: Sequence[str]) -> Dict[str, Any]:
+    """Cheap fingerprint of the directory, used to build ETags."""
+    count, last_update, deals = db.query(
+        func.count(Counterparty.id), func.max(Counterparty.updated_at), func.sum(Counterparty.deals)
+    ).filter(Counterparty.role.in_(roles)).one()
+    return {"count": count, "updated_at": str(last_update), "deals": int(deals or 0)}
@@ -0,0 +1,142 @@
+"""
+Streaming ledger export (CSV / Parquet).
+Rows are read with a server-side cursor (`yield_per`) and written out one
+batch at a time, so memory stays flat regardless of the export size.
+"""
+import csv
+import io
+from datetime import datetime
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+from app.core.database_sb import SessionLocal
+from app.models.transaction import Transaction as TransactionModel
+
+EXPORT_COLUMNS = (
+    "id", "created_at", "transaction_date", "platform", "transaction_type", "category", "status",
+    "amount", "currency", "exchange_rate", "amount_usd", "profit", "net_amount",
+    "account_id", "session_id", "branch_id", "client_id",
+    "reference_id", "sender_name", "receiver_name",
+)
+EXPORT_FORMATS = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+DEFAULT_BATCH_SIZE = 2000
+
+
+def iter_ledger_batches(
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    account_id: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    session_factory=None
+) -> Iterator[List[Tuple[Any, ...]]]:
+    """Yields lists of up to `batch_size` rows (EXPORT_COLUMNS order), oldest first."""
+    db = (session_factory or SessionLocal)()
+    try:
+        query = db.query(*[getattr(TransactionModel, c) for c in EXPORT_COLUMNS])
+        if date_from:
+            query = query.filter(TransactionModel.created_at >= date_from)
+        if date_to:
+            query = query.filter(TransactionModel.created_at < date_to)
+        if account_id:
+            query = query.filter(TransactionModel.account_id == account_id)
+        query = query.order_by(TransactionModel.created_at, TransactionModel.id)
+
+        result = db.execute(query.statement.execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            yield [tuple(row) for row in partition]
+    finally:
+        db.close()
+
+
+def stream_csv(batches: Iterator[Sequence[Tuple[Any, ...]]]) -> Iterator[bytes]:
+    """Header first, then one encoded chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for batch in batches:
+        writer.writerows(
+            [v.isoformat() if isinstance(v, datetime) else v for v in row] for row in batch
+        )
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("Parquet export requires pyarrow. Install with: pip install pyarrow") from e
+    return pyarrow, pyarrow.parquet
+
+
+def _parquet_schema():
+    pa, _ = _require_pyarrow()
+    money = pa.decimal128(18, 2)
+    types = {
+        "created_at": pa.timestamp("us"),
+        "transaction_date": pa.timestamp("us"),
+        "amount": money,
+        "amount_usd": money,
+        "profit": money,
+        "net_amount": money,
+        "exchange_rate": pa.decimal128(18, 6),
+    }
+    return pa.schema([(c, types.get(c, pa.string())) for c in EXPORT_COLUMNS])
+
+
+def stream_parquet(batches: Iterator[Sequence[Tuple[Any, ...]]]) -> Iterator[bytes]:
+    """One Parquet row group per batch; the footer is emitted last."""
+    pa, pq = _require_pyarrow()
+    schema = _parquet_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for batch in batches:
+            columns = list(zip(*batch)) if batch else [[] for _ in EXPORT_COLUMNS]
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(columns, schema)], schema=schema
+            ))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def export_ledger(fmt: str, **filters) -> Iterator[bytes]:
+    """Byte stream of the filtered ledger in `fmt` ('csv' or 'parquet')."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    if fmt == "parquet":
+        _require_pyarrow() # Fail before the response starts streaming
+    batches = iter_ledger_batches(**filters)
+    return stream_csv(batches) if fmt == "csv" else stream_parquet(batches)
@@ -0,0 +1,171 @@
+"""
+Bulk transaction import (JSON array, CSV, bank statement CSV).
+Every row is validated with the Transaction model; valid rows are inserted
+in batches inside one database transaction and invalid ones are reported
+with their row number.
+"""
+import csv
+import io
+import re
+import unicodedata
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.models.transaction import Transaction as TransactionModel
+from src.transactions.domain.transaction import Transaction
+from src.transactions.domain.imports import ImportReport, ImportRowError
+
+# Ledger columns that the Transaction model does not carry but imports may fill
+EXTRA_TEXT_FIELDS = ("sender_name", "receiver_name", "raw_text_snippet", "branch_id", "user_id")
+MODEL_COLUMNS = frozenset(c.name for c in TransactionModel.__table__.columns)
+
+STATEMENT_ALIASES = {
+    "date": ("fecha", "date", "fecha valor", "fecha operacion"),
+    "reference": ("referencia", "reference", "ref", "nro referencia", "numero de referencia"),
+    "description": ("descripcion", "concepto", "description", "detalle"),
+    "debit": ("debito", "debitos", "cargo", "cargos", "debit", "withdrawal", "retiro"),
+    "credit": ("credito", "creditos", "abono", "abonos", "credit", "deposit", "deposito"),
+    "amount": ("monto", "amount", "importe"),
+}
+STATEMENT_DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y", "%Y-%m-%d %H:%M:%S")
+
+
+def _fold(text: str) -> str:
+    """Lowercase, accent-free header name."""
+    text = unicodedata.normalize("NFKD", text.strip().lower())
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def parse_decimal(raw: str) -> Decimal:
+    """Accepts '1234.56', '1,234.56' and '1.234,56'. Raises ValueError."""
+    value = re.sub(r"[^\d,.\-]", "", raw or "")
+    if "," in value and "." in value:
+        decimal_sep = "," if value.rfind(",") > value.rfind(".") else "."
+        thousands_sep = "." if decimal_sep == "," else ","
+        value = value.replace(thousands_sep, "").replace(decimal_sep, ".")
+    elif "," in value:
+        value = value.replace(",", ".")
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {raw!r}")
+
+
+def _parse_date(raw: str) -> datetime:
+    for fmt in STATEMENT_DATE_FORMATS:
+        try:
+            return datetime.strptime(raw.strip(), fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date: {raw!r}")
+
+
+def _read_csv(content: bytes) -> csv.DictReader:
+    text = content.decode("utf-8-sig")
+    dialect = csv.Sniffer().sniff(text[:4096], delimiters=",;\t") if text.strip() else csv.excel
+    return csv.DictReader(io.StringIO(text), dialect=dialect)
+
+
+def parse_csv(content: bytes) -> List[Dict[str, Any]]:
+    """CSV whose headers are Transaction / ledger field names. Empty cells are dropped."""
+    return [
+        {k.strip(): v for k, v in row.items() if k and v not in (None, "")}
+        for row in _read_csv(content)
+    ]
+
+
+def parse_statement(content: bytes, platform: str, currency: str,
+                    account_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Bank statement CSV (date, reference, description and either debit/credit
+    columns or one signed amount). Credits become ENTRADA, debits SALIDA.
+    Rows that cannot be read are returned as {"_error": ...} so the caller
+    reports them with their row number.
+    """
+    reader = _read_csv(content)
+    headers = {_fold(h): h for h in (reader.fieldnames or [])}
+    columns = {
+        name: next((headers[a] for a in aliases if a in headers), None)
+        for name, aliases in STATEMENT_ALIASES.items()
+    }
+    if not columns["date"] or not (columns["amount"] or columns["debit"] or columns["credit"]):
+        raise ValueError("Statement needs a date column and amount or debit/credit columns")
+
+    rows = []
+    for raw in reader:
+        def cell(name: str) -> str:
+            return (raw.get(columns[name]) or "").strip() if columns[name] else ""
+        try:
+            if columns["amount"] and cell("amount"):
+                signed = parse_decimal(cell("amount"))
+            else:
+                credit = parse_decimal(cell("credit")) if cell("credit") else Decimal(0)
+                debit = parse_decimal(cell("debit")) if cell("debit") else Decimal(0)
+                signed = credit - abs(debit)
+            if signed == 0:
+                raise ValueError("Row has no amount")
+            amount = abs(signed)
+            rows.append({
+                "platform": platform,
+                "currency": currency,
+                "account_id": account_id,
+                "amount": amount,
+                "amount_usd": amount if currency in ("USD", "USDT") else Decimal(0),
+                "net_amount": amount,
+                "transaction_type": "ENTRADA" if signed > 0 else "SALIDA",
+                "status": "COMPLETED", # Already cleared by the bank
+                "transaction_date": _parse_date(cell("date")),
+                "reference_id": cell("reference") or None,
+                "raw_text_snippet": cell("description") or None,
+            })
+        except ValueError as e:
+            rows.append({"_error": str(e)})
+    return rows
+
+
+def _to_column_values(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Validates one row and returns ledger column values. Raises ValueError/ValidationError."""
+    if "_error" in row:
+        raise ValueError(row["_error"])
+    extras = {k: str(row[k]) for k in EXTRA_TEXT_FIELDS if row.get(k) not in (None, "")}
+    transaction = Transaction(**{k: v for k, v in row.items() if k not in EXTRA_TEXT_FIELDS})
+    values = {
+        k: (v.value if isinstance(v, Enum) else v)
+        for k, v in transaction.model_dump().items()
+        if k in MODEL_COLUMNS and v is not None
+    }
+    values.update(extras)
+    return values
+
+
+def _error_text(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors())
+    return str(error)
+
+
+def validate_rows(rows: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[ImportRowError], int]:
+    """(valid column dicts, per-row errors, rows received)."""
+    valid, errors, received = [], [], 0
+    for index, row in enumerate(rows, start=1):
+        received = index
+        if not isinstance(row, dict):
+            errors.append(ImportRowError(row=index, error="Row must be an object"))
+            continue
+        try:
+            valid.append(_to_column_values(row))
+        except (ValueError, ValidationError) as e:
+            errors.append(ImportRowError(row=index, error=_error_text(e)))
+    return valid, errors, received
+
+
+async def import_rows(repository, rows: Iterable[Dict[str, Any]], dry_run: bool = False, db=None) -> ImportReport:
+    valid, errors, received = validate_rows(rows)
+    inserted = 0
+    if valid and not dry_run:
+        inserted = await repository.save_many(valid, db=db)
+    return ImportReport(received=received, inserted=inserted, dry_run=dry_run, errors=errors)
@@ -0,0 +1,232 @@
+"""
+Point-in-time pricing of ledger rows from the rate history.
+
+For each transaction, the rate valid at its `transaction_date` (falling back
+to `created_at`) is found with an as-of lookup: np.searchsorted over the
+sorted capture times of each rate series. That lookup fills:
+
+- market_rate: VES per USD. This is the Binance USDT/VES sell quote, or
+  the BCV USD/VES rate when no Binance quote exists yet.
+- amount_usd: USD/USDT amounts as-is, VES / market_rate, and EUR through
+  the BCV EUR/VES and USD/VES cross.
+- profit: the spread between the applied `exchange_rate` (VES per USD) and
+  the market rate, valued in USD. Only rows that carry a real conversion
+  rate (> 1) get a spread:
+  - VES rows: profit = side * (amount / market - amount / exchange_rate)
+  - USD/USDT rows: the same formula on the VES leg
+    (amount * exchange_rate), with the sign flipped.
+  - side is +1 for ENTRADA and -1 for SALIDA.
+
+Rows with values already set are left alone unless `overwrite` is passed.
+Single inserts and whole-ledger backfills share the same vectorized path.
+A backfill is a ledger write like any other: each batch moves its rows'
+daily rollups and queues their new versions for replication in the same
+commit, then bumps the ledger version.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models.rate_history import RateHistory
+from app.models.transaction import Transaction as TransactionModel
+from src.shared.infrastructure.rate_history import as_naive_utc
+from src.shared.infrastructure.replication import enqueue, model_payload
+from src.shared.infrastructure.response_cache import ledger_version
+from src.transactions.infrastructure.rollups import ROLLUP_FIELDS, apply_rollup_delta
+
+MARKET = ("USDT/VES", "binance_sell")
+OFFICIAL = ("USD/VES", "bcv")
+EURO = ("EUR/VES", "bcv")
+PRICED_FIELDS = ("market_rate", "amount_usd", "profit")
+
+_CENT = Decimal("0.01")
+_RATE = Decimal("0.000001")
+
+
+@dataclass
+class RateSeries:
+    times: np.ndarray # datetime64[us], ascending
+    values: np.ndarray # float64
+
+    def asof(self, when: np.ndarray) -> np.ndarray:
+        """Rate in force at each instant (last capture <= when); NaN before the first capture."""
+        if not len(self.times):
+            return np.full(len(when), np.nan)
+        idx = np.searchsorted(self.times, when, side="right") - 1
+        found = self.values[np.clip(idx, 0, None)]
+        return np.where((idx >= 0) & ~np.isnat(when), found, np.nan)
+
+
+def _load_series(db: Session, pair: str, source: str,
+                 start: Optional[datetime], end: Optional[datetime]) -> RateSeries:
+    where = (RateHistory.pair == pair, RateHistory.source == source)
+    points = []
+    if start is not None:
+        # The point in force at `start` (index seek), then everything up to `end`
+        before = db.execute(
+            select(RateHistory.captured_at, RateHistory.rate).where(*where, RateHistory.captured_at <= start)
+            .order_by(RateHistory.captured_at.desc()).limit(1)
+        ).first()
+        if before is not None:
+            points.append(tuple(before))
+    query = select(RateHistory.captured_at, RateHistory.rate).where(*where)
+    if start is not None:
+        query = query.where(RateHistory.captured_at > start)
+    if end is not None:
+        query = query.where(RateHistory.captured_at <= end)
+    points.extend(tuple(row) for row in db.execute(query.order_by(RateHistory.captured_at)))
+    return RateSeries(
+        np.array([p[0] for p in points], dtype="datetime64[us]"),
+        np.array([p[1] for p in points], dtype="float64"),
+    )
+
+
+@dataclass
+class RateTable:
+    market: RateSeries
+    official: RateSeries
+    euro: RateSeries
+
+    @classmethod
+    def load(cls, db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None) -> "RateTable":
+        """Series needed to price rows dated within [start, end] (whole history if unbounded)."""
+        return cls(*(_load_series(db, pair, source, start, end) for pair, source in (MARKET, OFFICIAL, EURO)))
+
+
+def _pricing_time(row: Dict[str, Any]) -> Optional[datetime]:
+    # Imports and parsed receipts mix aware and naive timestamps; rates are stored naive UTC
+    return as_naive_utc(row.get("transaction_date") or row.get("created_at"))
+
+
+def _column(rows: Sequence[Dict[str, Any]], key: str) -> np.ndarray:
+    return np.array([float(row.get(key) or 0) for row in rows], dtype="float64")
+
+
+def compute_pricing(table: RateTable, rows: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Vectorized market_rate / amount_usd / profit for row dicts; NaN where not computable."""
+    when = np.array([_pricing_time(row) for row in rows], dtype="datetime64[us]")
+    currency = np.array([str(getattr(row.get("currency"), "value", row.get("currency")) or "") for row in rows])
+    tx_type = np.array([str(getattr(row.get("transaction_type"), "value", row.get("transaction_type")) or "") for row in rows])
+    amount = _column(rows, "amount")
+    applied = _column(rows, "exchange_rate")
+
+    official = table.official.asof(when)
+    market = table.market.asof(when)
+    market = np.where(np.isnan(market), official, market)
+    eur_usd = table.euro.asof(when) / official
+
+    is_usd = np.isin(currency, ("USD", "USDT"))
+    is_ves = currency == "VES"
+    with np.errstate(divide="ignore", invalid="ignore"):
+        amount_usd = np.select(
+            [is_usd, is_ves, currency == "EUR"],
+            [amount, amount / market, amount * eur_usd],
+            default=np.nan,
+        )
+        ves_leg = np.where(is_ves, amount, amount * applied)
+        spread = ves_leg / market - ves_leg / applied
+    side = np.select([tx_type == "ENTRADA", tx_type == "SALIDA"], [1.0, -1.0], default=0.0)
+    side = side * np.select([is_ves, is_usd], [1.0, -1.0], default=0.0)
+    has_spread = (applied > 1) & (market > 0) & (side != 0)
+    profit = np.where(has_spread, side * spread, np.nan)
+
+    return {"market_rate": market, "amount_usd": amount_usd, "profit": profit}
+
+
+def _as_decimal(value: float, field: str) -> Decimal:
+    return Decimal(repr(value)).quantize(_RATE if field == "market_rate" else _CENT)
+
+
+def _is_unset(value) -> bool:
+    return value is None or float(value) == 0
+
+
+def apply_pricing(table: RateTable, rows: List[Dict[str, Any]], overwrite: bool = False) -> int:
+    """Fills priced fields in-place on row dicts. Returns how many rows changed."""
+    if not rows:
+        return 0
+    priced = compute_pricing(table, rows)
+    changed = 0
+    for i, row in enumerate(rows):
+        touched = False
+        for field in PRICED_FIELDS:
+            value = priced[field][i]
+            if np.isfinite(value) and (overwrite or _is_unset(row.get(field))):
+                row[field] = _as_decimal(float(value), field)
+                touched = True
+        changed += touched
+    return changed
+
+
+def _time_bounds(rows: Sequence[Dict[str, Any]]):
+    times = [t for t in (_pricing_time(row) for row in rows) if t is not None]
+    return (min(times), max(times)) if times else (None, None)
+
+
+def price_rows(db: Session, rows: List[Dict[str, Any]], overwrite: bool = False) -> int:
+    """Prices new ledger row dicts before insert (rates loaded only for their time span)."""
+    if not rows:
+        return 0
+    start, end = _time_bounds(rows)
+    return apply_pricing(RateTable.load(db, start, end), rows, overwrite)
+
+
+def price_models(db: Session, sql_txs: Sequence[TransactionModel], overwrite: bool = False) -> int:
+    """Same as price_rows for ORM instances that are about to be inserted."""
+    rows = [{c: getattr(tx, c) for c in ("amount", "currency", "transaction_type", "exchange_rate",
+                                          "transaction_date", "created_at") + PRICED_FIELDS}
+            for tx in sql_txs]
+    changed = price_rows(db, rows, overwrite)
+    for tx, row in zip(sql_txs, rows):
+        for field in PRICED_FIELDS:
+            setattr(tx, field, row[field])
+    return changed
+
+
+def backfill_pricing(db: Session, batch_size: int = 5000, overwrite: bool = False) -> int:
+    """
+    Prices the whole ledger in keyset batches against the full rate history
+    (loaded once). Each batch commits the new prices together with their
+    rollup deltas and replication entries; returns the number of updated rows.
+    Counterparty totals must be rebuilt afterwards.
+    """
+    table = RateTable.load(db)
+    columns = (TransactionModel.id, TransactionModel.amount, TransactionModel.currency,
+               TransactionModel.transaction_type, TransactionModel.exchange_rate,
+               TransactionModel.transaction_date, TransactionModel.created_at,
+               TransactionModel.branch_id, TransactionModel.status,
+               TransactionModel.market_rate, TransactionModel.amount_usd, TransactionModel.profit)
+    names = [c.key for c in columns]
+    updated, last_id = 0, None
+    while True:
+        query = select(*columns).order_by(TransactionModel.id).limit(batch_size)
+        if last_id is not None:
+            query = query.where(TransactionModel.id > last_id)
+        rows = [dict(zip(names, row)) for row in db.execute(query)]
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+        before = [{f: row[f] for f in ROLLUP_FIELDS + PRICED_FIELDS} for row in rows]
+        apply_pricing(table, rows, overwrite)
+        changed = [(old, row) for old, row in zip(before, rows)
+                   if any(row[f] != old[f] for f in PRICED_FIELDS)]
+        if not changed:
+            continue
+        now = datetime.utcnow()
+        db.execute(update(TransactionModel), [
+            {"id": row["id"], "updated_at": now, **{f: row[f] for f in PRICED_FIELDS}} for _, row in changed
+        ])
+        apply_rollup_delta(db, removed=[old for old, _ in changed], added=[row for _, row in changed])
+        repriced = db.scalars(select(TransactionModel).where(
+            TransactionModel.id.in_([row["id"] for _, row in changed])
+        ).execution_options(populate_existing=True)).all()
+        enqueue(db, "transactions", [model_payload(tx) for tx in repriced], is_update=True)
+        db.commit()
+        ledger_version.bump() # Invalidates cached GET responses in this process
+        updated += len(changed)
+    return updated
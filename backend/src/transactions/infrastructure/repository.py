@@ -1,89 +1,204 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 import uuid
 import logging
 from datetime import datetime, timedelta
+from sqlalchemy import or_, and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.shared.config.settings import settings
-from src.shared.config.supabase_client import get_supabase_client
 from src.transactions.domain.transaction import Transaction
-from app.core.database_sb import SessionLocal
+from src.shared.database.async_session import session_scope
 from app.models.transaction import Transaction as TransactionModel
+from src.transactions.infrastructure.rollups import (
+    increment_rollup, increment_rollups, apply_rollup_delta, rollup_snapshot, load_summary
+)
+from src.transactions.infrastructure.counterparties import (
+    register_counterparty, register_counterparties, normalize_name, CLIENT
+)
+from src.transactions.infrastructure.pricing import price_models, price_rows
+from src.transactions.infrastructure.search import search_transactions, ensure_search_index
+from src.shared.infrastructure.pagination import encode_cursor, decode_cursor
+from src.shared.infrastructure.replication import enqueue, model_payload
+from src.shared.infrastructure.rate_provider import rate_provider, ticker_from_rates
+from src.shared.infrastructure.response_cache import ledger_version
+from src.shared.infrastructure.events import (
+    event_broker, TRANSACTION_CREATED, TRANSACTION_UPDATED, TRANSACTIONS_IMPORTED, PENDING_CHANGED
+)
+from app.models.counterparty import Counterparty
+from app.models.finance import CashSession
 
 logger = logging.getLogger(__name__)
 
+FILTERABLE_FIELDS = ("status", "platform", "currency", "transaction_type", "session_id")
+PROJECTABLE_FIELDS = tuple(c.name for c in TransactionModel.__table__.columns)
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
 class TransactionRepository:
     def __init__(self):
         self.use_mock = settings.USE_MOCK_DB
         self.transactions_mock: List[Dict[str, Any]] = []
 
-    async def save(self, transaction: Transaction) -> Transaction:
-        # 1. Try SQLite (Primary for this session as requested)
+    async def _insert(self, session: AsyncSession, transaction: Transaction) -> None:
+        tx_data = transaction.model_dump(exclude_unset=True)
+        
+        # Remove Pydantic-only fields if they don't exist in SQL model, or ensure mapping
+        # (Assuming strict mapping for now, but safety first)
+        sql_tx = TransactionModel(**tx_data)
+        
+        # Ensure ID
+        if not sql_tx.id:
+            sql_tx.id = str(uuid.uuid4())
+        if not sql_tx.created_at:
+            sql_tx.created_at = datetime.utcnow()
+        
         try:
-            db = SessionLocal()
-            tx_data = transaction.model_dump(exclude_unset=True)
-            
-            # Remove Pydantic-only fields if they don't exist in SQL model, or ensure mapping
-            # (Assuming strict mapping for now, but safety first)
-            sql_tx = TransactionModel(**tx_data)
-            
-            # Ensure ID
-            if not sql_tx.id:
-                sql_tx.id = str(uuid.uuid4())
-                
-            db.add(sql_tx)
-            db.commit()
-            db.refresh(sql_tx)
-            db.close()
-            logger.info(f"Transaction saved to SQLite: {sql_tx.id}")
-            return transaction # Return the input for now, or fetch fresh
+            session.add(sql_tx)
+            # Same transaction: the ledger row, its daily rollup, its
+            # counterparty totals and its replication entry commit together
+            await session.run_sync(lambda s: (
+                price_models(s, [sql_tx]),
+                increment_rollup(s, sql_tx),
+                register_counterparty(s, sql_tx),
+                enqueue(s, "transactions", [model_payload(sql_tx)])
+            ))
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        logger.info(f"Transaction saved to SQLite: {sql_tx.id}")
+        ledger_version.bump() # Invalidates cached GET responses
+        
+        # Push the delta to dashboard subscribers once the row is durable
+        event_broker.publish(TRANSACTION_CREATED, {
+            field: getattr(sql_tx, field) for field in (
+                "id", "platform", "transaction_type", "status", "amount", "currency",
+                "amount_usd", "profit", "sender_name", "created_at", "transaction_date"
+            )
+        })
+        if (sql_tx.status or "PENDING") == "PENDING":
+            event_broker.publish(PENDING_CHANGED, {"delta": 1})
+
+    async def save(self, transaction: Transaction, db: Optional[AsyncSession] = None) -> Transaction:
+        # SQLite is the system of record; Supabase is fed from the outbox in the background
+        try:
+            async with session_scope(db) as session:
+                await self._insert(session, transaction)
         except Exception as e:
             logger.error(f"Error saving to SQLite: {e}")
-            # Fallback or persist error? For now, continue to Supabase check
-            pass
+            raise
+        return transaction
 
-        # 2. Supabase (Legacy/Production)
-        client = get_supabase_client()
-        if client:
-             try:
-                 transaction_dict = transaction.model_dump(exclude_unset=True)
-                 transaction_dict['amount'] = float(transaction_dict['amount']) # Serializaton fix
-                 if transaction_dict.get('transaction_date'):
-                    transaction_dict['transaction_date'] = transaction_dict['transaction_date'].isoformat()
-                 
-                 res = client.table('transactions').insert(transaction_dict).execute()
-                 if res.data:
-                     return Transaction(**res.data[0])
-             except Exception as e:
-                 logger.error(f"Error saving transaction to Supabase: {e}")
+    async def save_many(self, rows: List[Dict[str, Any]], batch_size: int = 500,
+                        db: Optional[AsyncSession] = None) -> int:
+        """
+        Bulk insert of already-validated ledger column dicts.
+        Rows go in with executemany batches of `batch_size`; rollups and
+        counterparties are updated once per bucket, and everything commits
+        (or rolls back) as a single transaction. Returns the inserted count.
+        """
+        now = datetime.utcnow()
+        table = TransactionModel.__table__
+        for row in rows:
+            row.setdefault("id", str(uuid.uuid4()))
+            row.setdefault("created_at", now)
+            # executemany needs the same keys in every row: fill column defaults explicitly
+            for column in table.columns:
+                if column.name not in row:
+                    default = column.default
+                    if default is None:
+                        row[column.name] = None
+                    elif default.is_callable:
+                        row[column.name] = default.arg(None)
+                    else:
+                        row[column.name] = default.arg
         
-        return transaction
+        async with session_scope(db) as session:
+            try:
+                # USD equivalents, market rate and spread from the rate history, as of each row's date
+                await session.run_sync(lambda s: price_rows(s, rows))
+                for start in range(0, len(rows), batch_size):
+                    await session.execute(table.insert(), rows[start:start + batch_size])
+                # Transient models only feed the aggregate updates; they are never added to the session
+                staged = [TransactionModel(**row) for row in rows]
+                await session.run_sync(lambda s: (
+                    increment_rollups(s, staged),
+                    register_counterparties(s, staged),
+                    enqueue(s, "transactions", [model_payload(tx) for tx in staged])
+                ))
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+        logger.info(f"Bulk inserted {len(rows)} transactions into SQLite")
+        ledger_version.bump()
+        event_broker.publish(TRANSACTIONS_IMPORTED, {"count": len(rows)})
+        pending = sum(1 for row in rows if (row.get("status") or "PENDING") == "PENDING")
+        if pending:
+            event_broker.publish(PENDING_CHANGED, {"delta": pending})
+        return len(rows)
 
-    async def get_all(self, limit: int = 50) -> List[Transaction]:
-        # 1. SQLite Fetch
+    async def update_status(self, transaction_id: str, status: str,
+                            db: Optional[AsyncSession] = None) -> Optional[Transaction]:
+        """
+        Changes a row's status; its daily rollup and replication entry are
+        written in the same commit.
+        Returns the updated transaction, or None if the id is unknown.
+        """
+        status = getattr(status, "value", status)
+        async with session_scope(db) as session:
+            try:
+                sql_tx = await session.get(TransactionModel, transaction_id)
+                if sql_tx is None:
+                    return None
+                before = rollup_snapshot(sql_tx)
+                sql_tx.status = status
+                sql_tx.updated_at = datetime.utcnow()
+                await session.run_sync(lambda s: (
+                    apply_rollup_delta(s, removed=[before], added=[sql_tx]),
+                    enqueue(s, "transactions", [model_payload(sql_tx)], is_update=True)
+                ))
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+        logger.info(f"Transaction {transaction_id} status: {before['status']} -> {status}")
+        ledger_version.bump()
+        if status != before["status"]:
+            event_broker.publish(TRANSACTION_UPDATED, {
+                "id": transaction_id, "status": status, "previous_status": before["status"],
+                "updated_at": sql_tx.updated_at
+            })
+        pending_delta = (status == "PENDING") - ((before["status"] or "PENDING") == "PENDING")
+        if pending_delta:
+            event_broker.publish(PENDING_CHANGED, {"delta": pending_delta})
+        return next(iter(self._to_domain([sql_tx])), None)
+
+    @staticmethod
+    def _to_domain(sql_txs: List[TransactionModel]) -> List[Transaction]:
         transactions = []
-        try:
-            db = SessionLocal()
-            # Eager load? For now just simple select
-            sql_txs = db.query(TransactionModel).order_by(TransactionModel.created_at.desc()).limit(limit).all()
+        for sql_tx in sql_txs:
+            # Map SQL Model -> Pydantic Domain
+            t_dict = sql_tx.to_dict()
             
-            for sql_tx in sql_txs:
-                # Map SQL Model -> Pydantic Domain
-                # Handle Decimal -> Float conversion if Pydantic expects float, or compatible types
-                t_dict = sql_tx.to_dict()
-                
-                # Ensure Pydantic compatibility
-                # Field mapping (SQL 'type' vs Domain 'transaction_type' etc if naming differs)
-                # In this case, we updated SQL model to match new requirements, but let's be safe
-                
-                # Fix specific fields if needed
-                if 'transaction_type' not in t_dict and 'type' in t_dict:
-                     t_dict['transaction_type'] = t_dict.pop('type')
-                
-                try:
-                    transactions.append(Transaction(**t_dict))
-                except Exception as map_err:
-                    logger.warning(f"Skipping malformed tx {sql_tx.id}: {map_err}")
+            # Fix specific fields if needed
+            if 'transaction_type' not in t_dict and 'type' in t_dict:
+                 t_dict['transaction_type'] = t_dict.pop('type')
             
-            db.close()
+            try:
+                transactions.append(Transaction(**t_dict))
+            except Exception as map_err:
+                logger.warning(f"Skipping malformed tx {sql_tx.id}: {map_err}")
+        return transactions
+
+    async def get_all(self, limit: int = 50, db: Optional[AsyncSession] = None) -> List[Transaction]:
+        # 1. SQLite Fetch
+        try:
+            async with session_scope(db) as session:
+                result = await session.execute(
+                    select(TransactionModel).order_by(TransactionModel.created_at.desc()).limit(limit)
+                )
+                transactions = self._to_domain(result.scalars().all())
             
             if transactions:
                 return transactions
@@ -97,42 +212,102 @@ class TransactionRepository:
 
         return []
 
-    async def get_clients(self) -> List[Dict[str, Any]]:
+    async def get_page(
+        self,
+        limit: int = 50,
+        after: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        fields: Optional[List[str]] = None,
+        db: Optional[AsyncSession] = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        """
+        One page of the ledger, newest first, using keyset pagination on
+        (created_at, id). Returns (rows, next_cursor).
+
+        `filters` accepts status, platform, currency, transaction_type,
+        session_id, date_from and date_to (created_at range). With `fields`
+        only those columns are selected and plain dicts are returned instead
+        of hydrated Transaction models.
+        Raises ValueError for unknown fields or a malformed cursor.
+        """
+        if fields:
+            unknown = [f for f in fields if f not in PROJECTABLE_FIELDS]
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        cursor = decode_cursor(after, 2) if after else None
+
+        if fields:
+            columns = {f: getattr(TransactionModel, f) for f in dict.fromkeys(["created_at", "id", *fields])}
+            stmt = select(*[col.label(name) for name, col in columns.items()])
+        else:
+            stmt = select(TransactionModel)
+        
+        for name, value in (filters or {}).items():
+            if value is None:
+                continue
+            if name == "date_from":
+                stmt = stmt.where(TransactionModel.created_at >= value)
+            elif name == "date_to":
+                stmt = stmt.where(TransactionModel.created_at < value)
+            elif name in FILTERABLE_FIELDS:
+                stmt = stmt.where(getattr(TransactionModel, name) == value)
+            else:
+                raise ValueError(f"Unknown filter: {name}")
+        
+        if cursor:
+            created_at, last_id = datetime.fromisoformat(cursor[0]), str(cursor[1])
+            stmt = stmt.where(or_(
+                TransactionModel.created_at < created_at,
+                and_(TransactionModel.created_at == created_at, TransactionModel.id < last_id)
+            ))
+        
+        stmt = stmt.order_by(TransactionModel.created_at.desc(), TransactionModel.id.desc()).limit(limit + 1)
+        async with session_scope(db) as session:
+            result = await session.execute(stmt)
+            rows = result.all() if fields else result.scalars().all()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1].created_at.isoformat(), rows[-1].id])
+        
+        if fields:
+            return [{f: getattr(row, f) for f in fields} for row in rows], next_cursor
+        return self._to_domain(rows), next_cursor
+
+    async def get_clients(self, limit: Optional[int] = 100, after: Optional[str] = None,
+                          prefix: Optional[str] = None, ids: Optional[Sequence[str]] = None,
+                          db: Optional[AsyncSession] = None) -> List[Dict[str, Any]]:
+        """
+        Client directory read from the counterparty table (no ledger scan).
+        Clients are keyed by their normalized name and ordered by it, so
+        `after=<last item's key>` fetches the next page and the `id` is the
+        counterparty id. `prefix` filters by the start of the name; `ids`
+        restricts the lookup to known client ids.
+        """
+        if ids is not None and not ids:
+            return []
         try:
-            db = SessionLocal()
-            # Fetch all incoming transactions to aggregate stats
-            txs = db.query(TransactionModel).filter(TransactionModel.transaction_type == 'ENTRADA').all()
+            stmt = select(Counterparty).where(Counterparty.role == CLIENT)
+            if ids is not None:
+                stmt = stmt.where(Counterparty.id.in_(list(ids)))
+            if prefix:
+                stmt = stmt.where(Counterparty.name_key.like(f"{_escape_like(normalize_name(prefix))}%", escape="\\"))
+            if after:
+                stmt = stmt.where(Counterparty.name_key > after)
             
-            clients_map = {}
-            for tx in txs:
-                name = tx.sender_name
-                if not name:
-                    continue
-                    
-                if name not in clients_map:
-                    clients_map[name] = {
-                        "name": name,
-                        "id": f"CLI-{len(clients_map)+1}", 
-                        "volume": 0.0,
-                        "deals": 0,
-                        "last_dt": tx.created_at or tx.transaction_date or datetime.min,
-                        "last": "N/A"
-                    }
-                
-                client = clients_map[name]
-                client["volume"] += float(tx.amount_usd or 0)
-                client["deals"] += 1
-                
-                tx_dt = tx.created_at or tx.transaction_date
-                if tx_dt and tx_dt > client["last_dt"]:
-                    client["last_dt"] = tx_dt
+            stmt = stmt.order_by(Counterparty.name_key)
+            if limit:
+                stmt = stmt.limit(limit)
+            async with session_scope(db) as session:
+                rows = (await session.execute(stmt)).scalars().all()
 
             # Format results
             results = []
             now = datetime.utcnow()
-            for client in clients_map.values():
+            for row in rows:
                 # Format 'last' string
-                diff = now - client["last_dt"]
+                diff = now - (row.last_date or now)
                 if diff.days > 0:
                     last_str = f"{diff.days}d ago"
                 else:
@@ -140,33 +315,30 @@ class TransactionRepository:
                     last_str = f"{hours}h ago"
                 
                 results.append({
-                    "name": client["name"],
-                    "id": client["id"],
-                    "volume": f"{client['volume']:.2f}",
-                    "deals": client["deals"],
+                    "name": row.name,
+                    "id": row.id,
+                    "key": row.name_key,
+                    "volume": f"{float(row.volume or 0):.2f}",
+                    "deals": row.deals,
                     "last": last_str
                 })
             
-            db.close()
             return results 
         except Exception as e:
             logger.error(f"Error fetching clients from SQLite: {e}")
             return []
 
-    async def get_operators(self) -> List[Dict[str, Any]]:
+    async def get_operators(self, db: Optional[AsyncSession] = None) -> List[Dict[str, Any]]:
         try:
-            db = SessionLocal()
             # Get unique user_ids from sessions
-            from app.models.finance import CashSession
-            sessions = db.query(CashSession.user_id).distinct().all()
+            async with session_scope(db) as session:
+                user_ids = (await session.execute(select(CashSession.user_id).distinct())).scalars().all()
             
             operators = []
-            for row in sessions:
-                uid = row[0]
+            for uid in user_ids:
                 # Mock avatar/name logic since we don't have a Users table yet
                 name = "Admin Principal" if "admin" in uid else "Operador Caja"
                 avatar = "👑" if "admin" in uid else "🐫"
-                color = "bg-purple-100 text-purple-700" if "admin" in uid else "bg-blue-100 text-blue-700"
                 
                 operators.append({
                     "id": uid,
@@ -174,26 +346,21 @@ class TransactionRepository:
                     "avatar": avatar,
                 })
             
-            db.close()
             return operators
         except Exception as e:
             logger.error(f"Error fetching operators from SQLite: {e}")
             return []
 
-    async def get_stats(self) -> Dict[str, Any]:
+    async def get_stats(self, db: Optional[AsyncSession] = None) -> Dict[str, Any]:
         try:
-            db = SessionLocal()
-            
-            # Fetch all txs
-            txs = db.query(TransactionModel).all()
-            
-            total_vol = sum(float(t.amount_usd or 0) for t in txs)
-            
-            # Pending
-            pending = sum(1 for t in txs if t.status == 'PENDING')
+            # Totals and per-day volume come from the daily_rollups table
+            today = datetime.utcnow().date()
+            async with session_scope(db) as session:
+                summary = await session.run_sync(lambda s: load_summary(s, today))
+            total_vol = summary["volume"]
+            pending = summary["pending"]
             
             # Chart Data: Last 7 days (fill gaps)
-            today = datetime.utcnow().date()
             chart_data = []
             
             # Helper for Spanish days
@@ -203,21 +370,10 @@ class TransactionRepository:
                 date_cursor = today - timedelta(days=i)
                 day_name = days_es[date_cursor.weekday()] # 0=Mon, 6=Sun
                 
-                # Filter txs for this day
-                day_vol = 0.0
-                day_prof = 0.0
-                
-                for t in txs:
-                    t_dt = (t.created_at or t.transaction_date or datetime.utcnow()).date()
-                    if t_dt == date_cursor:
-                        amt = float(t.amount_usd or 0)
-                        day_vol += amt
-                        
-                        # Simple profit logic
-                        if t.transaction_type == 'ENTRADA':
-                             day_prof += amt * 0.05 # Mock 5%
-                        else:
-                             day_prof -= amt * 0.01 # Mock cost
+                day = summary["days"].get(date_cursor.isoformat(), {})
+                day_vol = day.get("volume", 0.0)
+                # Spread profit priced from the rate history at insert time
+                day_prof = day.get("profit", 0.0)
                 
                 chart_data.append({
                     "name": day_name,
@@ -225,21 +381,12 @@ class TransactionRepository:
                     "profit": float(f"{day_prof:.2f}")
                 })
 
-            # Ticker (Mock rates for now or fetch from DB if we had Rate table)
-            ticker_data = {
-                "global_rate": "58.50 VES",
-                "bcv_usd": 45.80,
-                "bcv_eur": 48.20,
-                "binance_buy": 58.45,
-                "binance_sell": 58.60,
-                "zelle": 58.20
-            }
+            # Ticker: in-memory rate snapshot, no network round trip
+            ticker_data = ticker_from_rates(rate_provider.snapshot())
 
-            db.close()
-            
             return {
                 "volume": f"{total_vol:,.2f}",
-                "net_profit": f"{total_vol * 0.03:,.2f}", # Mock 3%
+                "net_profit": f"{summary['profit']:,.2f}",
                 "pending_count": pending,
                 "ticker": ticker_data,
                 "chart_data": chart_data
@@ -248,34 +395,36 @@ class TransactionRepository:
             logger.error(f"Error fetching stats from SQLite: {e}")
             return {}
 
-    async def get_by_client(self, client_identifier: str) -> List[Transaction]:
-        """Fetch transactions for a specific client (by ID or Name)"""
+    async def get_by_client(self, client_identifier: str, limit: int = 50, offset: int = 0,
+                            db: Optional[AsyncSession] = None) -> List[Transaction]:
+        """
+        Fetch transactions for a specific client (by ID or Name).
+        Rows linked by client_id win; otherwise the name/reference search index
+        is used and results come back best match first.
+        """
         try:
-            db = SessionLocal()
-            # Search by exact Client ID OR Fuzzy Name match in sender/receiver
-            search = f"%{client_identifier}%"
-            sql_txs = db.query(TransactionModel).filter(
-                (TransactionModel.client_id == client_identifier) | 
-                (TransactionModel.sender_name.ilike(search)) |
-                (TransactionModel.receiver_name.ilike(search))
-            ).order_by(TransactionModel.created_at.desc()).all()
-            
-            transactions = []
-            for sql_tx in sql_txs:
-                try:
-                    t_dict = sql_tx.to_dict()
-                    if 'transaction_type' not in t_dict and 'type' in t_dict:
-                        t_dict['transaction_type'] = t_dict.pop('type')
-                    transactions.append(Transaction(**t_dict))
-                except Exception as e:
-                    logger.warning(f"Skipping tx {sql_tx.id}: {e}")
+            async with session_scope(db) as session:
+                # Create the search index (once) before this session opens a read transaction
+                await session.run_sync(lambda s: ensure_search_index(s.get_bind()))
+                
+                result = await session.execute(
+                    select(TransactionModel).where(TransactionModel.client_id == client_identifier)
+                    .order_by(TransactionModel.created_at.desc()).limit(limit).offset(offset)
+                )
+                sql_txs = result.scalars().all()
+                
+                if not sql_txs:
+                    # Directory ids (CLI-/PRV-/OPR-...) resolve to the counterparty name
+                    counterparty = await session.get(Counterparty, client_identifier)
+                    search = counterparty.name if counterparty else client_identifier
+                    sql_txs = await session.run_sync(
+                        lambda s: search_transactions(s, search, limit=limit, offset=offset)
+                    )
             
-            db.close()
-            return transactions
+            return self._to_domain(sql_txs)
         except Exception as e:
             logger.error(f"Error fetching client txs: {e}")
             return []
 
 # Singleton
 transaction_repo = TransactionRepository()
-
@@ -0,0 +1,160 @@
+"""
+Maintenance and reads for the daily_rollups table.
+Writes happen inside the caller's session so the rollup and the ledger row
+commit (or roll back) together. Inserts, updates and deletes all go through
+apply_rollup_delta(); backfill_rollups() rebuilds the table from scratch.
+"""
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable
+
+from sqlalchemy import func, case, select, delete
+from sqlalchemy.dialects import sqlite, postgresql
+from sqlalchemy.orm import Session
+
+from app.models.rollup import DailyRollup
+from app.models.transaction import Transaction as TransactionModel
+
+_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def dialect_insert(db: Session):
+    """INSERT construct with ON CONFLICT support for the session's dialect, or None."""
+    return _INSERTS.get(db.bind.dialect.name)
+
+
+def _dec(value) -> Decimal:
+    return Decimal(str(value or 0))
+
+
+_SUMMED = ("tx_count", "pending_count", "amount", "amount_usd", "profit")
+ROLLUP_FIELDS = ("created_at", "branch_id", "currency", "transaction_type", "status", "amount", "amount_usd", "profit")
+
+
+def rollup_snapshot(sql_tx: TransactionModel) -> Dict[str, Any]:
+    """The fields that place a ledger row in its bucket; take it before changing the row."""
+    return {field: getattr(sql_tx, field) for field in ROLLUP_FIELDS}
+
+
+def _field(row, name: str):
+    return row.get(name) if isinstance(row, dict) else getattr(row, name)
+
+
+def increment_rollup(db: Session, sql_tx: TransactionModel) -> None:
+    """Adds one new ledger row to its daily bucket (atomic upsert)."""
+    increment_rollups(db, [sql_tx])
+
+
+def increment_rollups(db: Session, sql_txs: Iterable[TransactionModel]) -> None:
+    """Adds new ledger rows to their daily buckets, one upsert per bucket."""
+    apply_rollup_delta(db, added=sql_txs)
+
+
+def apply_rollup_delta(db: Session, removed: Iterable[Any] = (), added: Iterable[Any] = ()) -> None:
+    """
+    Moves ledger rows between daily buckets in the caller's session:
+    `removed` rows are subtracted and `added` rows are added (models or
+    rollup_snapshot() dicts). Insert: added only. Delete: removed only.
+    Update: the snapshot taken before the change as removed, the row as added.
+    """
+    buckets: Dict[tuple, Dict[str, Any]] = {}
+    for sign, rows in ((-1, removed), (1, added)):
+        for row in rows:
+            key = (
+                (_field(row, "created_at") or datetime.utcnow()).date(),
+                _field(row, "branch_id") or "",
+                _field(row, "currency"),
+                _field(row, "transaction_type") or "ENTRADA",
+            )
+            values = buckets.get(key)
+            if values is None:
+                values = buckets[key] = dict(
+                    zip(("day", "branch_id", "currency", "transaction_type"), key),
+                    **{col: 0 for col in _SUMMED}
+                )
+            values["tx_count"] += sign
+            values["pending_count"] += sign if (_field(row, "status") or "PENDING") == "PENDING" else 0
+            values["amount"] += sign * _dec(_field(row, "amount"))
+            values["amount_usd"] += sign * _dec(_field(row, "amount_usd"))
+            values["profit"] += sign * _dec(_field(row, "profit"))
+
+    insert = dialect_insert(db)
+    for key, values in buckets.items():
+        if not any(values[col] for col in _SUMMED):
+            continue # e.g. an update that did not touch any summed field
+        if insert is not None:
+            stmt = insert(DailyRollup).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["day", "branch_id", "currency", "transaction_type"],
+                set_={col: getattr(DailyRollup, col) + stmt.excluded[col] for col in _SUMMED}
+            )
+            db.execute(stmt)
+            continue
+
+        # Generic dialects: read-modify-write inside the same transaction
+        row = db.get(DailyRollup, key)
+        if row is None:
+            db.add(DailyRollup(**values))
+        else:
+            for col in _SUMMED:
+                setattr(row, col, (getattr(row, col) or 0) + values[col])
+
+
+def backfill_rollups(db: Session) -> int:
+    """Rebuilds daily_rollups from the full ledger. Returns the number of buckets."""
+    tx_day = func.date(func.coalesce(TransactionModel.created_at, TransactionModel.transaction_date))
+    grouped = select(
+        tx_day,
+        func.coalesce(TransactionModel.branch_id, ""),
+        TransactionModel.currency,
+        TransactionModel.transaction_type,
+        func.count(TransactionModel.id),
+        func.sum(case((TransactionModel.status == "PENDING", 1), else_=0)),
+        func.coalesce(func.sum(TransactionModel.amount), 0),
+        func.coalesce(func.sum(TransactionModel.amount_usd), 0),
+        func.coalesce(func.sum(TransactionModel.profit), 0),
+    ).group_by(
+        tx_day,
+        func.coalesce(TransactionModel.branch_id, ""),
+        TransactionModel.currency,
+        TransactionModel.transaction_type,
+    )
+
+    db.execute(delete(DailyRollup))
+    db.execute(DailyRollup.__table__.insert().from_select(
+        ["day", "branch_id", "currency", "transaction_type",
+         "tx_count", "pending_count", "amount", "amount_usd", "profit"],
+        grouped
+    ))
+    db.commit()
+    return db.query(func.count()).select_from(DailyRollup).scalar()
+
+
+def load_summary(db: Session, today: date, window_days: int = 7) -> Dict[str, Any]:
+    """
+    Ledger totals plus per-day volume and profit for the last `window_days` days,
+    read from the rollup table in one grouped query.
+    """
+    window_start = today - timedelta(days=window_days - 1)
+    bucket = case((DailyRollup.day >= window_start, DailyRollup.day), else_=None).label("day")
+    rows = db.query(
+        bucket,
+        func.sum(DailyRollup.amount_usd).label("volume"),
+        func.sum(case((DailyRollup.transaction_type == "ENTRADA", DailyRollup.amount_usd), else_=0)).label("volume_in"),
+        func.sum(DailyRollup.pending_count).label("pending"),
+        func.sum(DailyRollup.profit).label("profit"),
+    ).group_by(bucket).all()
+
+    return {
+        "volume": sum(float(r.volume or 0) for r in rows),
+        "pending": sum(int(r.pending or 0) for r in rows),
+        "profit": sum(float(r.profit or 0) for r in rows),
+        "days": {
+            str(r.day): {
+                "volume": float(r.volume or 0),
+                "volume_in": float(r.volume_in or 0),
+                "profit": float(r.profit or 0),
+            }
+            for r in rows if r.day is not None
+        },
+    }
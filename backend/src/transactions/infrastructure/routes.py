@@ -1,30 +1,170 @@
-from typing import List
-from fastapi import APIRouter, HTTPException
-from src.transactions.domain.transaction import Transaction
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.shared.database.async_session import get_async_db
+from src.transactions.domain.transaction import (
+    Transaction, TransactionStatus, FinancialPlatform, Currency, TransactionType
+)
 from src.transactions.infrastructure.repository import transaction_repo
+from src.transactions.infrastructure.export import export_ledger, EXPORT_FORMATS
+from src.transactions.infrastructure.importer import import_rows, parse_csv, parse_statement
+from src.transactions.domain.imports import ImportReport
+from src.shared.infrastructure.response_cache import response_cache
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Transaction])
-async def get_transactions():
+async def get_transactions(
+    request: Request,
+    limit: int = Query(50, ge=1, le=500),
+    after: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
+    status: Optional[TransactionStatus] = None,
+    platform: Optional[FinancialPlatform] = None,
+    currency: Optional[Currency] = None,
+    transaction_type: Optional[TransactionType] = None,
+    session_id: Optional[str] = None,
+    date_from: Optional[datetime] = Query(None, description="created_at >= date_from"),
+    date_to: Optional[datetime] = Query(None, description="created_at < date_to"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
-    Get all recent transactions.
+    Get recent transactions, newest first.
+    Pages are keyed on (created_at, id): pass the X-Next-Cursor header value
+    as `after` to fetch the next one. `fields` returns only those columns.
+    Responses are cached until the next ledger write and carry an ETag.
     """
-    return await transaction_repo.get_all()
+    filters = {
+        "status": status.value if status else None,
+        "platform": platform.value if platform else None,
+        "currency": currency.value if currency else None,
+        "transaction_type": transaction_type.value if transaction_type else None,
+        "session_id": session_id,
+        "date_from": date_from,
+        "date_to": date_to
+    }
+    projection = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+
+    async def compute():
+        try:
+            rows, next_cursor = await transaction_repo.get_page(
+                limit=limit, after=after, filters=filters, fields=projection, db=db
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        return rows, {"X-Next-Cursor": next_cursor} if next_cursor else {}
+
+    # Projected rows skip Transaction hydration and the response model
+    return await response_cache.respond(
+        request, compute, response_model=None if projection else List[Transaction]
+    )
+
+@router.get("/export")
+async def export_transactions(
+    format: str = Query("csv", pattern="^(csv|parquet)$"),
+    date_from: Optional[datetime] = Query(None, description="created_at >= date_from"),
+    date_to: Optional[datetime] = Query(None, description="created_at < date_to"),
+    account_id: Optional[str] = None
+):
+    """
+    Stream the ledger as CSV or Parquet (oldest first) for accounting.
+    Rows are read and written in batches, never loaded all at once.
+    """
+    try:
+        body = export_ledger(format, date_from=date_from, date_to=date_to, account_id=account_id)
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    filename = f"ledger_{datetime.utcnow():%Y%m%d_%H%M%S}.{format}"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 @router.post("/", response_model=Transaction)
-async def create_transaction(transaction: Transaction):
+async def create_transaction(transaction: Transaction, db: AsyncSession = Depends(get_async_db)):
     """
     Create a new transaction manually or from scanner.
     """
     try:
-        return await transaction_repo.save(transaction)
+        return await transaction_repo.save(transaction, db=db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.patch("/{transaction_id}/status", response_model=Transaction)
+async def update_transaction_status(
+    transaction_id: str,
+    status: TransactionStatus = Body(..., embed=True),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Change a transaction's status (e.g. PENDING -> COMPLETED).
+    Daily rollups, replication and dashboard subscribers follow the change.
+    """
+    try:
+        updated = await transaction_repo.update_status(transaction_id, status, db=db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    return updated
+
+@router.post("/import", response_model=ImportReport)
+async def import_transactions(rows: List[Dict[str, Any]], dry_run: bool = False,
+                              db: AsyncSession = Depends(get_async_db)):
+    """
+    Bulk import from a JSON array of transactions.
+    Valid rows are inserted in one transaction; invalid rows are reported by position.
+    """
+    try:
+        return await import_rows(transaction_repo, rows, dry_run=dry_run, db=db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/import/file", response_model=ImportReport)
+async def import_transactions_file(
+    file: UploadFile = File(...),
+    kind: str = Form("csv", pattern="^(csv|statement)$"),
+    platform: Optional[FinancialPlatform] = Form(None),
+    currency: Optional[Currency] = Form(None),
+    account_id: Optional[str] = Form(None),
+    dry_run: bool = Form(False),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Bulk import from a file.
+    kind=csv: columns named like Transaction fields.
+    kind=statement: bank statement CSV (date, reference, description,
+    debit/credit or signed amount); platform and currency are required.
+    """
+    content = await file.read()
+    try:
+        if kind == "statement":
+            if not platform or not currency:
+                raise ValueError("platform and currency are required for bank statements")
+            rows = parse_statement(content, platform.value, currency.value, account_id)
+        else:
+            rows = parse_csv(content)
+        return await import_rows(transaction_repo, rows, dry_run=dry_run, db=db)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/client/{client_id}", response_model=List[Transaction])
-async def get_client_transactions(client_id: str):
+async def get_client_transactions(
+    client_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Get transactions specific to a client (Ledger).
+    Name searches are ranked by relevance and paginated with limit/offset.
     """
-    return await transaction_repo.get_by_client(client_id)
+    return await transaction_repo.get_by_client(client_id, limit=limit, offset=offset, db=db)
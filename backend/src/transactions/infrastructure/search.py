@@ -0,0 +1,151 @@
+"""
+Ledger search over counterparty names and reference ids.
+
+SQLite: an external-content FTS5 table (trigram tokenizer) kept in sync with
+`transactions` by triggers, ranked with bm25().
+PostgreSQL: pg_trgm GIN indexes on the same columns, ranked by similarity().
+Queries shorter than a trigram fall back to a bounded ILIKE scan.
+
+`transactions` has a String(36) primary key, so the FTS table follows the
+implicit rowid, which VACUUM or a table rebuild during a migration may
+renumber. The index is integrity-checked the first time a process uses it
+and rebuilt on mismatch; call rebuild_search_index() after a VACUUM or
+migration to resync a running process.
+"""
+import threading
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text, or_
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DatabaseError
+from sqlalchemy.orm import Session
+
+from app.models.transaction import Transaction as TransactionModel
+from src.shared.config.logger import logger
+
+FTS_TABLE = "transactions_fts"
+SEARCH_COLUMNS = ("sender_name", "receiver_name", "reference_id")
+MIN_QUERY_LENGTH = 3 # Shortest string a trigram index can match
+
+_cols = ", ".join(SEARCH_COLUMNS)
+_new = ", ".join(f"new.{c}" for c in SEARCH_COLUMNS)
+_old = ", ".join(f"old.{c}" for c in SEARCH_COLUMNS)
+
+_SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"{_cols}, content='transactions', content_rowid='rowid', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON transactions BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_cols}) VALUES (new.rowid, {_new}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON transactions BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_cols}) VALUES ('delete', old.rowid, {_old}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON transactions BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_cols}) VALUES ('delete', old.rowid, {_old}); "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_cols}) VALUES (new.rowid, {_new}); END",
+]
+
+_POSTGRES_DDL = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+    f"CREATE INDEX IF NOT EXISTS ix_transactions_{c}_trgm ON transactions USING gin ({c} gin_trgm_ops)"
+    for c in SEARCH_COLUMNS
+]
+
+_ready_lock = threading.Lock()
+_ready: set = set()
+
+
+def ensure_search_index(engine: Engine) -> bool:
+    """Creates the search index for `engine` once per process. Returns False if unsupported."""
+    key = str(engine.url)
+    if key in _ready:
+        return True
+    with _ready_lock:
+        if key in _ready:
+            return True
+        dialect = engine.dialect.name
+        try:
+            with engine.begin() as conn:
+                if dialect == "sqlite":
+                    created = conn.execute(text(
+                        "SELECT count(*) FROM sqlite_master WHERE name = :name"
+                    ), {"name": FTS_TABLE}).scalar() == 0
+                    for ddl in _SQLITE_DDL:
+                        conn.execute(text(ddl))
+                    if created:
+                        # Index rows that existed before the FTS table
+                        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+                    elif not _sqlite_index_in_sync(conn):
+                        logger.warning("Ledger search index out of sync with transactions (rowids moved); rebuilding")
+                        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+                elif dialect == "postgresql":
+                    for ddl in _POSTGRES_DDL:
+                        conn.execute(text(ddl))
+                else:
+                    return False
+        except Exception as e:
+            logger.warning(f"Ledger search index unavailable ({dialect}): {e}")
+            return False
+        _ready.add(key)
+        return True
+
+
+def _sqlite_index_in_sync(conn) -> bool:
+    """FTS5 integrity-check against the content table (rank=1 compares indexed values too)."""
+    try:
+        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('integrity-check', 1)"))
+    except DatabaseError:
+        return False
+    return True
+
+
+def rebuild_search_index(engine: Engine) -> bool:
+    """Re-indexes every ledger row; run after VACUUM or a migration that rebuilt `transactions`."""
+    _ready.discard(str(engine.url))
+    if not ensure_search_index(engine):
+        return False
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    return True
+
+
+def _fts_phrase(query: str) -> str:
+    return '"' + query.replace('"', '""') + '"'
+
+
+def _ranked_ids(db: Session, query: str, limit: int, offset: int) -> Optional[List[Tuple[str, float]]]:
+    """(id, rank) pairs best-first, or None when the indexed path can't serve the query."""
+    engine = db.get_bind()
+    if len(query) < MIN_QUERY_LENGTH or not ensure_search_index(engine):
+        return None
+
+    if engine.dialect.name == "sqlite":
+        rows = db.execute(text(
+            f"SELECT t.id, bm25({FTS_TABLE}) AS rank FROM {FTS_TABLE} "
+            f"JOIN transactions t ON t.rowid = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH :q ORDER BY rank, t.created_at DESC LIMIT :limit OFFSET :offset"
+        ), {"q": _fts_phrase(query), "limit": limit, "offset": offset}).all()
+    else:
+        pattern = f"%{query}%"
+        rows = db.execute(text(
+            "SELECT id, -greatest(" + ", ".join(f"similarity(coalesce({c}, ''), :q)" for c in SEARCH_COLUMNS) + ") AS rank "
+            "FROM transactions WHERE " + " OR ".join(f"{c} ILIKE :pattern" for c in SEARCH_COLUMNS) + " "
+            "ORDER BY rank, created_at DESC LIMIT :limit OFFSET :offset"
+        ), {"q": query, "pattern": pattern, "limit": limit, "offset": offset}).all()
+    return [(row[0], float(row[1])) for row in rows]
+
+
+def search_transactions(db: Session, query: str, limit: int = 50, offset: int = 0) -> List[TransactionModel]:
+    """Ledger rows whose counterparty name or reference contains `query`, best match first."""
+    query = query.strip()
+    if not query:
+        return []
+
+    ranked = _ranked_ids(db, query, limit, offset)
+    if ranked is None:
+        pattern = f"%{query}%"
+        return db.query(TransactionModel).filter(or_(
+            *(getattr(TransactionModel, c).ilike(pattern) for c in SEARCH_COLUMNS)
+        )).order_by(TransactionModel.created_at.desc()).limit(limit).offset(offset).all()
+
+    ids = [row_id for row_id, _ in ranked]
+    by_id = {tx.id: tx for tx in db.query(TransactionModel).filter(TransactionModel.id.in_(ids)).all()}
+    return [by_id[row_id] for row_id in ids if row_id in by_id]
@@ -0,0 +1,26 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from app.core.database_sb import Base
+from src.shared.infrastructure.response_cache import response_cache
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    """
+    Sync sessionmaker over a fresh file-backed ledger with the full schema.
+    The async session layer used by the repositories points at the same file,
+    and cached responses from other tests' databases are dropped.
+    """
+    path = tmp_path / "ledger.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    monkeypatch.setattr(
+        "src.shared.database.async_session.AsyncSessionLocal",
+        async_sessionmaker(async_engine, expire_on_commit=False)
+    )
+    response_cache.clear()
+    yield sessionmaker(bind=engine)
+    engine.dispose()
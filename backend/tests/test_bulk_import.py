@@ -0,0 +1,83 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.models.counterparty import Counterparty
+from app.models.rollup import DailyRollup
+from app.models.transaction import Transaction as TransactionModel
+from src.transactions.infrastructure import routes
+from src.transactions.infrastructure.importer import parse_decimal
+
+@pytest.fixture
+def client(session_factory):
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/transactions")
+    return TestClient(app)
+
+def test_json_import_inserts_valid_rows_and_reports_the_rest(client, session_factory):
+    rows = [
+        {"platform": "ZELLE", "amount": "10.50", "currency": "USD", "amount_usd": "10.50",
+         "transaction_type": "ENTRADA", "sender_name": "Maria Perez"},
+        {"platform": "NOPE", "amount": "1", "currency": "USD", "transaction_type": "ENTRADA"},
+        {"platform": "BINANCE", "amount": "5", "currency": "USDT", "transaction_type": "SALIDA",
+         "reference_id": "abc-1"},
+    ]
+    report = client.post("/transactions/import", json=rows).json()
+
+    assert report["received"] == 3
+    assert report["inserted"] == 2
+    assert [e["row"] for e in report["errors"]] == [2]
+    assert "platform" in report["errors"][0]["error"]
+
+    db = session_factory()
+    assert db.query(TransactionModel).count() == 2
+    assert db.query(TransactionModel).filter_by(reference_id="ABC1").one().category == "OTROS"
+    assert sum(r.tx_count for r in db.query(DailyRollup).all()) == 2
+    assert db.query(Counterparty).one().name == "Maria Perez"
+    db.close()
+
+def test_dry_run_validates_without_writing(client, session_factory):
+    rows = [{"platform": "ZELLE", "amount": "1", "currency": "USD", "transaction_type": "ENTRADA"}]
+    report = client.post("/transactions/import", params={"dry_run": True}, json=rows).json()
+    assert report["inserted"] == 0 and report["dry_run"]
+    db = session_factory()
+    assert db.query(TransactionModel).count() == 0
+    db.close()
+
+def test_csv_import(client, session_factory):
+    content = b"platform,amount,currency,transaction_type,status\nZELLE,20,USD,ENTRADA,COMPLETED\nZELLE,,USD,ENTRADA,\n"
+    report = client.post("/transactions/import/file", files={"file": ("txs.csv", content, "text/csv")},
+                         data={"kind": "csv"}).json()
+    assert report["inserted"] == 1
+    assert report["errors"][0]["row"] == 2
+
+def test_bank_statement_import(client, session_factory):
+    content = (
+        "Fecha;Referencia;Descripción;Débito;Crédito;Saldo\n"
+        "05/01/2026;001122;PAGO MOVIL RECIBIDO;;1.250,00;5.000,00\n"
+        "06/01/2026;001123;PAGO PROVEEDOR;300,50;;4.699,50\n"
+        "xx/01/2026;001124;BAD ROW;;10,00;4.709,50\n"
+    ).encode("utf-8")
+    report = client.post("/transactions/import/file", files={"file": ("banesco.csv", content, "text/csv")},
+                         data={"kind": "statement", "platform": "BANESCO_VE", "currency": "VES",
+                               "account_id": "acc-1"}).json()
+    assert report["inserted"] == 2
+    assert report["errors"] == [{"row": 3, "error": "Invalid date: 'xx/01/2026'"}]
+
+    db = session_factory()
+    rows = {r.reference_id: r for r in db.query(TransactionModel).all()}
+    db.close()
+    assert rows["001122"].transaction_type == "ENTRADA" and float(rows["001122"].amount) == 1250.0
+    assert rows["001123"].transaction_type == "SALIDA" and float(rows["001123"].amount) == 300.5
+    assert rows["001123"].raw_text_snippet == "PAGO PROVEEDOR"
+    assert rows["001123"].account_id == "acc-1"
+
+def test_statement_requires_platform_and_currency(client):
+    content = b"Fecha,Monto\n05/01/2026,10\n"
+    response = client.post("/transactions/import/file", files={"file": ("s.csv", content, "text/csv")},
+                           data={"kind": "statement"})
+    assert response.status_code == 400
+
+def test_parse_decimal_formats():
+    assert str(parse_decimal("1.234,56")) == "1234.56"
+    assert str(parse_decimal("1,234.56")) == "1234.56"
+    assert str(parse_decimal("-12,5")) == "-12.5"
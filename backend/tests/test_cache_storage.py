@@ -0,0 +1,50 @@
+from app.cache.manager import CacheManager
+from app.cache.storage import InMemoryCacheStorage, SQLiteCacheStorage, TwoLevelCacheStorage
+
+def test_disk_storage_survives_new_instance(tmp_path):
+    path = str(tmp_path / "cache.db")
+    SQLiteCacheStorage(path=path).set("k1", {"amount": 10})
+
+    assert SQLiteCacheStorage(path=path).get("k1") == {"amount": 10}
+
+def test_disk_storage_expires_entries(tmp_path):
+    storage = SQLiteCacheStorage(path=str(tmp_path / "cache.db"), ttl=-1)
+    storage.set("k1", "value")
+
+    assert storage.get("k1") is None
+
+def test_disk_storage_honours_explicit_zero_limits(tmp_path, monkeypatch):
+    storage = SQLiteCacheStorage(path=str(tmp_path / "cache.db"), ttl=0)
+    monkeypatch.setattr("app.cache.storage.time.time", lambda: 1000.0)
+    storage.set("k1", "value")
+    monkeypatch.setattr("app.cache.storage.time.time", lambda: 1000.5)
+
+    assert storage.ttl == 0
+    assert storage.get("k1") is None
+
+    storage = SQLiteCacheStorage(path=str(tmp_path / "other.db"), max_bytes=0)
+    storage.set("k1", "value")
+
+    assert storage.get("k1") is None
+
+def test_disk_storage_evicts_least_recently_used(tmp_path):
+    storage = SQLiteCacheStorage(path=str(tmp_path / "cache.db"), max_bytes=250)
+    storage.set("old", b"x" * 100)
+    storage.set("new", b"y" * 100)
+    storage.get("old")  # refresh "old" so "new" becomes the LRU entry
+    storage.set("newest", b"z" * 100)
+
+    assert storage.get("old") is not None
+    assert storage.get("new") is None
+    assert storage.get("newest") is not None
+
+def test_two_level_promotes_disk_hits(tmp_path):
+    memory = InMemoryCacheStorage()
+    memory.clear()
+    disk = SQLiteCacheStorage(path=str(tmp_path / "cache.db"))
+    disk.set("k1", "from-disk")
+
+    manager = CacheManager(storage=TwoLevelCacheStorage(memory, disk))
+
+    assert manager.storage.get("k1") == "from-disk"
+    assert memory.get("k1") == "from-disk"
@@ -0,0 +1,67 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from app.models.transaction import Transaction as TransactionModel
+from src.transactions.infrastructure.counterparties import backfill_counterparties, client_id_for, normalize_name
+from src.transactions.infrastructure.repository import TransactionRepository
+
+@pytest.fixture
+def session_factory(session_factory):
+    factory = session_factory
+    db = factory()
+    for name, amount, tx_type in [
+        ("Maria Perez", 10, "ENTRADA"),
+        ("maria perez ", 15, "ENTRADA"),
+        ("Mario Lopez", 7, "ENTRADA"),
+        ("Ana_Diaz", 3, "ENTRADA"),
+        ("MUÑOZ PÉREZ", 4, "ENTRADA"),
+        ("Muñoz Pérez", 6, "ENTRADA"),
+        ("Proveedor X", 99, "SALIDA"),
+    ]:
+        db.add(TransactionModel(
+            platform="ZELLE", amount=amount, currency="USD", amount_usd=amount,
+            transaction_type=tx_type, sender_name=name, category="OTROS",
+            created_at=datetime.utcnow() - timedelta(days=2)
+        ))
+    db.commit()
+    backfill_counterparties(db)
+    db.close()
+    return factory
+
+def _clients(factory, **kwargs):
+    return asyncio.run(TransactionRepository().get_clients(**kwargs))
+
+def test_clients_are_grouped_by_normalized_name(session_factory):
+    clients = _clients(session_factory)
+
+    assert [c["key"] for c in clients] == ["ana_diaz", "maria perez", "mario lopez", "muñoz pérez"]
+    maria = clients[1]
+    assert maria["deals"] == 2
+    assert maria["volume"] == "25.00"
+    assert maria["last"] == "2d ago"
+
+def test_client_ids_are_stable_and_pages_use_keyset(session_factory):
+    first = _clients(session_factory, limit=2)
+    second = _clients(session_factory, limit=2, after=first[-1]["key"])
+
+    assert [c["key"] for c in second] == ["mario lopez", "muñoz pérez"]
+    assert first[0]["id"] == _clients(session_factory)[0]["id"]
+
+def test_prefix_filter_escapes_wildcards(session_factory):
+    assert [c["key"] for c in _clients(session_factory, prefix="MAR")] == ["maria perez", "mario lopez"]
+    assert [c["key"] for c in _clients(session_factory, prefix="ana_")] == ["ana_diaz"]
+    assert _clients(session_factory, prefix="a%") == []
+
+def test_accented_names_share_the_counterparty_key(session_factory):
+    clients = _clients(session_factory, prefix="MUÑ")
+
+    assert [(c["deals"], c["volume"]) for c in clients] == [(2, "10.00")]
+    assert clients[0]["id"] == client_id_for(normalize_name("MUÑOZ PÉREZ"))
+    by_id = asyncio.run(TransactionRepository().get_by_client(clients[0]["id"]))
+    assert len(by_id) == 2
+
+def test_lookup_by_ids_only_reads_those_clients(session_factory):
+    maria = client_id_for(normalize_name("Maria Perez"))
+
+    assert [c["key"] for c in _clients(session_factory, ids=[maria, "OP-001"], limit=None)] == ["maria perez"]
+    assert _clients(session_factory, ids=[]) == []
@@ -0,0 +1,93 @@
+import asyncio
+from decimal import Decimal
+from unittest.mock import patch
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.models.counterparty import Counterparty
+from app.models.transaction import Transaction as TransactionModel
+from src.shared.infrastructure import resources_routes
+from src.transactions.infrastructure.counterparties import (
+    backfill_counterparties, client_id_for, normalize_name, register_counterparty
+)
+from src.transactions.infrastructure.repository import TransactionRepository
+from src.transactions.domain.transaction import Transaction
+
+@pytest.fixture
+def client(session_factory):
+    app = FastAPI()
+    app.include_router(resources_routes.router, prefix="/resources")
+
+    def get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[resources_routes.get_db] = get_db
+    return TestClient(app)
+
+def _add(db, name, tx_type="ENTRADA", amount=1):
+    sql_tx = TransactionModel(
+        platform="ZELLE", amount=amount, currency="USD", amount_usd=amount, transaction_type=tx_type,
+        sender_name=name if tx_type == "ENTRADA" else None,
+        receiver_name=name if tx_type == "SALIDA" else None
+    )
+    db.add(sql_tx)
+    register_counterparty(db, sql_tx)
+
+def test_counterparties_are_keyed_by_role_and_normalized_name(session_factory):
+    db = session_factory()
+    _add(db, " Maria Perez", amount=5)
+    _add(db, "maria perez", amount=7)
+    _add(db, "Trabajador Luis", tx_type="SALIDA", amount=9)
+    _add(db, "Proveedor X", tx_type="SALIDA", amount=4)
+    db.commit()
+
+    maria = db.query(Counterparty).filter(Counterparty.name_key == "maria perez").one()
+    roles = {row.name_key: row.role for row in db.query(Counterparty).all()}
+    assert maria.deals == 2 and float(maria.volume) == 12.0
+    assert maria.name == "Maria Perez"
+    assert maria.id == client_id_for(normalize_name("Maria Perez"))
+    assert roles == {"maria perez": "Client", "trabajador luis": "Operator", "proveedor x": "Provider"}
+
+    # Backfill rebuilds the same rows from the ledger
+    ids_before = sorted(row.id for row in db.query(Counterparty).all())
+    assert backfill_counterparties(db) == 3
+    assert sorted(row.id for row in db.query(Counterparty).all()) == ids_before
+    db.close()
+
+def test_resources_are_paginated_with_stable_ids_and_etags(session_factory, client):
+    db = session_factory()
+    for name in ("Ana", "Beto", "Carla"):
+        _add(db, name)
+    db.commit()
+    db.close()
+
+    first = client.get("/resources/clients", params={"limit": 2})
+    assert [c["name"] for c in first.json()] == ["Ana", "Beto"]
+    second = client.get("/resources/clients", params={"limit": 2, "after": first.headers["X-Next-Cursor"]})
+    assert [c["name"] for c in second.json()] == ["Carla"]
+    assert "X-Next-Cursor" not in second.headers
+
+    again = client.get("/resources/clients", params={"limit": 2})
+    assert again.json()[0]["id"] == first.json()[0]["id"]
+
+    etag = first.headers["ETag"]
+    assert client.get("/resources/clients", params={"limit": 2}, headers={"If-None-Match": etag}).status_code == 304
+
+    db = session_factory()
+    _add(db, "Ana")
+    db.commit()
+    db.close()
+    assert client.get("/resources/clients", params={"limit": 2}, headers={"If-None-Match": etag}).status_code == 200
+
+def test_save_registers_counterparty_with_ledger_row(session_factory):
+    tx = Transaction(platform="ZELLE", amount=Decimal(10), currency="USD", transaction_type="SALIDA")
+    with patch("src.transactions.infrastructure.repository.register_counterparty") as register:
+        asyncio.run(TransactionRepository().save(tx))
+    assert register.call_count == 1
+
+def test_bad_cursor_is_rejected(client):
+    assert client.get("/resources/operators", params={"after": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,98 @@
+import asyncio
+import json
+from decimal import Decimal
+from sqlalchemy import text
+from src.shared.infrastructure.events import EventBroker, event_broker
+from src.shared.infrastructure.rate_provider import RateProvider
+from src.transactions.domain.transaction import Transaction
+from src.transactions.infrastructure.repository import TransactionRepository
+
+def _parse(chunk):
+    lines = dict(line.split(": ", 1) for line in chunk.strip().split("\n"))
+    return lines["id"], lines["event"], json.loads(lines["data"])
+
+def test_slow_subscriber_drops_oldest_events():
+    broker = EventBroker(queue_size=2)
+
+    async def scenario():
+        async with broker.subscribe() as queue:
+            for n in range(3):
+                broker.publish("tick", {"n": n})
+            return [queue.get_nowait().data["n"] for _ in range(queue.qsize())]
+
+    assert asyncio.run(scenario()) == [1, 2]
+    assert broker.dropped == 1
+
+def test_stream_replays_missed_events_then_goes_live():
+    broker = EventBroker()
+    first = broker.publish("tick", {"n": 1})
+    broker.publish("tick", {"n": 2})
+
+    async def scenario():
+        stream = broker.stream(last_event_id=first.event_id, heartbeat_seconds=0.01)
+        replayed = await stream.__anext__()
+        assert await stream.__anext__() == ": keep-alive\n\n"
+        broker.publish("tick", {"n": 3})
+        live = await stream.__anext__()
+        await stream.aclose()
+        return replayed, live
+
+    replayed, live = asyncio.run(scenario())
+    assert _parse(replayed)[2] == {"n": 2}
+    assert _parse(live)[1:] == ("tick", {"n": 3})
+    assert broker.subscriber_count == 0
+
+def test_cursor_from_another_epoch_does_not_hide_live_events():
+    previous = EventBroker()
+    for n in range(5):
+        stale = previous.publish("tick", {"n": n})
+    broker = EventBroker() # Restarted process: counter starts over
+
+    async def scenario():
+        stream = broker.stream(last_event_id=stale.event_id, heartbeat_seconds=0.01)
+        assert await stream.__anext__() == ": keep-alive\n\n"
+        broker.publish("tick", {"n": "live"})
+        live = await stream.__anext__()
+        await stream.aclose()
+        return live
+
+    event_id, _, data = _parse(asyncio.run(scenario()))
+    assert event_id == f"{broker.epoch}-1"
+    assert data == {"n": "live"}
+    assert broker.cursor("42") is None
+
+def test_save_and_rate_refresh_publish_deltas(session_factory):
+    async def scenario():
+        async with event_broker.subscribe() as queue:
+            await TransactionRepository().save(Transaction(
+                platform="ZELLE", amount=Decimal(25), currency="USD", transaction_type="ENTRADA", category="OTROS"
+            ))
+            provider = RateProvider(lambda: {"usd_bcv": 36.5})
+            await provider.refresh()
+            await provider.refresh()  # unchanged rates: no tick
+            return [queue.get_nowait() for _ in range(queue.qsize())]
+
+    events = asyncio.run(scenario())
+    assert [e.type for e in events] == ["transaction.created", "pending.changed", "rate.tick"]
+    assert events[0].data["amount_usd"] == Decimal("25.00")
+    assert events[1].data == {"delta": 1}
+    assert events[2].data["ticker"]["bcv_usd"] == 36.5
+
+def test_status_change_publishes_update(session_factory):
+    async def scenario():
+        repo = TransactionRepository()
+        await repo.save(Transaction(
+            platform="ZELLE", amount=Decimal(25), currency="USD", transaction_type="ENTRADA", category="OTROS"
+        ))
+        db = session_factory()
+        tx_id = db.execute(text("SELECT id FROM transactions")).scalar_one()
+        db.close()
+        async with event_broker.subscribe() as queue:
+            await repo.update_status(tx_id, "COMPLETED")
+            return tx_id, [queue.get_nowait() for _ in range(queue.qsize())]
+
+    tx_id, events = asyncio.run(scenario())
+    assert [e.type for e in events] == ["transaction.updated", "pending.changed"]
+    assert events[0].data["id"] == tx_id
+    assert (events[0].data["previous_status"], events[0].data["status"]) == ("PENDING", "COMPLETED")
+    assert events[1].data == {"delta": -1}
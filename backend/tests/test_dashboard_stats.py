@@ -0,0 +1,102 @@
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+import pytest
+from app.models.rollup import DailyRollup
+from app.models.transaction import Transaction as TransactionModel
+from src.dashboard.application.service import DashboardService
+from src.transactions.domain.transaction import Transaction
+from src.transactions.infrastructure.repository import TransactionRepository
+from src.transactions.infrastructure.rollups import backfill_rollups, apply_rollup_delta, rollup_snapshot
+
+def _add(db, amount_usd, tx_type="ENTRADA", status="COMPLETED", days_ago=0, profit=0):
+    db.add(TransactionModel(
+        platform="ZELLE", amount=amount_usd, currency="USD", amount_usd=amount_usd, profit=profit,
+        transaction_type=tx_type, status=status,
+        created_at=datetime.utcnow() - timedelta(days=days_ago)
+    ))
+
+def test_stats_are_read_from_backfilled_rollups(session_factory):
+    db = session_factory()
+    _add(db, 100, days_ago=0, profit=4)
+    _add(db, 50, tx_type="SALIDA", status="PENDING", days_ago=0, profit=-1.5)
+    _add(db, 20, status="PENDING", days_ago=3)
+    _add(db, 1000, days_ago=30)  # outside the chart, still in totals
+    db.commit()
+    assert backfill_rollups(db) == 4
+    db.close()
+
+    stats = asyncio.run(DashboardService().get_stats())
+
+    assert stats.volume == "1,170.00"
+    assert stats.pending_count == 2
+    assert len(stats.chart_data) == 7
+    assert stats.chart_data[-1].volume == 150.0
+    assert stats.chart_data[-1].profit == pytest.approx(2.5)
+    assert stats.net_profit == "2.50"
+    assert stats.chart_data[-4].volume == 20.0
+    assert sum(p.volume for p in stats.chart_data) == 170.0
+
+def test_save_updates_rollup_in_same_transaction(session_factory):
+    repo = TransactionRepository()
+    for amount in (10, 15):
+        asyncio.run(repo.save(Transaction(
+            platform="ZELLE", amount=Decimal(amount), currency="USD",
+            amount_usd=Decimal(amount), transaction_type="ENTRADA"
+        )))
+    stats = asyncio.run(repo.get_stats())
+
+    db = session_factory()
+    rows = db.query(DailyRollup).all()
+    db.close()
+    assert len(rows) == 1
+    assert rows[0].tx_count == 2
+    assert float(rows[0].amount_usd) == 25.0
+    assert stats["volume"] == "25.00"
+    assert stats["chart_data"][-1]["volume"] == 25.0
+
+def _rollups(db):
+    return sorted(
+        (str(r.day), r.transaction_type, r.tx_count, r.pending_count, float(r.amount_usd), float(r.profit))
+        for r in db.query(DailyRollup).all() if r.tx_count
+    )
+
+def test_status_change_moves_pending_count(session_factory):
+    repo = TransactionRepository()
+    for amount in (10, 15):
+        asyncio.run(repo.save(Transaction(
+            platform="ZELLE", amount=Decimal(amount), currency="USD", amount_usd=Decimal(amount),
+            transaction_type="ENTRADA", status="PENDING", category="OTROS"
+        )))
+    db = session_factory()
+    tx_id = db.query(TransactionModel.id).filter(TransactionModel.amount_usd == 10).scalar()
+    db.close()
+
+    updated = asyncio.run(repo.update_status(tx_id, "COMPLETED"))
+    assert updated.status == "COMPLETED"
+    assert asyncio.run(repo.update_status("missing", "COMPLETED")) is None
+    assert asyncio.run(repo.get_stats())["pending_count"] == 1
+
+    db = session_factory()
+    incremental = _rollups(db)
+    backfill_rollups(db)
+    assert incremental == _rollups(db)
+    db.close()
+
+def test_delete_delta_matches_rebuild(session_factory):
+    db = session_factory()
+    _add(db, 100, status="PENDING", profit=4)
+    _add(db, 20, status="PENDING")
+    db.commit()
+    backfill_rollups(db)
+
+    gone = db.query(TransactionModel).filter(TransactionModel.amount_usd == 20).one()
+    apply_rollup_delta(db, removed=[rollup_snapshot(gone)])
+    db.delete(gone)
+    db.commit()
+    incremental = _rollups(db)
+    backfill_rollups(db)
+
+    assert incremental == _rollups(db)
+    assert incremental[0][2:4] == (1, 1)
+    db.close()
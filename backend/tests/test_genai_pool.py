@@ -0,0 +1,40 @@
+from src.shared.infrastructure.genai_pool import GenAIModelPool
+from src.advisor.infrastructure.gemini_client import ADVISOR_MODEL_NAME, GeminiAdvisorClient
+
+def test_same_key_model_and_config_reuse_instance():
+    pool = GenAIModelPool()
+
+    first = pool.get("AIza-key-a", "models/gemini-flash-latest", temperature=0.1)
+    second = pool.get("AIza-key-a", "models/gemini-flash-latest", temperature=0.1)
+
+    assert first is second
+
+def test_clients_are_shared_per_key():
+    pool = GenAIModelPool()
+
+    scanner = pool.get("AIza-key-a", "models/gemini-flash-latest", temperature=0.1)
+    advisor = pool.get("AIza-key-a", "gemini-flash-latest")
+    other_key = pool.get("AIza-key-b", "gemini-flash-latest")
+
+    assert scanner is not advisor
+    assert scanner.client is advisor.client
+    assert other_key.client is not advisor.client
+
+def test_warm_up_builds_one_model_per_key():
+    pool = GenAIModelPool()
+    pool.warm_up(["AIza-key-a", "AIza-key-b"], "models/gemini-flash-latest", temperature=0.1)
+
+    assert pool.size() == {"clients": 2, "models": 2}
+
+def test_advisor_warm_up_prebuilds_the_model_it_uses(monkeypatch):
+    pool = GenAIModelPool()
+    monkeypatch.setattr("src.advisor.infrastructure.gemini_client.genai_pool", pool)
+    client = GeminiAdvisorClient()
+    client.api_keys = ["AIza-key-a", "AIza-key-b"]
+
+    client.warm_up()
+    warmed = pool.size()
+    pool.get("AIza-key-a", ADVISOR_MODEL_NAME)
+
+    assert warmed == {"clients": 2, "models": 2}
+    assert pool.size() == warmed  # The advisor's own lookup hits the warmed entry
@@ -0,0 +1,50 @@
+import asyncio
+import pytest
+from src.scanner.application.key_pool import ApiKeyPool, KeyPoolExhaustedError
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_routes_to_key_with_most_budget():
+    clock = FakeClock()
+    pool = ApiKeyPool(["AIza-key-a", "AIza-key-b"], requests_per_minute=3, cooldown_seconds=60, clock=clock)
+
+    first = pool.try_acquire()
+    second = pool.try_acquire()
+
+    assert {first, second} == {"AIza-key-a", "AIza-key-b"}
+
+def test_rate_limited_key_is_skipped_until_cooldown_ends():
+    clock = FakeClock()
+    pool = ApiKeyPool(["AIza-key-a", "AIza-key-b"], requests_per_minute=60, cooldown_seconds=30, clock=clock)
+
+    pool.report_rate_limited("AIza-key-a")
+    assert all(pool.try_acquire() == "AIza-key-b" for _ in range(5))
+
+    clock.now += 31
+    status = {s["key"]: s for s in pool.snapshot()}
+    assert status["AIza-...ey-a"]["cooldown_remaining"] == 0
+    assert "AIza-key-a" in {pool.try_acquire() for _ in range(60)}
+
+def test_bucket_refills_over_time():
+    clock = FakeClock()
+    pool = ApiKeyPool(["AIza-key-a"], requests_per_minute=2, cooldown_seconds=60, clock=clock)
+
+    assert pool.try_acquire() is not None
+    assert pool.try_acquire() is not None
+    assert pool.try_acquire() is None
+
+    clock.now += 30  # 2 per minute -> one token every 30s
+    assert pool.try_acquire() == "AIza-key-a"
+
+def test_acquire_fails_fast_when_wait_exceeds_timeout():
+    clock = FakeClock()
+    pool = ApiKeyPool(["AIza-key-a"], requests_per_minute=60, cooldown_seconds=120, clock=clock)
+    pool.report_rate_limited("AIza-key-a")
+
+    with pytest.raises(KeyPoolExhaustedError):
+        asyncio.run(pool.acquire(timeout=5))
@@ -0,0 +1,58 @@
+import csv
+import io
+from datetime import datetime, timedelta
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.models.transaction import Transaction as TransactionModel
+from src.transactions.infrastructure import routes
+from src.transactions.infrastructure.export import iter_ledger_batches
+
+@pytest.fixture
+def session_factory(session_factory, monkeypatch):
+    factory = session_factory
+    monkeypatch.setattr("src.transactions.infrastructure.export.SessionLocal", factory)
+
+    start = datetime(2026, 1, 1)
+    db = factory()
+    for i in range(25):
+        db.add(TransactionModel(
+            id=f"tx-{i:02d}", platform="ZELLE", amount=i + 0.5, currency="USD", amount_usd=i + 0.5,
+            transaction_type="ENTRADA", account_id="acc-1" if i % 5 == 0 else "acc-2",
+            created_at=start + timedelta(days=i)
+        ))
+    db.commit()
+    db.close()
+    return factory
+
+@pytest.fixture
+def client(session_factory):
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/transactions")
+    return TestClient(app)
+
+def test_rows_are_read_in_batches(session_factory):
+    batches = list(iter_ledger_batches(batch_size=10))
+    assert [len(b) for b in batches] == [10, 10, 5]
+    assert batches[0][0][0] == "tx-00"
+
+def test_csv_export_applies_filters(client):
+    response = client.get("/transactions/export", params={
+        "format": "csv", "account_id": "acc-1", "date_from": "2026-01-02T00:00:00", "date_to": "2026-01-20T00:00:00"
+    })
+    assert response.status_code == 200
+    assert "attachment" in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [r["id"] for r in rows] == ["tx-05", "tx-10", "tx-15"]
+    assert rows[0]["amount_usd"] == "5.50"
+
+def test_parquet_export_round_trips(client):
+    pq = pytest.importorskip("pyarrow.parquet")
+    response = client.get("/transactions/export", params={"format": "parquet"})
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.num_rows == 25
+    assert str(table.column("amount_usd")[3].as_py()) == "3.50"
+
+def test_unknown_format_is_rejected(client):
+    assert client.get("/transactions/export", params={"format": "xlsx"}).status_code == 422
@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime, timedelta
+from app.models.transaction import Transaction as TransactionModel
+from src.transactions.infrastructure.counterparties import register_counterparty
+from src.transactions.infrastructure.repository import TransactionRepository
+from sqlalchemy import text
+from src.transactions.infrastructure import search
+from src.transactions.infrastructure.search import ensure_search_index, rebuild_search_index, search_transactions
+
+def _add(db, sender=None, receiver=None, reference=None, client_id=None, days_ago=0):
+    sql_tx = TransactionModel(
+        platform="ZELLE", amount=1, currency="USD", amount_usd=1, category="OTROS",
+        transaction_type="ENTRADA" if sender else "SALIDA",
+        sender_name=sender, receiver_name=receiver, reference_id=reference, client_id=client_id,
+        created_at=datetime.utcnow() - timedelta(days=days_ago)
+    )
+    db.add(sql_tx)
+    register_counterparty(db, sql_tx)
+    return sql_tx
+
+def test_existing_rows_are_indexed_and_new_rows_follow_via_triggers(session_factory):
+    db = session_factory()
+    _add(db, sender="Maria Perez")
+    db.commit()
+    assert ensure_search_index(db.get_bind())
+
+    _add(db, receiver="Ana Maria Lopez", days_ago=1)
+    _add(db, sender="Pedro", reference="REF998877")
+    db.commit()
+
+    names = [tx.sender_name or tx.receiver_name for tx in search_transactions(db, "maria")]
+    assert sorted(names) == ["Ana Maria Lopez", "Maria Perez"]
+    assert [tx.reference_id for tx in search_transactions(db, "9988")] == ["REF998877"]
+    assert len(search_transactions(db, "maria", limit=1)) == 1
+    assert len(search_transactions(db, "maria", limit=1, offset=1)) == 1
+
+    # Short queries fall back to a bounded ILIKE scan
+    assert [tx.sender_name for tx in search_transactions(db, "ed")] == ["Pedro"]
+    db.close()
+
+def test_get_by_client_resolves_ids_before_searching(session_factory):
+    db = session_factory()
+    linked = _add(db, sender="Cliente Uno", client_id="client-1")
+    _add(db, sender="Carlos Ruiz")
+    db.commit()
+    linked_id = linked.id
+    db.close()
+
+    repo = TransactionRepository()
+    by_link = asyncio.run(repo.get_by_client("client-1"))
+    by_name = asyncio.run(repo.get_by_client("ruiz"))
+    directory = asyncio.run(repo.get_clients())
+    by_directory_id = asyncio.run(repo.get_by_client(directory[0]["id"]))
+
+    assert [tx.id for tx in by_link] == [linked_id]
+    assert [tx.client_id for tx in by_name] == [None]
+    assert len(by_directory_id) == 1
+
+def test_index_is_rebuilt_when_rowids_move(session_factory):
+    db = session_factory()
+    _add(db, sender="Maria Perez")
+    _add(db, sender="Pedro Gomez")
+    db.commit()
+    engine = db.get_bind()
+    assert ensure_search_index(engine)
+
+    # What a VACUUM or table rebuild can do: rowids renumbered behind the triggers' back
+    db.execute(text("DROP TRIGGER transactions_fts_au"))
+    db.execute(text("UPDATE transactions SET rowid = rowid + 100"))
+    db.commit()
+    assert search_transactions(db, "maria") == []
+
+    search._ready.discard(str(engine.url))  # Next process start
+    assert ensure_search_index(engine)
+    assert [tx.sender_name for tx in search_transactions(db, "maria")] == ["Maria Perez"]
+
+    db.execute(text("UPDATE transactions SET rowid = rowid + 100"))  # Trigger is back: stays in sync
+    db.commit()
+    assert rebuild_search_index(engine)
+    assert [tx.sender_name for tx in search_transactions(db, "pedro")] == ["Pedro Gomez"]
+    db.close()
@@ -0,0 +1,72 @@
+import io
+import pytest
+from PIL import Image, ImageDraw
+from app.cache.hashing import AverageHashStrategy, DifferenceHashStrategy
+from app.cache.manager import CacheManager
+from app.cache.similarity import PerceptualHashIndex
+from app.cache.storage import InMemoryCacheStorage
+
+FIXTURE = "tests/fixtures/comprobante-desde-bancamiga.jpeg"
+OTHER_FIXTURE = "tests/fixtures/comprobante-desde-banco-de-venezuela.jpeg"
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def _recompress(content, scale=0.5, quality=40):
+    with Image.open(io.BytesIO(content)) as img:
+        resized = img.resize((int(img.width * scale), int(img.height * scale)))
+        out = io.BytesIO()
+        resized.save(out, format="JPEG", quality=quality)
+        return out.getvalue()
+
+def _with_text(content, text):
+    """Same receipt template with a different amount/reference drawn on it."""
+    with Image.open(io.BytesIO(content)) as img:
+        img = img.convert("RGB")
+        draw = ImageDraw.Draw(img)
+        draw.rectangle((40, img.height // 2, img.width - 40, img.height // 2 + 30), fill="white")
+        draw.text((50, img.height // 2 + 5), text, fill="black")
+        out = io.BytesIO()
+        img.save(out, format="JPEG", quality=90)
+        return out.getvalue()
+
+@pytest.mark.parametrize("strategy", [AverageHashStrategy(), DifferenceHashStrategy()])
+def test_perceptual_hash_is_stable_under_recompression(strategy):
+    original = _read(FIXTURE)
+    a = int(strategy.compute_hash(original), 16)
+    b = int(strategy.compute_hash(_recompress(original)), 16)
+
+    assert bin(a ^ b).count("1") <= 6
+
+def test_perceptual_hash_rejects_non_images():
+    with pytest.raises(ValueError):
+        DifferenceHashStrategy().compute_hash(b"%PDF-1.4 not an image")
+
+def test_index_finds_near_duplicate_and_ignores_other_receipts():
+    index = PerceptualHashIndex(max_distance=6, maxsize=10)
+    index.add(_read(FIXTURE), "key-1")
+
+    assert index.lookup(_recompress(_read(FIXTURE)))[0] == "key-1"
+    assert index.lookup(_read(OTHER_FIXTURE)) is None
+
+def test_cache_manager_only_flags_near_duplicates():
+    InMemoryCacheStorage().clear()
+    manager = CacheManager(namespace="phash-test", similarity_index=PerceptualHashIndex(max_distance=6))
+    manager.set(_read(FIXTURE), {"reference_id": "123"})
+
+    assert manager.get(_recompress(_read(FIXTURE))) is None
+    assert manager.find_near_duplicate(_recompress(_read(FIXTURE))) is not None
+    assert manager.stats()["misses"] == 1
+
+def test_same_template_with_other_amount_is_never_served_from_cache():
+    InMemoryCacheStorage().clear()
+    manager = CacheManager(namespace="phash-test", similarity_index=PerceptualHashIndex(max_distance=6))
+    first = _with_text(_read(FIXTURE), "Monto: Bs. 1.250,00  Ref: 000123")
+    second = _with_text(_read(FIXTURE), "Monto: Bs. 9.870,00  Ref: 000456")
+    manager.set(first, {"reference_id": "000123"})
+
+    # Hashes alike, so it can only be flagged as a possible duplicate
+    assert manager.find_near_duplicate(second) is not None
+    assert manager.get(second) is None
+    assert manager.get(first) == {"reference_id": "000123"}
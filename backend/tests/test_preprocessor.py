@@ -0,0 +1,80 @@
+import io
+from unittest.mock import patch
+import pytest
+from PIL import Image
+from src.scanner.application.preprocessor import ImagePreprocessor
+
+FIXTURE = "tests/fixtures/comprobante-desde-banco-de-venezuela.jpeg"
+
+def _large_png_with_exif():
+    img = Image.new("RGB", (3000, 4000), "white")
+    exif = Image.Exif()
+    exif[0x010F] = "PhoneMaker"  # Make
+    out = io.BytesIO()
+    img.save(out, format="PNG", exif=exif)
+    return out.getvalue()
+
+def test_large_image_is_downscaled_and_stripped():
+    preprocessor = ImagePreprocessor()
+    result = preprocessor.process(_large_png_with_exif(), "image/png")
+
+    with Image.open(io.BytesIO(result.content)) as img:
+        assert max(img.size) <= preprocessor.max_dimension
+        assert not img.getexif()
+    assert result.content_type == "image/jpeg"
+    assert result.bytes_saved > 0
+    assert preprocessor.stats()["processed"] == 1
+
+def test_pdf_passes_through_untouched():
+    content = b"%PDF-1.4 receipt"
+    result = ImagePreprocessor().process(content, "application/pdf")
+
+    assert result.content == content
+    assert result.content_type == "application/pdf"
+    assert result.bytes_saved == 0
+
+def test_metadata_is_stripped_even_when_not_smaller():
+    img = Image.effect_noise((200, 200), 64).convert("RGB")  # Re-encodes larger at the default quality
+    exif = Image.Exif()
+    exif[0x8825] = {2: (10.0, 30.0, 0.0)}  # GPSInfo
+    out = io.BytesIO()
+    img.save(out, format="JPEG", quality=5, exif=exif)
+    result = ImagePreprocessor().process(out.getvalue(), "image/jpeg")
+
+    with Image.open(io.BytesIO(result.content)) as processed:
+        assert not processed.getexif()
+    assert result.processed_bytes > result.original_bytes
+
+def test_transparent_areas_become_white():
+    img = Image.new("RGBA", (20, 20), (0, 0, 0, 0))
+    img.paste((200, 0, 0, 255), (0, 0, 10, 20))
+    out = io.BytesIO()
+    img.save(out, format="PNG")
+    result = ImagePreprocessor().process(out.getvalue(), "image/png")
+
+    with Image.open(io.BytesIO(result.content)) as processed:
+        assert all(channel > 240 for channel in processed.convert("RGB").getpixel((15, 10)))
+        assert processed.convert("RGB").getpixel((2, 10))[0] > 150
+
+def test_real_receipt_is_reencoded_without_metadata():
+    with open(FIXTURE, "rb") as f:
+        content = f.read()
+    result = ImagePreprocessor().process(content, "image/jpeg")
+
+    assert result.content != content
+    with Image.open(io.BytesIO(result.content)) as processed:
+        assert not processed.getexif()
+
+@pytest.mark.parametrize("setting, content_type", [("webp", "image/webp"), ("JPEG", "image/jpeg")])
+def test_content_type_matches_the_encoded_format(setting, content_type):
+    with patch("src.scanner.application.preprocessor.settings.GEMINI_SCANNER_IMAGE_FORMAT", setting):
+        result = ImagePreprocessor().process(_large_png_with_exif(), "image/png")
+
+    assert result.content_type == content_type
+    with Image.open(io.BytesIO(result.content)) as img:
+        assert img.format == setting.upper()
+
+def test_unsupported_output_format_is_rejected_at_startup():
+    with patch("src.scanner.application.preprocessor.settings.GEMINI_SCANNER_IMAGE_FORMAT", "PNG"):
+        with pytest.raises(ValueError, match="GEMINI_SCANNER_IMAGE_FORMAT"):
+            ImagePreprocessor()
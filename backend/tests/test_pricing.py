@@ -0,0 +1,163 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+import numpy as np
+import pytest
+from app.models.outbox import OutboxEntry
+from app.models.rollup import DailyRollup
+from app.models.transaction import Transaction as TransactionModel
+from src.shared.infrastructure.replication import enqueue, model_payload
+from src.shared.infrastructure.response_cache import ledger_version
+from src.shared.infrastructure.rate_history import record_rates
+from src.transactions.domain.transaction import Transaction
+from src.transactions.infrastructure.pricing import RateSeries, RateTable, compute_pricing, backfill_pricing
+from src.transactions.infrastructure.repository import TransactionRepository
+from src.transactions.infrastructure.rollups import backfill_rollups
+
+T0 = datetime(2026, 3, 2, 9, 0)
+
+@pytest.fixture
+def session_factory(session_factory):
+    factory = session_factory
+    db = factory()
+    # Rates change at 09:00 and 12:00
+    record_rates(db, {"usd_bcv": 36.0, "eur_bcv": 39.6, "usd_binance_sell": 40.0}, captured_at=T0)
+    record_rates(db, {"usd_bcv": 37.0, "eur_bcv": 40.7, "usd_binance_sell": 50.0}, captured_at=T0 + timedelta(hours=3))
+    db.commit()
+    db.close()
+    return factory
+
+def test_asof_picks_the_rate_in_force():
+    series = RateSeries(
+        np.array([T0, T0 + timedelta(hours=3)], dtype="datetime64[us]"),
+        np.array([40.0, 50.0])
+    )
+    when = np.array([T0 - timedelta(minutes=1), T0, T0 + timedelta(hours=2), T0 + timedelta(days=1), None],
+                    dtype="datetime64[us]")
+    result = series.asof(when)
+    assert np.isnan(result[0]) and np.isnan(result[4])
+    assert list(result[1:4]) == [40.0, 40.0, 50.0]
+
+def test_compute_pricing_for_each_currency(session_factory):
+    db = session_factory()
+    table = RateTable.load(db)
+    db.close()
+    at = T0 + timedelta(hours=1)
+    priced = compute_pricing(table, [
+        {"amount": 4000, "currency": "VES", "transaction_type": "ENTRADA", "exchange_rate": 50, "transaction_date": at},
+        {"amount": 100, "currency": "USD", "transaction_type": "ENTRADA", "exchange_rate": 38, "transaction_date": at},
+        {"amount": 100, "currency": "EUR", "transaction_type": "SALIDA", "exchange_rate": 1, "transaction_date": at},
+        {"amount": 100, "currency": "USD", "transaction_type": "ENTRADA", "exchange_rate": 1, "transaction_date": T0 - timedelta(days=1)},
+    ])
+    assert list(priced["market_rate"][:3]) == [40.0, 40.0, 40.0]
+    assert priced["amount_usd"][:3] == pytest.approx([100.0, 100.0, 110.0])
+    # Client paid 50 VES/USD against a 40 market: we keep 4000/40 - 4000/50 = 20 USD
+    assert priced["profit"][0] == pytest.approx(20.0)
+    # We bought 100 USD paying 38 VES each (worth 95 USD at 40): 5 USD spread
+    assert priced["profit"][1] == pytest.approx(5.0)
+    assert np.isnan(priced["profit"][2])  # no conversion rate applied
+    assert np.isnan(priced["market_rate"][3])  # before the first capture
+    assert priced["amount_usd"][3] == 100.0
+
+def test_save_prices_new_rows_and_rollups(session_factory):
+    repo = TransactionRepository()
+    asyncio.run(repo.save(Transaction(
+        platform="PAGO_MOVIL_GENERICO", amount=Decimal(5000), currency="VES", transaction_type="ENTRADA",
+        exchange_rate=Decimal(55), transaction_date=T0 + timedelta(hours=4), category="OTROS"
+    )))
+    db = session_factory()
+    row = db.query(TransactionModel).one()
+    db.close()
+    assert row.market_rate == Decimal("50.000000")
+    assert row.amount_usd == Decimal("100.00")
+    assert row.profit == Decimal("9.09")
+    assert asyncio.run(repo.get_stats())["net_profit"] == "9.09"
+
+def test_save_many_prices_mixed_aware_and_naive_dates(session_factory):
+    caracas = timezone(timedelta(hours=-4))
+    rows = [
+        {"platform": "BINANCE", "amount": 100, "currency": "USD", "transaction_type": "ENTRADA",
+         "exchange_rate": 38, "category": "OTROS", "transaction_date": T0 + timedelta(hours=1)},
+        # 10:00 in Caracas is 14:00 UTC, after the noon rate change
+        {"platform": "BINANCE", "amount": 100, "currency": "USD", "transaction_type": "ENTRADA",
+         "exchange_rate": 38, "category": "OTROS", "transaction_date": (T0 + timedelta(hours=1)).replace(tzinfo=caracas)},
+    ]
+    assert asyncio.run(TransactionRepository().save_many(rows)) == 2
+
+    db = session_factory()
+    rates = sorted(r.market_rate for r in db.query(TransactionModel).all())
+    db.close()
+    assert rates == [Decimal("40.000000"), Decimal("50.000000")]
+
+def test_backfill_prices_the_whole_ledger(session_factory):
+    db = session_factory()
+    for hours in (1, 4):
+        db.add(TransactionModel(
+            platform="PAGO_MOVIL", amount=4000, currency="VES", transaction_type="SALIDA",
+            exchange_rate=45, transaction_date=T0 + timedelta(hours=hours)
+        ))
+    db.add(TransactionModel(platform="ZELLE", amount=20, currency="USD", amount_usd=20,
+                            transaction_type="ENTRADA", transaction_date=T0))
+    db.commit()
+
+    assert backfill_pricing(db, batch_size=2) == 3
+    rows = sorted(db.query(TransactionModel).filter_by(currency="VES").all(), key=lambda r: r.transaction_date)
+    assert [r.amount_usd for r in rows] == [Decimal("100.00"), Decimal("80.00")]
+    # Paid out at 45 VES/USD: 4000/45 - 4000/40 = -11.11 against a 40 market, +8.89 against 50
+    assert [r.profit for r in rows] == [Decimal("-11.11"), Decimal("8.89")]
+    assert backfill_pricing(db) == 0  # already priced
+    db.close()
+
+def _unpriced_ledger(db):
+    for hours in (1, 4):
+        db.add(TransactionModel(
+            platform="PAGO_MOVIL", amount=4000, currency="VES", transaction_type="SALIDA",
+            exchange_rate=45, transaction_date=T0 + timedelta(hours=hours), created_at=T0 + timedelta(hours=hours)
+        ))
+    db.commit()
+
+def _rollups(db):
+    return sorted((str(r.day), r.tx_count, float(r.amount_usd), float(r.profit)) for r in db.query(DailyRollup).all())
+
+def test_backfill_moves_rollups_with_the_new_prices(session_factory):
+    db = session_factory()
+    _unpriced_ledger(db)
+    backfill_rollups(db)
+    assert _rollups(db) == [("2026-03-02", 2, 0.0, 0.0)]
+
+    backfill_pricing(db)
+    incremental = _rollups(db)
+    backfill_rollups(db)
+
+    assert incremental == _rollups(db) == [("2026-03-02", 2, 180.0, pytest.approx(-2.22))]
+    db.close()
+
+def test_backfill_bumps_the_ledger_version(session_factory):
+    db = session_factory()
+    _unpriced_ledger(db)
+    version = ledger_version.value
+
+    backfill_pricing(db, batch_size=1)
+    assert ledger_version.value == version + 2  # one per committed batch
+    backfill_pricing(db)
+    assert ledger_version.value == version + 2  # nothing changed
+    db.close()
+
+def test_backfill_queues_new_row_versions_for_replication(session_factory, monkeypatch):
+    monkeypatch.setattr("src.shared.infrastructure.replication.replication_enabled", lambda: True)
+    db = session_factory()
+    _unpriced_ledger(db)
+    enqueue(db, "transactions", [model_payload(tx) for tx in db.query(TransactionModel).all()])
+    db.commit()
+
+    backfill_pricing(db)
+    pending = db.query(OutboxEntry).filter(OutboxEntry.replicated_at.is_(None)).all()
+    superseded = db.query(OutboxEntry).filter(OutboxEntry.last_error == "superseded").count()
+
+    assert superseded == 2  # the stale insert entries
+    assert sorted(json.loads(e.payload)["amount_usd"] for e in pending) == [80.0, 100.0]
+    assert all(e.idempotency_key.count(":") == 2 for e in pending)
+    assert backfill_pricing(db, overwrite=True) == 0
+    assert db.query(OutboxEntry).filter(OutboxEntry.replicated_at.is_(None)).count() == 2
+    db.close()
@@ -0,0 +1,100 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect, select, text
+from app.core import database_sb
+from app.models.rate_history import RateHistory
+from src.dashboard.infrastructure.routes import router
+from src.shared.infrastructure.rate_history import record_rates, series, ohlc, apply_retention
+from src.shared.infrastructure.rate_provider import RateProvider
+
+T0 = datetime(2026, 3, 2, 9, 0)
+
+def _record(db, minutes, usd_bcv):
+    record_rates(db, {"usd_bcv": usd_bcv, "usd_binance_sell": usd_bcv + 4}, captured_at=T0 + timedelta(minutes=minutes))
+
+def test_range_query_reads_one_series(session_factory):
+    db = session_factory()
+    for minutes, rate in [(0, 36.0), (20, 36.4), (50, 35.9), (70, 36.8)]:
+        _record(db, minutes, rate)
+    _record(db, 0, 36.0)  # same capture again: ignored
+    db.commit()
+
+    points = series(db, "USD/VES", "bcv", start=T0 + timedelta(minutes=10), end=T0 + timedelta(hours=1))
+    assert [rate for _, rate in points] == [36.4, 35.9]
+    assert db.query(RateHistory).count() == 8
+
+    candles = ohlc(db, "USD/VES", "bcv", "hour")
+    assert [(c["open"], c["high"], c["low"], c["close"], c["count"]) for c in candles] == [
+        (36.0, 36.4, 35.9, 35.9, 3), (36.8, 36.8, 36.8, 36.8, 1)
+    ]
+    assert [c["bucket"] for c in candles] == [T0, T0 + timedelta(hours=1)]
+    assert ohlc(db, "USD/VES", "bcv", "hour", start=T0 + timedelta(minutes=10))[0]["open"] == 36.4
+    assert ohlc(db, "USD/VES", "bcv", "day")[0]["count"] == 4
+    with pytest.raises(ValueError):
+        ohlc(db, "USD/VES", "bcv", "week")
+    db.close()
+
+def test_retention_thins_old_points_to_hourly_closes(session_factory):
+    db = session_factory()
+    for minutes, rate in [(0, 36.0), (20, 36.4), (50, 35.9), (70, 36.8)]:
+        _record(db, minutes, rate)
+    db.commit()
+
+    result = apply_retention(db, now=T0 + timedelta(days=40))
+    db.commit()
+    assert result == {"expired": 0, "thinned": 4}  # 2 per series in the first hour
+    assert [rate for _, rate in series(db, "USD/VES", "bcv")] == [35.9, 36.8]
+
+    assert apply_retention(db, now=T0 + timedelta(days=1000))["expired"] == 4
+    db.close()
+
+def test_provider_records_each_fresh_snapshot(session_factory):
+    def recorder(rates):
+        db = session_factory()
+        record_rates(db, rates)
+        db.commit()
+        db.close()
+
+    provider = RateProvider(lambda: {"usd_bcv": 36.5, "last_updated": "2026-03-02T09:00:00+00:00"}, recorder=recorder)
+    asyncio.run(provider.refresh())
+
+    db = session_factory()
+    row = db.scalars(select(RateHistory)).one()
+    assert (row.pair, row.source, row.captured_at, row.rate) == ("USD/VES", "bcv", T0, 36.5)
+    db.close()
+
+def test_history_endpoints(session_factory):
+    db = session_factory()
+    _record(db, 0, 36.0)
+    _record(db, 30, 36.6)
+    db.commit()
+    db.close()
+
+    app = FastAPI()
+    app.include_router(router, prefix="/stats")
+    client = TestClient(app)
+
+    history = client.get("/stats/rates/history", params={"pair": "USDT/VES", "source": "binance_sell"}).json()
+    assert [p["rate"] for p in history] == [40.0, 40.6]
+    candles = client.get("/stats/rates/ohlc", params={"bucket": "day"}).json()
+    assert candles[0]["open"] == 36.0 and candles[0]["close"] == 36.6
+    assert client.get("/stats/rates/ohlc", params={"bucket": "minute"}).status_code == 400
+
+def test_ensure_indexes_adds_missing_index_to_existing_table(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rates.db'}")
+    with engine.begin() as conn:  # Table as created before last_updated was indexed
+        conn.execute(text(
+            "CREATE TABLE exchange_rates_local (id INTEGER PRIMARY KEY, usd_bcv FLOAT NOT NULL, "
+            "eur_bcv FLOAT NOT NULL, usd_binance_buy FLOAT, usd_binance_sell FLOAT, "
+            "last_updated DATETIME NOT NULL, source VARCHAR)"
+        ))
+    monkeypatch.setattr(database_sb, "engine", engine)
+
+    database_sb.ensure_indexes()
+    database_sb.ensure_indexes()  # idempotent
+
+    indexed = {tuple(ix["column_names"]) for ix in inspect(engine).get_indexes("exchange_rates_local")}
+    assert ("last_updated",) in indexed
@@ -0,0 +1,88 @@
+import asyncio
+import time
+from src.shared.infrastructure.rate_provider import RateProvider, ticker_from_rates
+
+class Fetcher:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        result = self.results.pop(0) if len(self.results) > 1 else self.results[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+def test_lookups_are_served_from_the_snapshot():
+    fetcher = Fetcher({"usd_bcv": 36.5, "usd_binance_sell": 40.1})
+    provider = RateProvider(fetcher, refresh_seconds=60)
+
+    async def scenario():
+        first = await provider.get_rates()
+        for _ in range(100):
+            assert provider.snapshot() == first
+        return first
+
+    rates = asyncio.run(scenario())
+    assert fetcher.calls == 1
+    assert ticker_from_rates(rates)["global_rate"] == "40.10 VES"
+
+def test_failed_refresh_keeps_last_known_good():
+    fetcher = Fetcher({"usd_bcv": 36.5}, RuntimeError("supabase down"), None)
+    provider = RateProvider(fetcher, refresh_seconds=60)
+
+    async def scenario():
+        await provider.refresh()
+        assert await provider.refresh() is False
+        assert await provider.refresh() is False
+
+    asyncio.run(scenario())
+    assert provider.snapshot() == {"usd_bcv": 36.5}
+    assert provider.status()["last_error"] == "no rates returned"
+
+def test_stale_snapshot_is_returned_while_revalidating():
+    fetcher = Fetcher({"usd_bcv": 36.5}, {"usd_bcv": 37.0})
+    provider = RateProvider(fetcher, refresh_seconds=0.01)
+
+    async def scenario():
+        await provider.refresh()
+        provider._task = asyncio.get_running_loop().create_future()  # running, without the loop task
+        await asyncio.sleep(0.02)
+        stale = provider.snapshot()
+        await provider._refreshing
+        return stale, provider.snapshot()
+
+    stale, fresh = asyncio.run(scenario())
+    assert stale == {"usd_bcv": 36.5}
+    assert fresh == {"usd_bcv": 37.0}
+
+def test_background_task_refreshes_on_interval():
+    fetcher = Fetcher({"usd_bcv": 36.5})
+    provider = RateProvider(fetcher, refresh_seconds=0.01)
+
+    async def scenario():
+        await provider.start()
+        await asyncio.sleep(0.05)
+        await provider.stop()
+
+    asyncio.run(scenario())
+    assert fetcher.calls >= 2
+    assert provider.status()["running"] is False
+
+def test_concurrent_cold_reads_share_one_fetch():
+    calls = []
+
+    def slow_fetcher():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"usd_bcv": 36.5}
+
+    provider = RateProvider(slow_fetcher, refresh_seconds=60)
+
+    async def scenario():
+        return await asyncio.gather(*(provider.get_rates() for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(r["usd_bcv"] == 36.5 for r in results)
@@ -0,0 +1,105 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+import pytest
+from sqlalchemy import select
+from app.core import database_sb
+from app.models.outbox import OutboxEntry
+from src.shared.infrastructure.replication import SupabaseReplicator
+from src.transactions.domain.transaction import Transaction
+from src.transactions.infrastructure.repository import TransactionRepository
+
+class FakeSupabase:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.upserts = []
+
+    def table(self, name):
+        self._table = name
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self._pending = (self._table, rows, on_conflict)
+        return self
+
+    def execute(self):
+        if self.fail:
+            raise RuntimeError("supabase down")
+        self.upserts.append(self._pending)
+
+@pytest.fixture
+def session_factory(session_factory, monkeypatch):
+    monkeypatch.setattr("src.shared.infrastructure.replication.replication_enabled", lambda: True)
+    return session_factory
+
+def _save(amount):
+    return asyncio.run(TransactionRepository().save(Transaction(
+        platform="ZELLE", amount=Decimal(amount), currency="USD",
+        amount_usd=Decimal(amount), transaction_type="ENTRADA", category="OTROS"
+    )))
+
+def test_save_enqueues_and_replicator_upserts_once(session_factory):
+    _save(10)
+    _save(15)
+
+    db = session_factory()
+    entries = db.scalars(select(OutboxEntry)).all()
+    assert [e.target_table for e in entries] == ["transactions", "transactions"]
+    db.close()
+
+    client = FakeSupabase()
+    replicator = SupabaseReplicator(session_factory, lambda: client)
+    assert replicator.metrics()["pending"] == 2
+    assert replicator.run_once() == 2
+    assert replicator.run_once() == 0  # nothing resent
+
+    table, rows, on_conflict = client.upserts[0]
+    assert table == "transactions" and on_conflict == "id"
+    assert sorted(r["amount"] for r in rows) == [10.0, 15.0]
+    assert replicator.metrics()["pending"] == 0
+
+def test_failed_batches_back_off_and_report_lag(session_factory):
+    _save(10)
+    client = FakeSupabase(fail=True)
+    replicator = SupabaseReplicator(session_factory, lambda: client)
+    now = datetime.utcnow() + timedelta(seconds=30)
+
+    assert replicator.run_once(now) == 0
+    metrics = replicator.metrics(now)
+    assert metrics["pending"] == 1 and metrics["retrying"] == 1
+    assert metrics["lag_seconds"] >= 30
+    assert "supabase down" in metrics["last_error"]
+
+    client.fail = False
+    assert replicator.run_once(now) == 0  # still backing off
+    assert replicator.run_once(now + timedelta(minutes=10)) == 1
+
+def test_save_rates_queues_rows_with_stable_ids(session_factory, monkeypatch):
+    monkeypatch.setattr(database_sb, "SessionLocal", session_factory)
+    database_sb.save_rates(36.5, 39.1, usd_binance_buy=40.0)
+
+    db = session_factory()
+    payloads = [json.loads(e.payload) for e in db.scalars(select(OutboxEntry)).all()]
+    assert db.query(database_sb.ExchangeRateLocal).count() == 1
+    db.close()
+    assert {(p["from_currency"], p["rate"]) for p in payloads} == {("USD", 36.5), ("EUR", 39.1), ("USDT", 40.0)}
+    assert len({p["id"] for p in payloads}) == 3
+
+def test_status_update_replaces_pending_insert_with_latest_version(session_factory):
+    _save(10)
+    db = session_factory()
+    tx_id = db.scalar(select(OutboxEntry.idempotency_key)).split(":")[1]
+    db.close()
+    repo = TransactionRepository()
+    client = FakeSupabase()
+    replicator = SupabaseReplicator(session_factory, lambda: client)
+
+    asyncio.run(repo.update_status(tx_id, "COMPLETED"))
+    assert replicator.metrics()["pending"] == 1
+    assert replicator.run_once() == 1
+    assert [r["status"] for r in client.upserts[-1][1]] == ["COMPLETED"]
+
+    asyncio.run(repo.update_status(tx_id, "PENDING"))  # Back again: a new version, not a duplicate key
+    assert replicator.run_once() == 1
+    assert [r["status"] for r in client.upserts[-1][1]] == ["PENDING"]
@@ -0,0 +1,94 @@
+import asyncio
+from decimal import Decimal
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.models.transaction import Transaction as TransactionModel
+from src.shared.infrastructure.response_cache import ResponseCache, ledger_version
+from src.transactions.domain.transaction import Transaction
+from src.transactions.infrastructure import routes
+from src.transactions.infrastructure.repository import TransactionRepository
+
+@pytest.fixture
+def client(session_factory, monkeypatch):
+    monkeypatch.setattr(routes, "response_cache", ResponseCache(maxsize=8, ttl_seconds=60))
+    db = session_factory()
+    db.add(TransactionModel(id="tx-1", platform="ZELLE", amount=5, currency="USD", amount_usd=5,
+                            category="OTROS", transaction_type="ENTRADA"))
+    db.commit()
+    db.close()
+
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/transactions")
+    return TestClient(app)
+
+def _save(amount):
+    asyncio.run(TransactionRepository().save(Transaction(
+        platform="ZELLE", amount=Decimal(amount), currency="USD", transaction_type="ENTRADA", category="OTROS"
+    )))
+
+def test_unchanged_polls_are_served_from_cache_with_304(client):
+    cache = routes.response_cache
+    first = client.get("/transactions/", params={"limit": 10})
+    etag = first.headers["ETag"]
+    assert [tx["id"] for tx in first.json()] == ["tx-1"]
+
+    # Parameter order does not matter for the cache key
+    again = client.get("/transactions/?status=PENDING&limit=10")
+    same = client.get("/transactions/?limit=10&status=PENDING")
+    assert again.content == same.content
+    assert client.get("/transactions/", params={"limit": 10}, headers={"If-None-Match": etag}).status_code == 304
+    assert (cache.hits, cache.misses, cache.not_modified) == (2, 2, 1)
+
+def test_ledger_write_invalidates_cached_pages(client):
+    first = client.get("/transactions/", params={"limit": 10})
+    version = ledger_version.value
+    _save(7)
+    assert ledger_version.value == version + 1
+
+    fresh = client.get("/transactions/", params={"limit": 10}, headers={"If-None-Match": first.headers["ETag"]})
+    assert fresh.status_code == 200
+    assert len(fresh.json()) == 2
+    assert fresh.headers["ETag"] != first.headers["ETag"]
+
+def test_cache_is_bounded_and_errors_are_not_cached(client):
+    cache = routes.response_cache
+    for limit in range(1, 12):
+        client.get("/transactions/", params={"limit": limit})
+    assert cache.stats()["entries"] == 8
+
+    assert client.get("/transactions/", params={"after": "bogus"}).status_code == 400
+    assert client.get("/transactions/", params={"after": "bogus"}).status_code == 400
+    assert cache.stats()["entries"] == 8
+
+def test_next_cursor_header_is_replayed_from_cache(client):
+    _save(1)
+    first = client.get("/transactions/", params={"limit": 1})
+    cached = client.get("/transactions/", params={"limit": 1})
+    assert cached.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+    assert routes.response_cache.hits == 1
+
+def test_fallback_dashboard_is_served_but_not_cached(session_factory, monkeypatch):
+    from src.dashboard.infrastructure import routes as dashboard_routes
+    monkeypatch.setattr(dashboard_routes, "response_cache", ResponseCache(maxsize=8, ttl_seconds=60))
+    app = FastAPI()
+    app.include_router(dashboard_routes.router, prefix="/stats")
+    client = TestClient(app)
+    compute_stats = dashboard_routes.service.compute_stats
+    failures = [RuntimeError("database is locked")]
+
+    async def flaky(db=None):
+        if failures:
+            raise failures.pop()
+        return await compute_stats(db)
+    monkeypatch.setattr(dashboard_routes.service, "compute_stats", flaky)
+    _save(42)
+
+    fallback = client.get("/stats/")
+    assert fallback.status_code == 200
+    assert fallback.json()["volume"] == "0.00"
+    assert fallback.headers["Cache-Control"] == "no-store"
+
+    recovered = client.get("/stats/")  # Same ledger version, but the fallback was not stored
+    assert recovered.json()["volume"] == "42.00"
+    assert recovered.headers["Cache-Control"] == "no-cache"
@@ -0,0 +1,99 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+import pytest
+from src.scanner.application.key_pool import ApiKeyPool, KeyPoolExhaustedError
+from src.scanner.application.retry_policy import (
+    RetryPolicy, CircuitBreaker, CircuitOpenError, RATE_LIMITED, KEY_REJECTED, RETRYABLE, FATAL
+)
+from src.scanner.application.scanner_service import GeminiScannerService
+
+class FakeAPIError(Exception):
+    def __init__(self, code):
+        super().__init__(f"{code} error")
+        self.code = code
+
+def _service(side_effect, keys=("AIza-key-a", "AIza-key-b")):
+    service = GeminiScannerService()
+    service.key_pool = ApiKeyPool(list(keys), requests_per_minute=60, cooldown_seconds=60)
+    service.retry_policy = RetryPolicy(max_retries=3, base_delay=0, max_delay=0, deadline_seconds=5)
+    service.circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    model = MagicMock()
+    model.generate = AsyncMock(side_effect=side_effect)
+    service.model_pool = MagicMock()
+    service.model_pool.get.return_value = model
+    return service, model
+
+def test_classify_errors():
+    assert RetryPolicy.classify(FakeAPIError(429)) == RATE_LIMITED
+    assert RetryPolicy.classify(FakeAPIError(403)) == KEY_REJECTED
+    assert RetryPolicy.classify(FakeAPIError(503)) == RETRYABLE
+    assert RetryPolicy.classify(FakeAPIError(400)) == FATAL
+    assert RetryPolicy.classify(asyncio.TimeoutError()) == RETRYABLE
+
+def test_backoff_is_bounded():
+    policy = RetryPolicy(base_delay=1, max_delay=4, deadline_seconds=10)
+    assert all(0 <= policy.backoff(attempt) <= 4 for attempt in range(10))
+
+def test_rate_limited_key_is_swapped_for_another():
+    service, model = _service([FakeAPIError(429), MagicMock(text="{}")])
+
+    assert asyncio.run(service._call_gemini_with_retry(b"img", "image/jpeg")) == "{}"
+
+    used_keys = [call.args[0] for call in service.model_pool.get.call_args_list]
+    assert len(set(used_keys)) == 2
+
+def test_fatal_error_is_not_retried():
+    service, model = _service([FakeAPIError(400)])
+
+    with pytest.raises(FakeAPIError):
+        asyncio.run(service._call_gemini_with_retry(b"img", "image/jpeg"))
+
+    assert model.generate.call_count == 1
+
+def test_circuit_opens_when_all_keys_are_exhausted():
+    service, model = _service([FakeAPIError(429)] * 5, keys=("AIza-key-a",))
+
+    with pytest.raises(KeyPoolExhaustedError):
+        asyncio.run(service._call_gemini_with_retry(b"img", "image/jpeg"))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(service._call_gemini_with_retry(b"img", "image/jpeg"))
+
+    assert model.generate.call_count == 1
+
+def test_expired_deadline_is_not_counted_as_key_exhaustion():
+    service, model = _service([MagicMock(text="{}")])
+    service.retry_policy = RetryPolicy(max_retries=3, base_delay=0, max_delay=0, deadline_seconds=0)
+    service.key_pool.acquire = AsyncMock(side_effect=KeyPoolExhaustedError("no slot"))
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(service._call_gemini_with_retry(b"img", "image/jpeg"))
+
+    assert service.key_pool.acquire.call_args.kwargs["timeout"] == 0
+    assert service.circuit_breaker.failures == 0
+    assert service.circuit_breaker.state == "closed"
+    assert model.generate.call_count == 0
+
+def test_cancelled_half_open_trial_lets_the_next_call_through():
+    now = [0.0]
+    service, model = _service([])
+    service.circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=lambda: now[0])
+    service.circuit_breaker.record_failure()
+    now[0] = 31  # half-open: the next call is the trial
+
+    async def scenario():
+        async def hang(parts):
+            await asyncio.Event().wait()
+
+        model.generate = AsyncMock(side_effect=hang)
+        trial = asyncio.create_task(service._call_gemini_with_retry(b"img", "image/jpeg"))
+        await asyncio.sleep(0.01)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        model.generate = AsyncMock(return_value=MagicMock(text="{}"))
+        return await service._call_gemini_with_retry(b"img", "image/jpeg")
+
+    assert asyncio.run(scenario()) == "{}"
+    assert service.circuit_breaker.state == "closed"
+    assert all(state.in_flight == 0 for state in service.key_pool._states)
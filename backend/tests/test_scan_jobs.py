@@ -0,0 +1,120 @@
+import asyncio
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from src.scanner.application.job_queue import ScanJobQueue, CallbackUrlError, validate_callback_url
+from src.scanner.infrastructure import routes
+from src.scanner.domain.jobs import ScanJobStatus
+from src.scanner.infrastructure.job_repository import ScanJobRepository
+from src.transactions.domain.transaction import Transaction, FinancialPlatform, Currency, TransactionType
+
+def _queue(tmp_path, scan_result=None, scan_error=None):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    repository = ScanJobRepository(sessionmaker(bind=engine))
+    scanner = MagicMock()
+    scanner.key_pool = ["AIza-key-a"]
+    scanner.validator.validate = AsyncMock(return_value=True)
+    scanner.scan_receipt = AsyncMock(return_value=scan_result, side_effect=scan_error)
+    return ScanJobQueue(scanner, repository), repository
+
+def _transaction():
+    return Transaction(
+        platform=FinancialPlatform.ZELLE, amount=Decimal("25.00"), currency=Currency.USD,
+        transaction_type=TransactionType.ENTRADA, reference_id="ABC123"
+    )
+
+def test_submitted_job_is_processed_and_pollable(tmp_path):
+    queue, _ = _queue(tmp_path, scan_result=_transaction())
+
+    async def run():
+        job_id = await queue.submit(b"img", "a.jpg", "image/jpeg")
+        assert (await queue.get(job_id)).status == ScanJobStatus.PENDING
+        await queue.process(job_id)
+        return job_id
+
+    job = asyncio.run(queue.get(asyncio.run(run())))
+    assert job.status == ScanJobStatus.DONE
+    assert job.result["reference_id"] == "ABC123"
+
+def test_failed_scan_is_recorded(tmp_path):
+    queue, _ = _queue(tmp_path, scan_error=ValueError("Invalid JSON response from AI"))
+
+    async def run():
+        job_id = await queue.submit(b"img", "a.jpg", "image/jpeg")
+        await queue.process(job_id)
+        return job_id
+
+    job = asyncio.run(queue.get(asyncio.run(run())))
+    assert job.status == ScanJobStatus.FAILED
+    assert "Invalid JSON" in job.error
+
+def test_job_is_claimed_only_once(tmp_path):
+    _, repository = _queue(tmp_path)
+    job_id = repository.create(b"img", "a.jpg", "image/jpeg", None)
+
+    assert repository.claim(job_id) is not None
+    assert repository.claim(job_id) is None
+
+def test_stale_running_jobs_are_requeued_on_start(tmp_path):
+    _, repository = _queue(tmp_path)
+    job_id = repository.create(b"img", "a.jpg", "image/jpeg", None)
+    repository.claim(job_id)
+
+    assert repository.requeue_interrupted(stale_after_seconds=-1, max_attempts=3) == 1
+    assert repository.pending_ids() == [job_id]
+
+def test_job_that_keeps_crashing_the_worker_is_failed_after_max_attempts(tmp_path):
+    _, repository = _queue(tmp_path)
+    job_id = repository.create(b"img", "a.jpg", "image/jpeg", None)
+    repository.claim(job_id)
+    assert repository.requeue_interrupted(stale_after_seconds=-1, max_attempts=2) == 1
+    repository.claim(job_id)
+    assert repository.requeue_interrupted(stale_after_seconds=-1, max_attempts=2) == 0
+    job = repository.get(job_id)
+
+    assert job.status == ScanJobStatus.FAILED.value
+    assert job.attempts == 2 and job.content is None
+    assert "giving up" in job.error
+    assert repository.pending_ids() == []
+
+@pytest.mark.parametrize("url", [
+    "http://hooks.example.com/scan",
+    "https://127.0.0.1/scan",
+    "https://169.254.169.254/latest/meta-data",
+    "https://localhost:8000/scan",
+    "https://user:pw@hooks.example.com/scan",
+    "https://hooks.example.com.evil.test/scan",
+])
+def test_callback_urls_outside_the_allowlist_are_rejected(url):
+    with patch("src.scanner.application.job_queue.settings.SCAN_JOB_CALLBACK_ALLOWED_HOSTS", ["hooks.example.com"]):
+        with pytest.raises(CallbackUrlError):
+            validate_callback_url(url)
+        assert validate_callback_url("https://HOOKS.example.com/scan?job=1")
+
+def test_submit_endpoint_rejects_internal_callback_with_422():
+    app = FastAPI()
+    app.include_router(routes.router)
+    client = TestClient(app)
+
+    response = client.post(
+        "/jobs",
+        files={"file": ("a.jpg", b"img", "image/jpeg")},
+        data={"callback_url": "http://127.0.0.1:8000/internal"}
+    )
+
+    assert response.status_code == 422
+    assert "https" in response.json()["detail"]
+
+def test_callback_is_not_sent_when_host_left_the_allowlist(tmp_path):
+    queue, repository = _queue(tmp_path, scan_result=_transaction())
+    job_id = repository.create(b"img", "a.jpg", "image/jpeg", "https://hooks.example.com/scan")
+
+    with patch("httpx.AsyncClient.post", new=AsyncMock()) as post:
+        asyncio.run(queue.process(job_id))
+
+    post.assert_not_called()
+    assert asyncio.run(queue.get(job_id)).callback_status == "rejected"
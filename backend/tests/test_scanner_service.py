@@ -0,0 +1,148 @@
+import asyncio
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.cache.manager import CacheManager
+from app.cache.storage import InMemoryCacheStorage
+from src.scanner.application.scanner_service import GeminiScannerService
+from src.transactions.domain.transaction import Transaction, FinancialPlatform, Currency, TransactionType
+
+def _transaction():
+    return Transaction(
+        platform=FinancialPlatform.BANESCO_VE,
+        amount=Decimal("150.00"),
+        currency=Currency.VES,
+        transaction_type=TransactionType.ENTRADA,
+        reference_id="123456"
+    )
+
+def _service():
+    InMemoryCacheStorage().clear()
+    service = GeminiScannerService()
+    service.api_keys = ["AIza-test"]
+    service.cache = CacheManager(namespace="scanner-test")
+    service._call_gemini_with_retry = AsyncMock(return_value='{"platform": "BANESCO"}')
+    service.mapper = MagicMock()
+    service.mapper.to_domain.return_value = _transaction()
+    return service
+
+def test_repeated_receipt_hits_cache():
+    service = _service()
+
+    first = asyncio.run(service.scan_receipt(b"receipt-bytes", "a.jpg", "image/jpeg"))
+    second = asyncio.run(service.scan_receipt(b"receipt-bytes", "b.jpg", "image/jpeg"))
+
+    assert service._call_gemini_with_retry.call_count == 1
+    assert second.reference_id == first.reference_id
+    assert service.get_cache_stats()["hits"] == 1
+    assert service.get_cache_stats()["misses"] == 1
+
+def test_different_receipt_misses_cache():
+    service = _service()
+
+    asyncio.run(service.scan_receipt(b"receipt-1", "a.jpg", "image/jpeg"))
+    asyncio.run(service.scan_receipt(b"receipt-2", "b.jpg", "image/jpeg"))
+
+    assert service._call_gemini_with_retry.call_count == 2
+    assert service.get_cache_stats()["hits"] == 0
+
+def test_cache_disabled_always_calls_ai():
+    service = _service()
+
+    with patch("src.scanner.application.scanner_service.settings.GEMINI_SCANNER_CACHE_ENABLED", False):
+        asyncio.run(service.scan_receipt(b"receipt-bytes", "a.jpg", "image/jpeg"))
+        asyncio.run(service.scan_receipt(b"receipt-bytes", "a.jpg", "image/jpeg"))
+
+    assert service._call_gemini_with_retry.call_count == 2
+
+def test_batch_streams_one_result_per_file():
+    service = _service()
+    files = [(b"receipt-1", "a.jpg", "image/jpeg"), (b"bad", "b.txt", "text/plain")]
+
+    async def collect():
+        return [r async for r in service.scan_batch(files)]
+
+    results = sorted(asyncio.run(collect()), key=lambda r: r["index"])
+
+    assert [r["ok"] for r in results] == [True, False]
+    assert results[0]["transaction"]["reference_id"] == "123456"
+    assert "not allowed" in results[1]["error"]
+
+def _batch_client():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.scanner.infrastructure import routes
+
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/scanner")
+    return TestClient(app)
+
+def test_batch_route_rejects_too_many_files_before_scanning():
+    client = _batch_client()
+    files = [("files", (f"{i}.jpg", b"x", "image/jpeg")) for i in range(3)]
+
+    with patch("src.scanner.infrastructure.routes.settings.GEMINI_SCANNER_BATCH_MAX_FILES", 2), \
+         patch("src.scanner.infrastructure.routes.scanner_service.scan_batch") as scan_batch:
+        response = client.post("/scanner/batch", files=files)
+
+    assert response.status_code == 400
+    scan_batch.assert_not_called()
+
+def test_batch_route_rejects_oversized_file_before_scanning():
+    client = _batch_client()
+    files = [("files", ("a.jpg", b"x" * 10, "image/jpeg")), ("files", ("b.jpg", b"x" * 11, "image/jpeg"))]
+
+    with patch("src.scanner.infrastructure.routes.scanner_service.validator.max_size_bytes", 10), \
+         patch("src.scanner.infrastructure.routes.scanner_service.scan_batch") as scan_batch:
+        response = client.post("/scanner/batch", files=files)
+
+    assert response.status_code == 413
+    assert "b.jpg" in response.json()["detail"]
+    scan_batch.assert_not_called()
+
+def test_batch_route_rejects_declared_oversized_body():
+    client = _batch_client()
+    files = [("files", ("a.jpg", b"x" * (1024 * 1024 + 1), "image/jpeg"))]
+
+    with patch("src.scanner.infrastructure.routes.settings.GEMINI_SCANNER_BATCH_MAX_TOTAL_MB", 1), \
+         patch("src.scanner.infrastructure.routes.scanner_service.scan_batch") as scan_batch:
+        response = client.post("/scanner/batch", files=files)
+
+    assert response.status_code == 413
+    scan_batch.assert_not_called()
+
+def test_similar_receipt_is_a_duplicate_only_with_the_same_reference():
+    service = _service()
+    service.cache = MagicMock()
+    service.cache.find_near_duplicate.return_value = ("key-1", 3)
+    service.cache.storage.get.return_value = _transaction()
+
+    similar = service.find_similar(b"same-template")
+    assert similar["distance"] == 3 and similar["duplicate"] is False
+    assert service.find_similar(b"same-template", reference_id="999999")["duplicate"] is False
+    assert service.find_similar(b"same-template", reference_id=" 123456 ")["duplicate"] is True
+
+    service.cache.find_near_duplicate.return_value = None
+    assert service.find_similar(b"other") is None
+
+def test_batch_route_caps_chunked_uploads_without_content_length():
+    client = _batch_client()
+    boundary = "batch-boundary"
+
+    def body():
+        yield (f"--{boundary}\r\nContent-Disposition: form-data; name=\"files\"; filename=\"a.jpg\"\r\n"
+               "Content-Type: image/jpeg\r\n\r\n").encode()
+        for _ in range(20):
+            yield b"x" * 65536
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    with patch("src.scanner.infrastructure.routes.settings.GEMINI_SCANNER_BATCH_MAX_TOTAL_MB", 1), \
+         patch("src.scanner.infrastructure.routes.scanner_service.scan_batch") as scan_batch, \
+         patch("starlette.datastructures.UploadFile.read") as read:
+        response = client.post(
+            "/scanner/batch", content=body(),
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"}
+        )
+
+    assert response.status_code == 413
+    scan_batch.assert_not_called()
+    read.assert_not_called()  # rejected while parsing, not after spooling the whole body
@@ -0,0 +1,38 @@
+import asyncio
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+from app.core.sqlite_engine import create_db_engine, create_async_db_engine
+
+def _pragmas(conn):
+    return {
+        name: conn.execute(text(f"PRAGMA {name}")).scalar()
+        for name in ("journal_mode", "synchronous", "busy_timeout", "mmap_size")
+    }
+
+def test_file_engine_gets_wal_profile_and_pool(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    with engine.connect() as conn:
+        pragmas = _pragmas(conn)
+    assert pragmas["journal_mode"] == "wal"
+    assert pragmas["synchronous"] == 1  # NORMAL
+    assert pragmas["busy_timeout"] == 5000
+    assert pragmas["mmap_size"] > 0
+    assert isinstance(engine.pool, QueuePool) and engine.pool.size() == 5
+
+def test_memory_engine_keeps_default_pool():
+    engine = create_db_engine("sqlite://")
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+    assert not isinstance(engine.pool, QueuePool)
+
+def test_async_engine_gets_same_profile(tmp_path):
+    engine = create_async_db_engine(f"sqlite+aiosqlite:///{tmp_path / 'tuned.db'}")
+
+    async def read():
+        async with engine.connect() as conn:
+            return await conn.run_sync(_pragmas)
+
+    pragmas = asyncio.run(read())
+    assert pragmas["journal_mode"] == "wal"
+    assert pragmas["busy_timeout"] == 5000
+    asyncio.run(engine.dispose())
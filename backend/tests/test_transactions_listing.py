@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.models.transaction import Transaction as TransactionModel
+from src.transactions.infrastructure import routes
+
+@pytest.fixture
+def client(session_factory):
+    now = datetime(2026, 1, 10, 12, 0, 0)
+    db = session_factory()
+    for i in range(5):
+        db.add(TransactionModel(
+            id=f"tx-{i}", platform="ZELLE" if i % 2 else "BINANCE", amount=i + 1, currency="USD",
+            amount_usd=i + 1, category="OTROS", transaction_type="ENTRADA",
+            status="PENDING" if i < 2 else "COMPLETED", session_id="s-1" if i == 4 else None,
+            created_at=now if i in (2, 3) else now - timedelta(days=i)  # tx-2/tx-3 share a timestamp
+        ))
+    db.commit()
+    db.close()
+
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/transactions")
+    return TestClient(app)
+
+def test_keyset_pages_cover_the_ledger_once(client):
+    seen, after = [], None
+    while True:
+        response = client.get("/transactions/", params={"limit": 2, **({"after": after} if after else {})})
+        assert response.status_code == 200
+        seen += [tx["id"] for tx in response.json()]
+        after = response.headers.get("X-Next-Cursor")
+        if not after:
+            break
+    assert seen == ["tx-3", "tx-2", "tx-0", "tx-1", "tx-4"]
+
+def test_filters_and_projection(client):
+    pending = client.get("/transactions/", params={"status": "PENDING", "platform": "ZELLE"}).json()
+    assert [tx["id"] for tx in pending] == ["tx-1"]
+
+    in_session = client.get("/transactions/", params={"session_id": "s-1"}).json()
+    assert [tx["id"] for tx in in_session] == ["tx-4"]
+
+    ranged = client.get("/transactions/", params={
+        "date_from": "2026-01-08T00:00:00", "date_to": "2026-01-10T00:00:00"
+    }).json()
+    assert [tx["id"] for tx in ranged] == ["tx-1"]
+
+    projected = client.get("/transactions/", params={"fields": "id,amount_usd", "limit": 1}).json()
+    assert projected == [{"id": "tx-3", "amount_usd": 4.0}]
+
+def test_bad_input_is_rejected(client):
+    assert client.get("/transactions/", params={"fields": "id,password"}).status_code == 400
+    assert client.get("/transactions/", params={"after": "garbage"}).status_code == 400
+    assert client.get("/transactions/", params={"status": "NOPE"}).status_code == 422
+
+def test_status_update_route(client):
+    response = client.patch("/transactions/tx-0/status", json={"status": "COMPLETED"})
+    assert response.status_code == 200
+    assert response.json()["status"] == "COMPLETED"
+
+    pending = client.get("/transactions/", params={"status": "PENDING"}).json()
+    assert [row["id"] for row in pending] == ["tx-1"]
+
+    assert client.patch("/transactions/missing/status", json={"status": "COMPLETED"}).status_code == 404
+    assert client.patch("/transactions/tx-1/status", json={"status": "BOGUS"}).status_code == 422